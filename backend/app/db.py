@@ -1,38 +1,126 @@
+import os
 import sqlite3
+from hashlib import blake2b
 from pathlib import Path
+from typing import Iterator, Optional
 
 
-DB_PATH = Path(__file__).resolve().parents[1] / "vaultguard.db"
+DB_PATH = Path(os.environ.get("VAULTGUARD_DB_PATH") or Path(__file__).resolve().parents[1] / "vaultguard.db")
+# Optional sharding: >1 spreads users over that many SQLite files by a stable hash of user_id,
+# so writes for different users stop serializing behind one database lock. Changing it needs
+# `python -m app.reshard`.
+DB_SHARDS = int(os.environ.get("VAULTGUARD_DB_SHARDS", "1") or 1)
 
 
-def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+def shard_count() -> int:
+    return max(1, DB_SHARDS)
+
+
+def shard_for(user_id: str, shards: Optional[int] = None) -> int:
+    shards = shards or shard_count()
+    if shards == 1:
+        return 0
+    return int.from_bytes(blake2b(user_id.encode("utf-8"), digest_size=8).digest(), "big") % shards
+
+
+def shard_path(index: int, shards: Optional[int] = None) -> Path:
+    shards = shards or shard_count()
+    if shards == 1:
+        return DB_PATH
+    # The shard count is part of the name, so a reshard writes new files next to the old ones.
+    return DB_PATH.with_name(f"{DB_PATH.stem}.s{shards}-{index}{DB_PATH.suffix}")
+
+
+def shard_paths(shards: Optional[int] = None) -> list[Path]:
+    shards = shards or shard_count()
+    return [shard_path(i, shards) for i in range(shards)]
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
     conn.row_factory = sqlite3.Row
     return conn
 
 
-def init_db() -> None:
-    with get_conn() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user_entitlements (
-              user_id TEXT PRIMARY KEY,
-              tier TEXT NOT NULL,
-              updated_at TEXT NOT NULL
-            )
-            """
+def get_conn(user_id: Optional[str] = None) -> sqlite3.Connection:
+    """Connection to the database holding `user_id` (the only database when not sharded)."""
+    if shard_count() == 1:
+        return connect(DB_PATH)
+    if user_id is None:
+        raise ValueError("user_id is required to route a query in sharded mode")
+    return connect(shard_path(shard_for(user_id)))
+
+
+def iter_conns(shards: Optional[int] = None) -> Iterator[sqlite3.Connection]:
+    """One connection per shard, for whole-table reads (exports, stats)."""
+    for path in shard_paths(shards):
+        conn = connect(path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def init_db(shards: Optional[int] = None) -> None:
+    for path in shard_paths(shards):
+        with connect(path) as conn:
+            _create_tables(conn)
+
+
+def _create_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_entitlements (
+          user_id TEXT PRIMARY KEY,
+          tier TEXT NOT NULL,
+          updated_at TEXT NOT NULL,
+          version INTEGER NOT NULL DEFAULT 1
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS identity_verifications (
-              id INTEGER PRIMARY KEY AUTOINCREMENT,
-              user_id TEXT NOT NULL,
-              vendor TEXT NOT NULL,
-              status TEXT NOT NULL,
-              verification_date TEXT NOT NULL,
-              token_hash TEXT NOT NULL
-            )
-            """
+        """
+    )
+    _add_column(conn, "user_entitlements", "version", "INTEGER NOT NULL DEFAULT 1")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS identity_verifications (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          user_id TEXT NOT NULL,
+          vendor TEXT NOT NULL,
+          status TEXT NOT NULL,
+          verification_date TEXT NOT NULL,
+          token_hash TEXT NOT NULL
         )
-        conn.commit()
+        """
+    )
+    _add_unique_index(
+        conn,
+        "identity_verifications",
+        "idx_identity_verifications_token",
+        ("user_id", "vendor", "token_hash"),
+    )
+    conn.commit()
 
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    # Migration for databases created before the column existed.
+    cols = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _add_unique_index(conn: sqlite3.Connection, table: str, name: str, columns: tuple) -> None:
+    # Migration: rows written before the index existed may repeat a key. Those are audit rows, so
+    # they are never dropped here; `python -m app.dedupe` removes them and reports what it removed.
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone()
+    if exists:
+        return
+    cols = ", ".join(columns)
+    dupes = conn.execute(
+        f"SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM {table} GROUP BY {cols} HAVING n > 1)"
+    ).fetchone()[0]
+    if dupes:
+        db_path = conn.execute("PRAGMA database_list").fetchone()["file"]
+        raise RuntimeError(
+            f"{db_path}: {table} has {dupes} rows repeating ({cols}); "
+            f"run `python -m app.dedupe` to remove them before starting the API"
+        )
+    conn.execute(f"CREATE UNIQUE INDEX {name} ON {table}({cols})")
@@ -0,0 +1,71 @@
+"""
+Remove repeated identity verifications so the (user, vendor, token) unique index can be built.
+
+Databases written before verify-identity became idempotent can hold several rows for one
+(user_id, vendor, token_hash). The API refuses to start on such a database instead of deleting
+audit rows behind the operator's back; this tool keeps the oldest row of each group, deletes the
+others, prints every removed row and then creates the index. --dry-run only reports.
+
+Usage:
+  python -m app.dedupe [--shards N] [--dry-run]
+"""
+
+import sys
+from typing import Optional
+
+from . import db
+
+
+KEY = ("user_id", "vendor", "token_hash")
+
+
+def dedupe_verifications(shards: Optional[int] = None, dry_run: bool = False) -> dict:
+    cols = ", ".join(KEY)
+    removed: dict[str, list] = {}
+    for path in db.shard_paths(shards):
+        if not path.exists():
+            continue
+        with db.connect(path) as conn:
+            table = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'identity_verifications'"
+            ).fetchone()
+            if not table:
+                continue
+            where = f"id NOT IN (SELECT MIN(id) FROM identity_verifications GROUP BY {cols})"
+            rows = conn.execute(
+                f"SELECT id, user_id, vendor, status, verification_date FROM identity_verifications WHERE {where} ORDER BY id"
+            ).fetchall()
+            removed[str(path)] = [dict(r) for r in rows]
+            if rows and not dry_run:
+                conn.execute(f"DELETE FROM identity_verifications WHERE {where}")
+            if not dry_run:
+                db._create_tables(conn)
+    return {
+        "dry_run": dry_run,
+        "removed": removed,
+        "total": sum(len(rows) for rows in removed.values()),
+    }
+
+
+def _opt(args: list[str], flag: str) -> Optional[str]:
+    if flag in args:
+        i = args.index(flag)
+        return args[i + 1] if i + 1 < len(args) else None
+    return None
+
+
+def main(argv: list[str]) -> int:
+    args = argv[1:]
+    shards = _opt(args, "--shards")
+    stats = dedupe_verifications(int(shards) if shards else None, dry_run="--dry-run" in args)
+    verb = "would remove" if stats["dry_run"] else "removed"
+    for path, rows in stats["removed"].items():
+        print(f"{path}: {verb} {len(rows)} repeated verifications")
+        for r in rows:
+            print(f"  id={r['id']} user={r['user_id']} vendor={r['vendor']} status={r['status']} date={r['verification_date']}")
+    print(f"{verb} {stats['total']} rows in total")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
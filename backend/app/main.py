@@ -1,6 +1,12 @@
+import os
+import threading
+import time
+from collections import OrderedDict
 from hashlib import sha256
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 
 from .db import get_conn, init_db
 from .models import (
@@ -11,6 +17,7 @@ from .models import (
     features_for_tier,
     now_iso,
 )
+from .scan import ScanQueueFull, ScanService, get_scan_service, shutdown_scan_service
 
 
 app = FastAPI(title="VaultGuard Backend (Stub)", version="0.1.2")
@@ -21,35 +28,97 @@ def _startup() -> None:
     init_db()
 
 
-def get_tier_for_user(user_id: str) -> UserTier:
-    with get_conn() as conn:
+@app.on_event("shutdown")
+def _shutdown() -> None:
+    shutdown_scan_service()
+
+
+# user_id -> (tier, version, expires_at). Writes through set_tier_for_user update it directly;
+# the TTL bounds staleness when several server processes share one database.
+ENTITLEMENTS_CACHE_SIZE = int(os.environ.get("VAULTGUARD_ENTITLEMENTS_CACHE_SIZE", "10000"))
+ENTITLEMENTS_CACHE_TTL_S = float(os.environ.get("VAULTGUARD_ENTITLEMENTS_CACHE_TTL_S", "2"))
+_entitlements_cache: "OrderedDict[str, tuple[UserTier, int, float]]" = OrderedDict()
+_entitlements_lock = threading.Lock()
+
+
+def _cache_entitlement(user_id: str, tier: UserTier, version: int) -> None:
+    with _entitlements_lock:
+        _entitlements_cache[user_id] = (tier, version, time.monotonic() + ENTITLEMENTS_CACHE_TTL_S)
+        _entitlements_cache.move_to_end(user_id)
+        while len(_entitlements_cache) > ENTITLEMENTS_CACHE_SIZE:
+            _entitlements_cache.popitem(last=False)
+
+
+def clear_entitlements_cache() -> None:
+    with _entitlements_lock:
+        _entitlements_cache.clear()
+
+
+def get_entitlement_version(user_id: str) -> tuple[UserTier, int]:
+    """(tier, version) for a user; version 0 means no stored entitlement (default LITE)."""
+    with _entitlements_lock:
+        hit = _entitlements_cache.get(user_id)
+    if hit is not None and hit[2] > time.monotonic():
+        return hit[0], hit[1]
+    with get_conn(user_id) as conn:
         row = conn.execute(
-            "SELECT tier FROM user_entitlements WHERE user_id = ?",
+            "SELECT tier, version FROM user_entitlements WHERE user_id = ?",
             (user_id,),
         ).fetchone()
-        if not row:
-            return UserTier.LITE
-        return UserTier(row["tier"])
+    tier, version = (UserTier(row["tier"]), int(row["version"])) if row else (UserTier.LITE, 0)
+    _cache_entitlement(user_id, tier, version)
+    return tier, version
+
+
+def get_tier_for_user(user_id: str) -> UserTier:
+    return get_entitlement_version(user_id)[0]
 
 
 def set_tier_for_user(user_id: str, tier: UserTier) -> None:
-    with get_conn() as conn:
+    with get_conn(user_id) as conn:
         conn.execute(
             """
-            INSERT INTO user_entitlements(user_id, tier, updated_at)
-            VALUES(?, ?, ?)
-            ON CONFLICT(user_id) DO UPDATE SET tier=excluded.tier, updated_at=excluded.updated_at
+            INSERT INTO user_entitlements(user_id, tier, updated_at, version)
+            VALUES(?, ?, ?, 1)
+            ON CONFLICT(user_id) DO UPDATE SET
+              tier=excluded.tier, updated_at=excluded.updated_at, version=user_entitlements.version + 1
             """,
             (user_id, tier.value, now_iso()),
         )
+        row = conn.execute("SELECT version FROM user_entitlements WHERE user_id = ?", (user_id,)).fetchone()
         conn.commit()
+    _cache_entitlement(user_id, tier, int(row["version"]))
+
+
+def entitlements_etag(tier: UserTier, version: int) -> str:
+    return f'"{tier.value}.{version}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
 
 
 @app.get("/api/user/entitlements", response_model=EntitlementsResponse)
-def get_entitlements(userId: str) -> EntitlementsResponse:
+def get_entitlements(
+    userId: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+):
     if not userId or len(userId) < 3:
         raise HTTPException(status_code=400, detail="userId is required")
-    tier = get_tier_for_user(userId)
+    tier, version = get_entitlement_version(userId)
+    etag = entitlements_etag(tier, version)
+    # Clients may cache but must revalidate; an unchanged version costs one lookup and no body.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
     return EntitlementsResponse(
         userId=userId,
         tier=tier,
@@ -71,18 +140,120 @@ def mock_purchase(req: PurchaseRequest) -> EntitlementsResponse:
     )
 
 
+# (user_id, vendor, token_hash) -> first verification record. Vendor webhook retries are answered
+# from here without touching the database; the unique index covers misses and other processes.
+VERIFY_CACHE_SIZE = int(os.environ.get("VAULTGUARD_VERIFY_CACHE_SIZE", "10000"))
+_verify_cache: "OrderedDict[tuple[str, str, str], dict]" = OrderedDict()
+_verify_lock = threading.Lock()
+
+
+def _cached_verification(key: tuple[str, str, str]) -> Optional[dict]:
+    with _verify_lock:
+        record = _verify_cache.get(key)
+        if record is not None:
+            _verify_cache.move_to_end(key)
+        return record
+
+
+def _cache_verification(key: tuple[str, str, str], record: dict) -> None:
+    with _verify_lock:
+        _verify_cache[key] = record
+        _verify_cache.move_to_end(key)
+        while len(_verify_cache) > VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
+
+
+def clear_verify_cache() -> None:
+    with _verify_lock:
+        _verify_cache.clear()
+
+
+def _select_verification(conn, key: tuple[str, str, str]) -> Optional[dict]:
+    row = conn.execute(
+        """
+        SELECT id, status, verification_date FROM identity_verifications
+        WHERE user_id = ? AND vendor = ? AND token_hash = ?
+        """,
+        key,
+    ).fetchone()
+    if row is None:
+        return None
+    return {"verificationId": row["id"], "status": row["status"], "verificationDate": row["verification_date"]}
+
+
 @app.post("/api/verify-identity")
 def verify_identity(req: VerifyIdentityRequest) -> dict:
-    # Stub: accept any token and mark verified.
+    # Stub: accept any token and mark verified. Idempotent per (user, vendor, token): retries get
+    # the original record back with duplicate=true and cost no write.
     token_hash = sha256(req.token.encode("utf-8")).hexdigest()
-    with get_conn() as conn:
-        conn.execute(
-            """
-            INSERT INTO identity_verifications(user_id, vendor, status, verification_date, token_hash)
-            VALUES(?, ?, ?, ?, ?)
-            """,
-            (req.userId, req.vendor, "VERIFIED", now_iso(), token_hash),
-        )
-        conn.commit()
-    return {"ok": True, "status": "VERIFIED"}
+    key = (req.userId, req.vendor, token_hash)
+    record = _cached_verification(key)
+    duplicate = record is not None
+    if record is None:
+        with get_conn(req.userId) as conn:
+            record = _select_verification(conn, key)
+            duplicate = record is not None
+            if record is None:
+                cur = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO identity_verifications(user_id, vendor, status, verification_date, token_hash)
+                    VALUES(?, ?, ?, ?, ?)
+                    """,
+                    (req.userId, req.vendor, "VERIFIED", now_iso(), token_hash),
+                )
+                conn.commit()
+                # rowcount 0: a concurrent request inserted it between our SELECT and INSERT.
+                duplicate = cur.rowcount == 0
+                record = _select_verification(conn, key)
+        _cache_verification(key, record)
+    return {"ok": True, **record, "duplicate": duplicate}
+
+
+SCAN_MAX_BYTES = int(os.environ.get("VAULTGUARD_SCAN_MAX_BYTES", str(20 * 1024 * 1024)))
+
+
+def _scan_response(job, finished: bool) -> JSONResponse:
+    body = job.as_dict()
+    if not finished:
+        return JSONResponse(body, status_code=202, headers={"Location": f"/api/scan/{job.id}"})
+    if body["status"] == "failed":
+        # Missing Tesseract is a server problem; anything else is an unreadable upload.
+        code = 503 if isinstance(job.future.exception(), RuntimeError) else 422
+        return JSONResponse(body, status_code=code)
+    return JSONResponse(body)
+
+
+@app.post("/api/scan")
+async def scan(
+    request: Request,
+    wait: bool = True,
+    timeout: float = 10.0,
+    service: ScanService = Depends(get_scan_service),
+) -> JSONResponse:
+    # Raw image body (Content-Type: image/png, ...): no multipart parser needed for one file.
+    # Oversized uploads are refused from the header, or as soon as the stream passes the limit.
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > SCAN_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="image too large")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > SCAN_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="image too large")
+    if not body:
+        raise HTTPException(status_code=400, detail="image body is required")
+    data = bytes(body)
+    try:
+        job = service.submit(data)
+    except ScanQueueFull:
+        raise HTTPException(status_code=429, detail="scan queue full", headers={"Retry-After": "1"})
+    finished = await service.wait(job, max(0.0, min(timeout, 120.0))) if wait else False
+    return _scan_response(job, finished)
+
 
+@app.get("/api/scan/{jobId}")
+def scan_status(jobId: str, service: ScanService = Depends(get_scan_service)) -> JSONResponse:
+    job = service.get(jobId)
+    if job is None:
+        raise HTTPException(status_code=404, detail="unknown jobId")
+    return _scan_response(job, job.future.done())
@@ -0,0 +1,129 @@
+"""
+Copy the backend databases from one shard layout to another.
+
+Rows are read from every source database and written to the target layout, routed with the same
+stable user_id hash the API uses. Source files are left untouched: stop the API (or accept that
+writes made during the copy are lost), run the tool, then restart with VAULTGUARD_DB_SHARDS set
+to the target count and remove the old files once satisfied.
+
+identity_verifications ids are per database, so rows get new ids in their target shard
+(original order is kept). Verifications already present in the target for the same
+(user, vendor, token) are skipped, so a --force merge does not duplicate them.
+
+Usage:
+  python -m app.reshard --to N [--from M] [--force]
+"""
+
+import sys
+import time
+from typing import Optional
+
+from . import db
+
+
+BATCH = 5000
+
+
+def _target_is_empty(shards: int) -> bool:
+    for conn in db.iter_conns(shards):
+        for table in ("user_entitlements", "identity_verifications"):
+            if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+    return True
+
+
+def reshard(to_shards: int, from_shards: Optional[int] = None, force: bool = False) -> dict:
+    from_shards = from_shards or db.shard_count()
+    if to_shards == from_shards:
+        raise ValueError("source and target layouts are the same")
+    start = time.perf_counter()
+    db.init_db(to_shards)
+    if not force and not _target_is_empty(to_shards):
+        raise ValueError(f"target layout ({to_shards} shards) already has rows; use --force to merge into it")
+
+    targets = [db.connect(p) for p in db.shard_paths(to_shards)]
+    counts = {"user_entitlements": 0, "identity_verifications": 0}
+    try:
+        for src in db.iter_conns(from_shards):
+            pending: dict[int, list] = {}
+            for row in src.execute("SELECT user_id, tier, updated_at, version FROM user_entitlements"):
+                pending.setdefault(db.shard_for(row["user_id"], to_shards), []).append(tuple(row))
+                counts["user_entitlements"] += 1
+                if counts["user_entitlements"] % BATCH == 0:
+                    _flush_entitlements(targets, pending)
+            _flush_entitlements(targets, pending)
+
+            pending = {}
+            for row in src.execute(
+                "SELECT user_id, vendor, status, verification_date, token_hash FROM identity_verifications ORDER BY id"
+            ):
+                pending.setdefault(db.shard_for(row["user_id"], to_shards), []).append(tuple(row))
+                counts["identity_verifications"] += 1
+                if counts["identity_verifications"] % BATCH == 0:
+                    _flush_verifications(targets, pending)
+            _flush_verifications(targets, pending)
+        for conn in targets:
+            conn.commit()
+    finally:
+        for conn in targets:
+            conn.close()
+    return {
+        "from": from_shards,
+        "to": to_shards,
+        "paths": [str(p) for p in db.shard_paths(to_shards)],
+        "rows": counts,
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def _flush_entitlements(targets: list, pending: dict) -> None:
+    for shard, rows in pending.items():
+        targets[shard].executemany(
+            """
+            INSERT INTO user_entitlements(user_id, tier, updated_at, version) VALUES(?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+              tier=excluded.tier, updated_at=excluded.updated_at, version=MAX(version, excluded.version)
+            """,
+            rows,
+        )
+    pending.clear()
+
+
+def _flush_verifications(targets: list, pending: dict) -> None:
+    for shard, rows in pending.items():
+        targets[shard].executemany(
+            """
+            INSERT OR IGNORE INTO identity_verifications(user_id, vendor, status, verification_date, token_hash)
+            VALUES(?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    pending.clear()
+
+
+def _opt(args: list[str], flag: str) -> Optional[str]:
+    if flag in args:
+        i = args.index(flag)
+        return args[i + 1] if i + 1 < len(args) else None
+    return None
+
+
+def main(argv: list[str]) -> int:
+    args = argv[1:]
+    to = _opt(args, "--to")
+    if not to:
+        print("Usage: python -m app.reshard --to N [--from M] [--force]")
+        return 1
+    src = _opt(args, "--from")
+    try:
+        stats = reshard(int(to), int(src) if src else None, force="--force" in args)
+    except ValueError as e:
+        print(f"reshard: {e}")
+        return 1
+    print(stats)
+    print(f"Now restart the API with VAULTGUARD_DB_SHARDS={stats['to']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,236 @@
+import asyncio
+import os
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor
+from functools import partial
+from hashlib import sha256
+from pathlib import Path
+from typing import Callable, Optional
+
+from .models import now_iso
+
+
+# OCR tools live next to the backend in the repo; point elsewhere for an installed layout.
+TOOLS_DIR = Path(os.environ.get("VAULTGUARD_TOOLS_DIR", Path(__file__).resolve().parents[2] / "tools"))
+OCR_MODE = "windows_security"
+
+
+class ScanQueueFull(Exception):
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+def _tool_paths() -> list[str]:
+    return [str(TOOLS_DIR / "vaultguard-ocr-python"), str(TOOLS_DIR / "vaultguard-security-parser")]
+
+
+def init_worker(workers: Optional[int] = None) -> None:
+    """
+    Process-pool initializer: make ocr_engine / security_parser importable and, given the pool
+    size, cap this worker's OCR threads at its share of the CPUs. Runs only in pool workers, so
+    the API process keeps its own sys.path and thread settings.
+    """
+    for p in _tool_paths():
+        if p not in sys.path:
+            sys.path.insert(0, p)
+    if workers:
+        threads = plan_threads(workers)["threads"]
+        if threads:
+            from ocr_scheduler import apply_thread_limits  # type: ignore
+
+            apply_thread_limits(threads)
+
+
+def plan_threads(workers: int) -> dict:
+    """
+    Threads per OCR worker so `workers` scans in parallel do not oversubscribe the CPUs. No side
+    effects of its own; needs the tool paths set up by init_worker.
+    """
+    try:
+        from ocr_scheduler import plan_threads as plan  # type: ignore
+    except ImportError:  # tools without the scheduler
+        return {"workers": workers, "threads": None, "source": "unmanaged"}
+    return plan(workers)
+
+
+_parser = None
+
+
+def analyze_image_bytes(data: bytes) -> dict:
+    """
+    OCR + security parsing of one encoded screenshot, entirely in memory. Runs in a pool worker;
+    the parser is built once per worker process.
+    """
+    global _parser
+    init_worker()
+    from ocr_engine import extract_text  # type: ignore
+    from security_parser import SecuritySettingsParser  # type: ignore
+
+    if _parser is None:
+        _parser = SecuritySettingsParser()
+    ocr = extract_text(data, mode=OCR_MODE)
+    return {"ocr": ocr, "security_analysis": _parser.parse_text(ocr.get("text") or "")}
+
+
+class ScanJob:
+    def __init__(self, job_id: str, image_hash: str, future: Future):
+        self.id = job_id
+        self.image_hash = image_hash
+        self.future = future
+        self.submitted_at = now_iso()
+        self.finished_at: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return "running" if self.future.running() else "queued"
+        return "failed" if self.future.exception() is not None else "done"
+
+    def as_dict(self) -> dict:
+        out = {
+            "jobId": self.id,
+            "status": self.status,
+            "imageHash": self.image_hash,
+            "submittedAt": self.submitted_at,
+            "finishedAt": self.finished_at,
+        }
+        if self.future.done():
+            err = self.future.exception()
+            if err is None:
+                out["result"] = self.future.result()
+            else:
+                out["error"] = str(err) or type(err).__name__
+        return out
+
+
+class ScanService:
+    """
+    Bounded OCR offload for the API.
+
+    At most `max_workers` scans run at once and at most `max_queue` more wait for a worker; a
+    submit beyond that raises ScanQueueFull (HTTP 429) instead of queueing without limit, so an
+    OCR burst cannot pile up behind the entitlements endpoints. Finished jobs are kept for
+    polling, oldest evicted first beyond `max_jobs`.
+    """
+
+    def __init__(
+        self,
+        worker: Callable[[bytes], dict] = analyze_image_bytes,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_jobs: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.worker = worker
+        self.max_workers = max_workers or _env_int("VAULTGUARD_SCAN_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+        self.max_queue = max_queue if max_queue is not None else _env_int("VAULTGUARD_SCAN_QUEUE", self.max_workers * 2)
+        self.max_jobs = max_jobs or _env_int("VAULTGUARD_SCAN_MAX_JOBS", 1000)
+        self._executor = executor
+        self._jobs: "OrderedDict[str, ScanJob]" = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        # Created on first scan so the API starts (and serves entitlements) without OCR workers.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=partial(init_worker, self.max_workers),
+            )
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, data: bytes) -> ScanJob:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                raise ScanQueueFull()
+            self._pending += 1
+        try:
+            future = self._submit(data)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        job = ScanJob(uuid.uuid4().hex, sha256(data).hexdigest(), future)
+        future.add_done_callback(lambda _f, job=job: self._finished(job))
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        return job
+
+    def _submit(self, data: bytes) -> Future:
+        executor = self.executor
+        try:
+            return executor.submit(self.worker, data)
+        except BrokenExecutor:
+            # A worker died (killed for memory, crashed in Tesseract): the pool refuses all further
+            # work, so replace it. Scans that were running on it have already failed.
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            return self.executor.submit(self.worker, data)
+
+    def _finished(self, job: ScanJob) -> None:
+        job.finished_at = now_iso()
+        with self._lock:
+            self._pending -= 1
+
+    def _evict(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.future.done()][:excess]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    async def wait(self, job: ScanJob, timeout_s: float) -> bool:
+        """Wait up to `timeout_s` without blocking the event loop; True if the job finished."""
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            return False
+        except Exception:  # failure is reported through the job status
+            pass
+        return True
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_service: Optional[ScanService] = None
+_service_lock = threading.Lock()
+
+
+def get_scan_service() -> ScanService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ScanService()
+        return _service
+
+
+def shutdown_scan_service() -> None:
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.shutdown()
+            _service = None
@@ -0,0 +1,279 @@
+"""
+Read-only entitlements snapshot for same-host lookups without HTTP or SQLite.
+
+The exporter dumps `user_entitlements` into a compact binary file: a 32-byte header followed by
+fixed-width 16-byte records sorted by a 64-bit hash of the user id. Readers mmap the file and
+binary-search it in place (O(log n), no copying, no DB access).
+
+Swapping: each export is written to a new generation file (<path>.<generation>), then the small
+pointer file <path> is atomically replaced to name it. Readers re-read the pointer at most once
+per check interval and remap when it changes. A mapped file cannot be replaced on Windows,
+which is why generations are separate files instead of one file replaced in place; old
+generations are removed on later exports once no reader maps them.
+
+Usage:
+  python -m app.snapshot export [--out entitlements.snap] [--every SECONDS]
+  python -m app.snapshot get <userId> [--snapshot entitlements.snap]
+"""
+
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from hashlib import blake2b
+from pathlib import Path
+from typing import Optional
+
+
+SNAPSHOT_PATH = Path(
+    os.environ.get("VAULTGUARD_SNAPSHOT_PATH") or Path(__file__).resolve().parents[1] / "entitlements.snap"
+)
+MAGIC = b"VGENTSNP"
+FORMAT_VERSION = 1
+# magic, format version, record size, record count, created (unix ms), reserved
+HEADER = struct.Struct("<8sHHIQ8x")
+# user key, tier code, version
+RECORD = struct.Struct("<QB3xI")
+KEY = struct.Struct("<Q")
+# Tier codes are part of the file format: append new tiers, never reorder.
+TIERS = ("LITE", "ANGEL", "REVOLUTION")
+
+
+def user_key(user_id: str) -> int:
+    return int.from_bytes(blake2b(user_id.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _iter_entitlements():
+    from .db import iter_conns
+
+    for conn in iter_conns():
+        yield from conn.execute("SELECT user_id, tier, version FROM user_entitlements")
+
+
+def _change_token() -> tuple:
+    # Every tier change bumps a version, so (rows, sum of versions) per shard changes with the table.
+    from .db import iter_conns
+
+    return tuple(
+        tuple(conn.execute("SELECT COUNT(*), COALESCE(SUM(version), 0) FROM user_entitlements").fetchone())
+        for conn in iter_conns()
+    )
+
+
+def _replace(src: str, dst: str, attempts: int = 20) -> None:
+    # A reader may be reading the pointer file at this instant (Windows refuses the replace).
+    for i in range(attempts):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if i == attempts - 1:
+                raise
+            time.sleep(0.05)
+
+
+def _generations(path: Path) -> list[Path]:
+    out = []
+    for p in path.parent.glob(path.name + ".*"):
+        if p.suffix[1:].isdigit():
+            out.append(p)
+    return sorted(out, key=lambda p: int(p.suffix[1:]))
+
+
+def export_snapshot(path: Optional[Path] = None, keep: int = 2) -> dict:
+    """Write a new snapshot generation, point `path` at it and prune older generations."""
+    path = Path(path or SNAPSHOT_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    codes = {name: i for i, name in enumerate(TIERS)}
+    records = {}
+    collisions = 0
+    for row in _iter_entitlements():
+        key = user_key(row["user_id"])
+        if key in records:
+            # 64-bit hash collision: astronomically rare; keep the first row and report it.
+            collisions += 1
+            continue
+        records[key] = (codes[row["tier"]], int(row["version"]))
+
+    generation = time.time_ns()
+    data_path = path.with_name(f"{path.name}.{generation}")
+    buf = bytearray(HEADER.size + RECORD.size * len(records))
+    HEADER.pack_into(buf, 0, MAGIC, FORMAT_VERSION, RECORD.size, len(records), generation // 1_000_000)
+    offset = HEADER.size
+    for key in sorted(records):
+        RECORD.pack_into(buf, offset, key, *records[key])
+        offset += RECORD.size
+    with open(data_path, "wb") as f:
+        f.write(buf)
+        f.flush()
+        os.fsync(f.fileno())
+
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(data_path.name, encoding="utf-8")
+    _replace(str(tmp), str(path))
+
+    for old in _generations(path)[:-max(1, keep)]:
+        try:
+            old.unlink()
+        except OSError:  # still mapped by a reader (Windows); retried on the next export
+            pass
+    return {
+        "path": str(path),
+        "data": str(data_path),
+        "count": len(records),
+        "collisions": collisions,
+        "bytes": len(buf),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def run_exporter(path: Optional[Path] = None, every_s: float = 5.0, stop: Optional[threading.Event] = None) -> None:
+    """Re-export whenever the table changed, checking every `every_s` seconds, until `stop` is set."""
+    stop = stop or threading.Event()
+    last = None
+    while not stop.is_set():
+        token = _change_token()
+        if token != last:
+            stats = export_snapshot(path)
+            last = token
+            print(f"snapshot: {stats['count']} users -> {stats['data']} ({stats['elapsed_ms']} ms)", flush=True)
+        stop.wait(every_s)
+
+
+class _Mapping:
+    def __init__(self, data_path: Path):
+        with open(data_path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mm) < HEADER.size:
+            raise ValueError(f"Truncated entitlements snapshot: {data_path}")
+        magic, fmt, rec_size, count, created_ms = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION or rec_size != RECORD.size:
+            raise ValueError(f"Not an entitlements snapshot (v{FORMAT_VERSION}): {data_path}")
+        if len(self.mm) < HEADER.size + count * rec_size:
+            raise ValueError(f"Truncated entitlements snapshot: {data_path}")
+        self.path = data_path
+        self.count = count
+        self.created_ms = created_ms
+        # Zero-copy view of the records as 64-bit words (key at word 2*i) when the host byte
+        # order matches the file's; otherwise lookups unpack from the map.
+        self.words = None
+        if sys.byteorder == "little":
+            self.words = memoryview(self.mm)[HEADER.size : HEADER.size + count * RECORD.size].cast("Q")
+
+
+class SnapshotReader:
+    """
+    mmap-backed lookups against the exporter's snapshot. Thread-safe: a refresh swaps in a new
+    mapping, and lookups already running keep the old one alive until they return.
+    """
+
+    def __init__(self, path: Optional[Path] = None, check_interval_s: float = 1.0):
+        self.path = Path(path or SNAPSHOT_PATH)
+        self.check_interval_s = check_interval_s
+        self._pointer: Optional[str] = None
+        self._map: Optional[_Mapping] = None
+        self._checked_at = 0.0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Remap if the exporter published a new generation; True when the mapping changed. A
+        pointer or generation that cannot be read keeps the current mapping (the error is kept in
+        `last_error`); only the first load raises.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval_s:
+            return False
+        with self._lock:
+            self._checked_at = now
+            try:
+                pointer = self.path.read_text(encoding="utf-8").strip()
+                if pointer == self._pointer:
+                    return False
+                mapping = _Mapping(self.path.with_name(pointer))
+            except (OSError, ValueError) as e:
+                if self._map is None:
+                    raise
+                # Keep serving the last good generation; retried at the next check interval.
+                self.last_error = f"{type(e).__name__}: {e}"
+                return False
+            self._map = mapping
+            self._pointer = pointer
+            self.last_error = None
+            return True
+
+    def __len__(self) -> int:
+        return self._map.count
+
+    @property
+    def created_ms(self) -> int:
+        return self._map.created_ms
+
+    def get(self, user_id: str) -> Optional[tuple[str, int]]:
+        """(tier, version) for a user, or None if the snapshot has no row (default tier LITE)."""
+        if self.check_interval_s >= 0:
+            self.refresh()
+        m = self._map
+        key = user_key(user_id)
+        words = m.words
+        lo, hi = 0, m.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found = words[2 * mid] if words is not None else KEY.unpack_from(m.mm, HEADER.size + mid * RECORD.size)[0]
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                _, code, version = RECORD.unpack_from(m.mm, HEADER.size + mid * RECORD.size)
+                return TIERS[code], version
+        return None
+
+    def tier(self, user_id: str, default: str = "LITE") -> str:
+        hit = self.get(user_id)
+        return hit[0] if hit else default
+
+    def close(self) -> None:
+        self._map = None
+        self._pointer = None
+
+
+def _opt(args: list[str], flag: str) -> Optional[str]:
+    if flag in args:
+        i = args.index(flag)
+        return args[i + 1] if i + 1 < len(args) else None
+    return None
+
+
+def main(argv: list[str]) -> int:
+    args = argv[1:]
+    if args and args[0] == "export":
+        from .db import init_db
+
+        init_db()
+        out = _opt(args, "--out")
+        every = _opt(args, "--every")
+        if every:
+            try:
+                run_exporter(Path(out) if out else None, float(every))
+            except KeyboardInterrupt:
+                pass
+            return 0
+        print(export_snapshot(Path(out) if out else None))
+        return 0
+    if len(args) >= 2 and args[0] == "get":
+        snap = _opt(args, "--snapshot")
+        reader = SnapshotReader(Path(snap) if snap else None, check_interval_s=-1)
+        print(reader.tier(args[1]))
+        return 0
+    print("Usage: python -m app.snapshot export [--out entitlements.snap] [--every SECONDS] | get <userId> [--snapshot path]")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
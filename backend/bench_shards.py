@@ -0,0 +1,88 @@
+"""
+Write throughput of the backend storage by shard count.
+
+Several writer processes (like several uvicorn workers) run set_tier_for_user upserts and
+verify-identity inserts for random users against a fresh database directory, once per shard
+count. With one file every commit waits for the single SQLite write lock; with N shards writers
+for different users commit in parallel.
+
+Usage:
+  python bench_shards.py [--shards 1,2,4,8] [--writers 8] [--ops 500] [--out bench_shards.json]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+
+def _init_writer(db_path: str, shards: int) -> None:
+    from app import db
+
+    db.DB_PATH = db.Path(db_path)
+    db.DB_SHARDS = shards
+
+
+def _write(args: tuple) -> int:
+    from app.main import set_tier_for_user, verify_identity
+    from app.models import UserTier, VerifyIdentityRequest
+
+    seed, ops = args
+    rng = random.Random(seed)
+    tiers = list(UserTier)
+    for i in range(ops):
+        user = f"user{rng.randrange(1_000_000):07d}"
+        if i % 4 == 3:
+            verify_identity(VerifyIdentityRequest(userId=user, vendor="ONFIDO", token=f"tok{seed}-{i}"))
+        else:
+            set_tier_for_user(user, rng.choice(tiers))
+    return ops
+
+
+def run(shards: int, writers: int, ops: int) -> dict:
+    from app import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vaultguard.db")
+        db.DB_PATH, db.DB_SHARDS = db.Path(path), shards
+        db.init_db()
+        with Pool(writers, initializer=_init_writer, initargs=(path, shards)) as pool:
+            pool.map(_write, [(s, 1) for s in range(writers)])  # warm up imports
+            t0 = time.perf_counter()
+            done = sum(pool.map(_write, [(1000 + s, ops) for s in range(writers)]))
+            wall = time.perf_counter() - t0
+    return {"shards": shards, "writers": writers, "writes": done, "wall_s": round(wall, 3), "writes_per_s": round(done / wall, 1)}
+
+
+def _opt(args: list[str], flag: str, default: str) -> str:
+    if flag in args:
+        i = args.index(flag)
+        return args[i + 1] if i + 1 < len(args) else default
+    return default
+
+
+def main(argv: list[str]) -> int:
+    args = argv[1:]
+    shard_counts = [int(s) for s in _opt(args, "--shards", "1,2,4,8").split(",")]
+    writers, ops = int(_opt(args, "--writers", "8")), int(_opt(args, "--ops", "500"))
+    results = []
+    for shards in shard_counts:
+        r = run(shards, writers, ops)
+        results.append(r)
+        print(f"shards={r['shards']:<3} writers={r['writers']:<3} {r['writes_per_s']:>9} writes/s")
+    report = {"cpu_count": os.cpu_count(), "results": results}
+    out = _opt(args, "--out", "")
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    base = results[0]["writes_per_s"]
+    for r in results[1:]:
+        print(f"  {r['shards']} shards: x{r['writes_per_s'] / base:.2f} vs {results[0]['shards']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
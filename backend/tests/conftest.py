@@ -0,0 +1,16 @@
+import pytest
+
+from app import db
+from app.main import clear_entitlements_cache, clear_verify_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_db(tmp_path, monkeypatch):
+    # Every test gets its own SQLite file; the app never touches backend/vaultguard.db.
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "vaultguard.db")
+    db.init_db()
+    clear_entitlements_cache()
+    clear_verify_cache()
+    yield
+    clear_entitlements_cache()
+    clear_verify_cache()
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+from app.scan import ScanService, get_scan_service
+
+
+client = TestClient(app)
+release = threading.Event()
+
+
+def fake_worker(data: bytes) -> dict:
+    if data == b"slow":
+        release.wait(5)
+    if data == b"broken":
+        raise ValueError("Cannot decode image bytes")
+    return {"ocr": {"text": data.decode()}, "security_analysis": {"security_score": 100.0}}
+
+
+def dying_worker(data: bytes) -> dict:
+    if data == b"die":
+        os._exit(1)  # a worker killed mid-scan breaks its process pool
+    return fake_worker(data)
+
+
+def thread_limit_worker(data: bytes) -> str:
+    return os.environ["OMP_THREAD_LIMIT"]
+
+
+@pytest.fixture
+def service():
+    release.clear()
+    svc = ScanService(worker=fake_worker, max_workers=1, max_queue=1, executor=ThreadPoolExecutor(max_workers=1))
+    app.dependency_overrides[get_scan_service] = lambda: svc
+    yield svc
+    release.set()
+    app.dependency_overrides.clear()
+    svc.shutdown()
+
+
+def test_scan_returns_analysis(service):
+    r = client.post("/api/scan", content=b"png", headers={"Content-Type": "image/png"})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["status"] == "done"
+    assert data["result"]["security_analysis"]["security_score"] == 100.0
+    assert len(data["imageHash"]) == 64
+
+
+def test_scan_polling_mode(service):
+    r = client.post("/api/scan", params={"wait": "false"}, content=b"slow")
+    assert r.status_code == 202
+    job_id = r.json()["jobId"]
+    assert r.headers["Location"] == f"/api/scan/{job_id}"
+    assert client.get(f"/api/scan/{job_id}").status_code == 202
+
+    release.set()
+    for _ in range(100):
+        r = client.get(f"/api/scan/{job_id}")
+        if r.status_code != 202:
+            break
+        time.sleep(0.01)
+    assert r.status_code == 200
+    assert r.json()["result"]["ocr"]["text"] == "slow"
+
+
+def test_scan_rejects_when_queue_full(service):
+    assert client.post("/api/scan", params={"wait": "false"}, content=b"slow").status_code == 202
+    assert client.post("/api/scan", params={"wait": "false"}, content=b"slow").status_code == 202
+    r = client.post("/api/scan", content=b"png")
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "1"
+
+    release.set()
+    for _ in range(100):
+        if service.pending == 0:
+            break
+        time.sleep(0.01)
+    assert client.post("/api/scan", content=b"png").status_code == 200
+
+
+def test_scan_failure_and_validation(service):
+    r = client.post("/api/scan", content=b"broken")
+    assert r.status_code == 422
+    assert r.json()["error"] == "Cannot decode image bytes"
+    assert client.post("/api/scan", content=b"").status_code == 400
+    assert client.get("/api/scan/unknown").status_code == 404
+
+
+def test_scan_rejects_oversized_upload(service, monkeypatch):
+    monkeypatch.setattr(main, "SCAN_MAX_BYTES", 8)
+    assert client.post("/api/scan", content=b"x" * 9).status_code == 413  # Content-Length
+    chunked = client.post("/api/scan", content=iter([b"xxxx", b"xxxx", b"x"]))  # no Content-Length
+    assert chunked.status_code == 413
+    assert client.post("/api/scan", content=iter([b"png"])).status_code == 200
+    assert service.pending == 0
+
+
+def test_scan_replaces_broken_pool():
+    svc = ScanService(worker=dying_worker, max_workers=1, max_queue=1)
+    app.dependency_overrides[get_scan_service] = lambda: svc
+    try:
+        assert client.post("/api/scan", content=b"png").status_code == 200
+        broken = svc.executor
+        assert client.post("/api/scan", content=b"die").status_code == 503
+        r = client.post("/api/scan", content=b"png")
+        assert r.status_code == 200 and r.json()["result"]["ocr"]["text"] == "png"
+        assert svc.executor is not broken
+    finally:
+        app.dependency_overrides.clear()
+        svc.shutdown()
+
+
+def test_thread_limits_apply_only_in_workers():
+    import sys
+
+    from app import scan
+
+    path, omp = list(sys.path), os.environ.get("OMP_THREAD_LIMIT")
+    svc = ScanService(worker=thread_limit_worker, max_workers=2)
+    try:
+        assert int(svc.submit(b"png").future.result(timeout=30)) >= 1
+    finally:
+        svc.shutdown()
+    assert sys.path == path and os.environ.get("OMP_THREAD_LIMIT") == omp
+    assert not any(p in sys.path for p in scan._tool_paths())
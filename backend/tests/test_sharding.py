@@ -0,0 +1,60 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import db
+from app.main import app, clear_entitlements_cache
+from app.reshard import reshard
+from app.snapshot import SnapshotReader, export_snapshot
+
+
+client = TestClient(app)
+USERS = [f"user{i:03d}" for i in range(40)]
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(db, "DB_SHARDS", 4)
+    db.init_db()
+    for i, user in enumerate(USERS):
+        client.post("/api/mock/purchase", json={"userId": user, "tier": "ANGEL" if i % 2 else "REVOLUTION"})
+        client.post("/api/verify-identity", json={"userId": user, "vendor": "ONFIDO", "token": f"t{i}"})
+    clear_entitlements_cache()
+
+
+def _rows(shards: int) -> dict:
+    out = {}
+    for index, conn in enumerate(db.iter_conns(shards)):
+        for row in conn.execute("SELECT user_id, tier FROM user_entitlements"):
+            assert db.shard_for(row["user_id"], shards) == index
+            out[row["user_id"]] = row["tier"]
+    return out
+
+
+def test_users_are_routed_by_stable_hash(sharded):
+    rows = _rows(4)
+    assert len(rows) == len(USERS)
+    assert len({db.shard_for(u, 4) for u in USERS}) == 4
+    r = client.get("/api/user/entitlements", params={"userId": "user001"})
+    assert r.json()["tier"] == "ANGEL"
+    with pytest.raises(ValueError):
+        db.get_conn()
+
+
+def test_snapshot_covers_all_shards(sharded, tmp_path):
+    path = tmp_path / "entitlements.snap"
+    assert export_snapshot(path)["count"] == len(USERS)
+    assert SnapshotReader(path).tier("user002") == "REVOLUTION"
+
+
+@pytest.mark.parametrize("target", [1, 2, 8])
+def test_reshard_preserves_rows(sharded, monkeypatch, target):
+    before = _rows(4)
+    stats = reshard(target)
+    assert stats["rows"] == {"user_entitlements": len(USERS), "identity_verifications": len(USERS)}
+    assert _rows(target) == before
+
+    monkeypatch.setattr(db, "DB_SHARDS", target)
+    clear_entitlements_cache()
+    assert client.get("/api/user/entitlements", params={"userId": "user003"}).json()["tier"] == "ANGEL"
+    with pytest.raises(ValueError):
+        reshard(4, target)
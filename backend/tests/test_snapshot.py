@@ -0,0 +1,72 @@
+from fastapi.testclient import TestClient
+
+from app import snapshot
+from app.main import app
+from app.models import UserTier
+from app.snapshot import SnapshotReader, export_snapshot
+
+
+client = TestClient(app)
+
+
+def test_tier_codes_match_model():
+    assert set(snapshot.TIERS) == {t.value for t in UserTier}
+
+
+def test_export_and_lookup(tmp_path):
+    for i in range(50):
+        tier = "ANGEL" if i % 2 else "REVOLUTION"
+        client.post("/api/mock/purchase", json={"userId": f"user{i:03d}", "tier": tier})
+    path = tmp_path / "entitlements.snap"
+    stats = export_snapshot(path)
+    assert stats["count"] == 50
+    assert stats["bytes"] == snapshot.HEADER.size + 50 * snapshot.RECORD.size
+
+    reader = SnapshotReader(path)
+    assert len(reader) == 50
+    assert reader.get("user001") == ("ANGEL", 1)
+    assert reader.get("user002") == ("REVOLUTION", 1)
+    assert reader.get("nobody") is None
+    assert reader.tier("nobody") == "LITE"
+
+
+def test_reader_remaps_new_generation(tmp_path):
+    path = tmp_path / "entitlements.snap"
+    client.post("/api/mock/purchase", json={"userId": "u123", "tier": "ANGEL"})
+    export_snapshot(path)
+    reader = SnapshotReader(path, check_interval_s=0)
+    assert reader.tier("u123") == "ANGEL"
+
+    client.post("/api/mock/purchase", json={"userId": "u123", "tier": "REVOLUTION"})
+    export_snapshot(path)
+    export_snapshot(path)
+    assert reader.get("u123") == ("REVOLUTION", 2)
+    # Older generations are pruned (keep=2); the pointer names the newest.
+    assert len(snapshot._generations(path)) == 2
+
+
+def test_reader_keeps_last_good_generation(tmp_path):
+    path = tmp_path / "entitlements.snap"
+    client.post("/api/mock/purchase", json={"userId": "u123", "tier": "ANGEL"})
+    export_snapshot(path)
+    reader = SnapshotReader(path, check_interval_s=0)
+    good = path.read_text(encoding="utf-8")
+
+    path.write_text("entitlements.snap.missing", encoding="utf-8")
+    assert reader.get("u123") == ("ANGEL", 1)
+    assert "FileNotFoundError" in reader.last_error
+    (tmp_path / "entitlements.snap.garbage").write_bytes(b"not a snapshot" * 10)
+    path.write_text("entitlements.snap.garbage", encoding="utf-8")
+    assert reader.tier("u123") == "ANGEL"
+    assert "ValueError" in reader.last_error
+    (tmp_path / "entitlements.snap.short").write_bytes(b"VG")
+    path.write_text("entitlements.snap.short", encoding="utf-8")
+    assert reader.tier("u123") == "ANGEL"
+    path.unlink()
+    assert reader.tier("u123") == "ANGEL"
+
+    path.write_text(good, encoding="utf-8")  # the exporter recovers: picked up at the next check
+    client.post("/api/mock/purchase", json={"userId": "u123", "tier": "REVOLUTION"})
+    export_snapshot(path)
+    assert reader.get("u123") == ("REVOLUTION", 2)
+    assert reader.last_error is None
@@ -1,5 +1,9 @@
 """
 Generate OCR_PROCESSING_REPORT.md in the VaultGuard working directory.
+
+Figures come from the processing index (processing_index.py) maintained by the OCR and analyzer
+runs, so the report costs the same for ten images or a million. For results produced before the
+index existed, run `python processing_index.py --rebuild` once.
 """
 
 from __future__ import annotations
@@ -7,43 +11,45 @@ from __future__ import annotations
 import os
 from datetime import datetime
 
+from processing_index import load_index, summarize, vault_dir
+
+
+def _fmt(value, suffix: str = "") -> str:
+    return "-" if value is None else f"{value}{suffix}"
+
+
+def _kind_lines(title: str, k: dict) -> list[str]:
+    lines = [f"## {title}"]
+    lines.append(f"- Procesate: **{k['count']}**")
+    rate = None if k["error_rate"] is None else round(k["error_rate"] * 100, 2)
+    lines.append(f"- Erori: **{k['errors']}** (rată {_fmt(rate, '%')})")
+    lines.append(f"- Timp mediu de procesare: **{_fmt(k['avg_s'], ' s')}**")
+    lines.append("")
+    if k["days"]:
+        lines.append("| Zi | Imagini | Erori | Timp mediu (s) |")
+        lines.append("|---|---:|---:|---:|")
+        lines.extend(f"| {d['day']} | {d['count']} | {d['errors']} | {_fmt(d['avg_s'])} |" for d in reversed(k["days"]))
+        lines.append("")
+    return lines
 
-def main() -> int:
-    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
-    # NOTE: this script is meant to be copied into %USERPROFILE%\\vaultguard\\ocr and run there.
-    # When running from repo tools/, compute vaultguard dir via USERPROFILE.
-    userprofile = os.environ.get("USERPROFILE")
-    if userprofile:
-        vault = os.path.join(userprofile, "vaultguard")
-    else:
-        vault = root
-
-    test_dir = os.path.join(vault, "test_images")
-    res_dir = os.path.join(vault, "ocr_results")
-    report_path = os.path.join(vault, "OCR_PROCESSING_REPORT.md")
 
-    imgs = []
-    if os.path.isdir(test_dir):
-        imgs = [f for f in os.listdir(test_dir) if f.lower().endswith((".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"))]
-        imgs.sort()
+def main() -> int:
+    # Same working directory the index lives in (USERPROFILE, else the installed layout).
+    vault = vault_dir()
 
-    outs = []
-    if os.path.isdir(res_dir):
-        outs = [f for f in os.listdir(res_dir) if f.lower().endswith(".txt")]
-        outs.sort()
+    report_path = os.path.join(vault, "OCR_PROCESSING_REPORT.md")
+    stats = summarize(load_index())
 
     lines: list[str] = []
     lines.append("# RAPORT PROCESARE OCR VAULTGUARD")
     lines.append(f"Data generării: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append(f"Index actualizat: {_fmt(stats['updated'])}")
     lines.append("")
-    lines.append(f"Total imagini în `test_images/`: **{len(imgs)}**")
-    lines.append(f"Total rezultate în `ocr_results/`: **{len(outs)}**")
-    lines.append("")
-    lines.append("## Imagini")
-    lines.extend([f"- {x}" for x in imgs] or ["- (none)"])
-    lines.append("")
-    lines.append("## Rezultate")
-    lines.extend([f"- {x}" for x in outs] or ["- (none)"])
+    lines.extend(_kind_lines("OCR (`ocr_results/`)", stats["ocr"]))
+    lines.extend(_kind_lines("Analiză securitate (`security_results/`)", stats["analysis"]))
+    lines.append("## Distribuție scor securitate")
+    scores = stats["analysis"]["scores"]
+    lines.extend([f"- {score}%: {n}" for score, n in scores.items()] or ["- (none)"])
     lines.append("")
     lines.append("## Status componente")
     lines.append("- ✅ Python: OK")
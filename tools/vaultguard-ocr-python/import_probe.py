@@ -0,0 +1,54 @@
+"""
+VAULTGUARD IMPORT PROBE
+
+Startup-cost probes used by the test_startup.py checks of both tools: the cumulative import time
+of a module (as reported by -X importtime) and which deferred heavy modules a snippet leaves
+loaded. Every probe runs in a fresh interpreter, so nothing the caller imported counts.
+
+Usage:
+  python import_probe.py <module> [folder]
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ("cv2", "numpy", "PIL", "pytesseract")
+
+
+def import_time_ms(module: str, cwd: str | None = None) -> float:
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    subprocess.run(cmd, cwd=cwd, capture_output=True, check=True)  # warm the bytecode cache
+    proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=True)
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000.0
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def loaded_modules(
+    code: str, modules: tuple[str, ...] = HEAVY_MODULES, cwd: str | None = None, env: dict | None = None
+) -> list[str]:
+    """Which of `modules` are in sys.modules after running `code`."""
+    probe = f"{code}\nimport sys\nprint('LOADED:' + ','.join(m for m in {tuple(modules)!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", probe], cwd=cwd, capture_output=True, text=True, check=True, env=env)
+    line = [ln for ln in proc.stdout.splitlines() if ln.startswith("LOADED:")][-1]
+    return [m for m in line[len("LOADED:") :].split(",") if m]
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) < 2:
+        print("Usage: python import_probe.py <module> [folder]")
+        return 1
+    module = argv[1]
+    cwd = argv[2] if len(argv) >= 3 else os.getcwd()
+    print(f"import {module}: {import_time_ms(module, cwd):.1f} ms")
+    print(f"heavy modules loaded: {', '.join(loaded_modules(f'import {module}', cwd=cwd)) or '(none)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,331 @@
+"""
+VAULTGUARD OCR BENCHMARK
+
+Reproducible throughput + accuracy benchmark on a synthetic corpus.
+
+--generate renders a seeded corpus of Windows-Security-style panels with create_demo_image,
+varying size, light/dark theme, font scale, noise and English/Romanian wording, and stores the
+rendering settings plus the true status of every security setting in ground_truth.json.
+--small renders thumbnail-sized cards instead (the workload the "atlas" backend is for).
+
+--run pushes the corpus through every preprocessing mode (default / windows_security, regular
+and low-memory) and OCR backend ("tesseract": one extract call per image; "atlas": the whole
+corpus through extract_text_atlas, one Tesseract call per page), and writes one machine-readable JSON report with images/sec,
+per-stage and per-step latency percentiles, peak RSS and SecuritySettingsParser accuracy against the ground
+truth. Each configuration runs in a fresh worker process so peak RSS is per configuration.
+
+Usage:
+  python ocr_benchmark.py --generate <corpus_dir> [--count 40] [--seed 1234] [--small]
+  python ocr_benchmark.py --run <corpus_dir> [--out benchmark.json] [--modes default,windows_security]
+                          [--backends tesseract,atlas]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+from ocr_engine import create_demo_image
+
+SETTINGS = ["firewall", "antivirus", "windows_update", "password_policy", "backup", "bitlocker", "uac"]
+
+# (label, secure status word, insecure status word) per language; wording follows the parser rules.
+LINE_TEMPLATES = {
+    "en": {
+        "firewall": ("Windows Defender Firewall", "ON", "OFF"),
+        "antivirus": ("Antivirus protection", "UP TO DATE", "DISABLED"),
+        "windows_update": ("Windows Update", "AUTOMATIC", "MANUAL"),
+        "password_policy": ("Password policy", "STRONG", "WEAK"),
+        "backup": ("Backup", "ON", "OFF"),
+        "bitlocker": ("BitLocker", "ENCRYPTED", "UNENCRYPTED"),
+        "uac": ("User Account Control (UAC)", "ALWAYS NOTIFY", "NEVER NOTIFY"),
+    },
+    "ro": {
+        "firewall": ("Firewall", "ACTIVAT", "OPRIT"),
+        "antivirus": ("Antivirus", "ACTUALIZAT", "OPRIT"),
+        "windows_update": ("Windows Update", "AUTOMAT", "OPRIT"),
+        # ASCII spelling: the fallback font has no glyph for "ă"; the parser accepts both forms.
+        "password_policy": ("Parola", "PUTERNICA", "SLABA"),
+        "backup": ("Backup", "AUTOMAT", "OPRIT"),
+        "bitlocker": ("BitLocker", "ACTIVAT", "OPRIT"),
+        "uac": ("UAC", "NOTIFICARE", "OPRIT"),
+    },
+}
+TITLES = {"en": "Windows Security", "ro": "Securitate Windows"}
+SIZES = [(1100, 500), (1366, 768), (1920, 1080), (800, 600)]
+SMALL_SIZES = [(360, 240), (420, 260), (480, 280)]
+MODES = ["default", "windows_security"]
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    v = sorted(values)
+
+    def pct(p: float) -> float:
+        return v[min(len(v) - 1, int(round(p / 100.0 * (len(v) - 1))))]
+
+    return {
+        "count": len(v),
+        "mean_ms": round(sum(v) / len(v) * 1000, 2),
+        "p50_ms": round(pct(50) * 1000, 2),
+        "p90_ms": round(pct(90) * 1000, 2),
+        "p99_ms": round(pct(99) * 1000, 2),
+        "max_ms": round(v[-1] * 1000, 2),
+    }
+
+
+def generate_corpus(out_dir: str, count: int = 40, seed: int = 1234, small: bool = False) -> dict:
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    images = []
+    for i in range(count):
+        language = rng.choice(["en", "ro"])
+        settings = {name: rng.choice(["secure", "insecure"]) for name in SETTINGS}
+        lines = [TITLES[language]]
+        for name in SETTINGS:
+            label, good, bad = LINE_TEMPLATES[language][name]
+            lines.append(f"{label}: {good if settings[name] == 'secure' else bad}")
+        size = rng.choice(SMALL_SIZES if small else SIZES)
+        # Keep all lines on the canvas: 7 settings + title at 55 px * scale each.
+        font_scale = round(min(rng.uniform(0.6, 1.4), (size[1] - 40) / (55 * len(lines))), 2)
+        spec = {
+            "file": f"synthetic_{i:05d}.png",
+            "width": size[0],
+            "height": size[1],
+            "theme": rng.choice(["light", "dark"]),
+            "font_scale": font_scale,
+            "noise": rng.choice([0.0, 0.0, 0.02, 0.05]),
+            "language": language,
+            "settings": settings,
+        }
+        create_demo_image(
+            os.path.join(out_dir, spec["file"]),
+            lines=lines,
+            size=size,
+            theme=spec["theme"],
+            font_scale=font_scale,
+            noise=spec["noise"],
+            cards=True,
+            seed=seed + i,
+        )
+        images.append(spec)
+    # No timestamp: the same seed must give a byte-identical corpus.
+    truth = {
+        "seed": seed,
+        "count": count,
+        "small": small,
+        "images": images,
+    }
+    with open(os.path.join(out_dir, "ground_truth.json"), "w", encoding="utf-8") as f:
+        json.dump(truth, f, indent=2, ensure_ascii=False)
+    return truth
+
+
+def _import_parser():
+    import ocr_engine
+
+    return ocr_engine.import_security_parser().SecuritySettingsParser()
+
+
+def _run_tesseract(path: str, mode: str, low_memory: bool) -> tuple[dict, dict]:
+    """One image through the regular engine; returns (ocr result, stage timings in seconds)."""
+    import ocr_engine
+
+    engine_mode = None if mode == "default" else mode
+    spans = ocr_engine.Spans()
+    t0 = time.perf_counter()
+    with ocr_engine.measure_rss() as mem:
+        if engine_mode == "windows_security":
+            arr = ocr_engine.enhanced_preprocess_for_windows_security(path, low_memory=low_memory, spans=spans)
+        else:
+            arr = ocr_engine.preprocess_cv(path, low_memory=low_memory, spans=spans)
+    t1 = time.perf_counter()
+    res = ocr_engine.ocr_preprocessed(arr, mode=engine_mode, spans=spans)
+    t2 = time.perf_counter()
+    res.update(mem)
+    return res, {"preprocess": t1 - t0, "ocr": t2 - t1}
+
+
+def _run_atlas(paths: list[str], mode: str, low_memory: bool) -> list[tuple[dict, dict]]:
+    """All images through extract_text_atlas at once; per-image stage timings are each image's share."""
+    import ocr_engine
+
+    engine_mode = None if mode == "default" else mode
+    out = []
+    for res in ocr_engine.extract_text_atlas(paths, mode=engine_mode, low_memory=low_memory):
+        ms = res["timings_ms"]
+        ocr_ms = sum(v for k, v in ms.items() if k.startswith(("atlas_", "tesseract", "lang_detect")))
+        out.append((res, {"preprocess": (sum(ms.values()) - ocr_ms) / 1000.0, "ocr": ocr_ms / 1000.0}))
+    return out
+
+
+BACKENDS = {"tesseract": _run_tesseract}
+# Batch backends take every path at once and return (result, timings) per image, in order.
+BATCH_BACKENDS = {"atlas": _run_atlas}
+
+
+def _score(analysis: dict, truth: dict) -> tuple[int, int, int]:
+    """(correct, detected, total) settings for one image."""
+    settings = analysis.get("settings") or {}
+    correct = detected = 0
+    for name, expected in truth.items():
+        got = settings.get(name) or {}
+        detected += 1 if got.get("detected") else 0
+        correct += 1 if got.get("status") == expected else 0
+    return correct, detected, len(truth)
+
+
+def run_config(corpus_dir: str, mode: str, low_memory: bool, backend: str, limit: int | None = None) -> dict:
+    import ocr_engine
+
+    with open(os.path.join(corpus_dir, "ground_truth.json"), "r", encoding="utf-8") as f:
+        truth = json.load(f)
+    specs = truth["images"][:limit] if limit else truth["images"]
+    parser = _import_parser()
+    paths = [os.path.join(corpus_dir, spec["file"]) for spec in specs]
+
+    stages: dict[str, list[float]] = {"preprocess": [], "ocr": [], "parse": [], "total": []}
+    spans = ocr_engine.TimingAggregate()
+    correct = detected = total = exact = 0
+    errors = []
+    image_peaks: list[float] = []
+    start = time.perf_counter()
+    batch = batch_error = None
+    if backend in BATCH_BACKENDS:
+        try:
+            batch = iter(BATCH_BACKENDS[backend](paths, mode, low_memory))
+        except Exception as e:
+            batch_error = str(e) or type(e).__name__
+    for spec, path in zip(specs, paths):
+        if batch_error is not None:
+            # The whole batch failed: every image it covered is an error, the config still reports.
+            errors.append({"file": spec["file"], "error": batch_error})
+            continue
+        t0 = time.perf_counter()
+        try:
+            res, timings = next(batch) if batch is not None else BACKENDS[backend](path, mode, low_memory)
+            t1 = time.perf_counter()
+            analysis = parser.parse_text(res.get("text") or "")
+        except Exception as e:
+            errors.append({"file": spec["file"], "error": str(e) or type(e).__name__})
+            continue
+        t2 = time.perf_counter()
+        for name, dt in timings.items():
+            stages.setdefault(name, []).append(dt)
+        stages["parse"].append(t2 - t1)
+        # Batch backends did their work up front; their per-image total is the share plus parsing.
+        stages["total"].append(t2 - t0 if batch is None else sum(timings.values()) + (t2 - t1))
+        spans.add(res.get("timings_ms"))
+        if res.get("peak_rss_mb") is not None:
+            image_peaks.append(res["peak_rss_mb"])
+        c, d, n = _score(analysis, spec["settings"])
+        correct, detected, total = correct + c, detected + d, total + n
+        exact += 1 if c == n else 0
+    wall = time.perf_counter() - start
+    done = len(specs) - len(errors)
+    return {
+        "backend": backend,
+        "mode": mode,
+        "low_memory": low_memory,
+        "images": done,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "images_per_s": round(done / wall, 3) if wall > 0 else None,
+        "stage_latency": {name: _percentiles(v) for name, v in stages.items() if v},
+        # Per-step breakdown (decode, clahe, tesseract, ...) from the engine's timing spans.
+        "span_latency": spans.summary(),
+        # Each configuration runs in its own process, so this is that configuration's peak.
+        "process_peak_rss_mb": ocr_engine.peak_rss_mb(),
+        # Per-image preprocessing peaks (Linux only; see ocr_engine.measure_rss).
+        "image_peak_rss_mb": {"p50": sorted(image_peaks)[len(image_peaks) // 2], "max": max(image_peaks)} if image_peaks else None,
+        "accuracy": {
+            "settings_total": total,
+            "settings_detected": round(detected / total, 4) if total else None,
+            "settings_correct": round(correct / total, 4) if total else None,
+            "images_all_correct": round(exact / done, 4) if done else None,
+        },
+    }
+
+
+def run_benchmark(
+    corpus_dir: str,
+    modes: list[str] | None = None,
+    backends: list[str] | None = None,
+    limit: int | None = None,
+) -> dict:
+    from concurrent.futures import ProcessPoolExecutor
+
+    configs = []
+    for backend in backends or [*BACKENDS, *BATCH_BACKENDS]:
+        for mode in modes or MODES:
+            for low_memory in (False, True):
+                # Fresh process per configuration: ru_maxrss/peak working set is per-process.
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    configs.append(pool.submit(run_config, corpus_dir, mode, low_memory, backend, limit).result())
+    with open(os.path.join(corpus_dir, "ground_truth.json"), "r", encoding="utf-8") as f:
+        truth = json.load(f)
+    return {
+        "benchmark_date": datetime.now().isoformat(timespec="seconds"),
+        "corpus": os.path.abspath(corpus_dir),
+        "corpus_seed": truth.get("seed"),
+        "corpus_count": truth.get("count"),
+        "corpus_small": truth.get("small", False),
+        "cpu_count": os.cpu_count(),
+        "configs": configs,
+    }
+
+
+def _opt(args: list[str], flag: str, default: str | None = None) -> str | None:
+    if flag in args:
+        i = args.index(flag)
+        return args[i + 1] if i + 1 < len(args) else default
+    return default
+
+
+def main(argv: list[str]) -> int:
+    args = argv[1:]
+    if len(args) >= 2 and args[0] == "--generate":
+        truth = generate_corpus(
+            args[1],
+            count=int(_opt(args, "--count", "40")),
+            seed=int(_opt(args, "--seed", "1234")),
+            small="--small" in args,
+        )
+        print(f"✅ Generated {truth['count']} images in {args[1]} (seed {truth['seed']})")
+        return 0
+    if len(args) >= 2 and args[0] == "--run":
+        import ocr_engine
+
+        if not ocr_engine.ensure_tesseract_configured():
+            print("❌ Tesseract not configured / not installed.")
+            return 2
+        modes = _opt(args, "--modes")
+        backends = _opt(args, "--backends")
+        limit = _opt(args, "--limit")
+        report = run_benchmark(
+            args[1],
+            modes=modes.split(",") if modes else None,
+            backends=backends.split(",") if backends else None,
+            limit=int(limit) if limit else None,
+        )
+        out = _opt(args, "--out", os.path.join(args[1], "benchmark.json"))
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        for c in report["configs"]:
+            print(
+                f"{c['backend']:<10} {c['mode']:<17} low_mem={str(c['low_memory']):<5} "
+                f"{c['images_per_s']} img/s  acc={c['accuracy']['settings_correct']}  rss={c['process_peak_rss_mb']}MB"
+            )
+        print(out)
+        return 0
+    print("Usage: python ocr_benchmark.py --generate <corpus_dir> [--count N] [--seed S] | --run <corpus_dir> [--out file.json]")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -5,19 +5,57 @@ VAULTGUARD OCR ENGINE (Windows MVP)
 - Batch processes a folder of images
 - Saves results to: <vaultguard_root>/ocr_results/
 
+Startup is kept cheap: cv2/numpy/PIL/pytesseract are imported on first use and a successful
+Tesseract discovery is kept for the rest of the process.
+
+Profiling: results carry per-step "timings_ms"; VAULTGUARD_PROFILE_EVERY=N additionally dumps a
+cProfile of every Nth image to VAULTGUARD_PROFILE_DIR.
+
+In-memory input: extract_text and the preprocess functions take a file path, encoded image bytes
+(bytes/bytearray/memoryview, e.g. an upload body) or an already decoded numpy array (BGR, BGRA or
+grayscale), so callers never need a temp file.
+
+Language: lang="auto" (or VAULTGUARD_OCR_LANG=auto for the default) runs a fast "eng" pass and
+retries with "ron+eng" only when the text looks Romanian (diacritics or Romanian status words);
+the chosen language is reported with the result and remembered for the rest of the process per
+file (path, size, mtime) or per cache_key a caller passes (e.g. a content hash it already has).
+
+Large captures: VAULTGUARD_OCR_LOW_MEMORY=1 switches preprocessing to a grayscale, in-place,
+strip-based path sized for VAULTGUARD_OCR_MEMORY_BUDGET_MB (default 256); results then carry
+the chosen plan under "memory". The budget caps the planned image working memory: an image
+that would exceed it even at 1/8 resolution is refused with ValueError (it does not limit the
+interpreter/OpenCV baseline). Every result reports the measured "peak_rss_mb" of that image
+(Linux; None elsewhere), "rss_delta_mb" and the lifetime "process_peak_rss_mb".
+
+Many small inputs (cropped cards, thumbnails): extract_text_atlas stacks the preprocessed images
+into tall "atlas" pages with blank separators, runs one Tesseract call per page and splits the
+recognized words back per image by their y coordinate, so the per-call Tesseract startup is paid
+once per page instead of once per image.
+
+CLI runs count every image (time, errors) in the processing index (processing_index.py) that
+generate_report.py reads.
+
 Usage:
+  python ocr_engine.py --help
   python ocr_engine.py <image_path>
   python ocr_engine.py <folder_path>
   python ocr_engine.py --demo <output_folder>
   python ocr_engine.py --improve <folder_path>
+  python ocr_engine.py --keyword-stats <ocr_results_folder>
 """
 
 from __future__ import annotations
 
+import json
 import os
+import re
 import sys
+import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
+from functools import lru_cache
 
 
 SECURITY_KEYWORDS = [
@@ -52,7 +90,10 @@ def default_tesseract_path() -> str:
     return r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 
-def configure_tesseract() -> tuple[bool, str]:
+_tesseract_found: tuple[bool, str] | None = None
+
+
+def _discover_tesseract() -> tuple[bool, str]:
     try:
         import pytesseract  # noqa: F401
     except Exception as e:  # pragma: no cover
@@ -69,6 +110,27 @@ def configure_tesseract() -> tuple[bool, str]:
         return False, f"tesseract configure failed: {e}"
 
 
+def configure_tesseract() -> tuple[bool, str]:
+    """
+    Point pytesseract at the Tesseract binary. A successful lookup (pytesseract import + path
+    check) is memoized per process; a failed one is retried on the next call, so installing
+    Tesseract or fixing VAULTGUARD_TESSERACT_PATH takes effect without a restart. Call
+    reset_tesseract_config() after pointing VAULTGUARD_TESSERACT_PATH at another binary.
+    """
+    global _tesseract_found
+    if _tesseract_found is not None:
+        return _tesseract_found
+    found = _discover_tesseract()
+    if found[0]:
+        _tesseract_found = found
+    return found
+
+
+def reset_tesseract_config():
+    global _tesseract_found
+    _tesseract_found = None
+
+
 def ensure_tesseract_configured() -> bool:
     """
     Ensure pytesseract has a usable tesseract_cmd even when this module is imported and used as a library.
@@ -77,122 +139,706 @@ def ensure_tesseract_configured() -> bool:
     return bool(ok)
 
 
-def preprocess_cv(image_path: str):
+# --- instrumentation ----------------------------------------------------------------------
+#
+# Every result carries "timings_ms": named wall-clock spans (decode, grayscale, denoise, clahe,
+# upscale, invert, contour_mask, binarize, morphology, to_pil, tesseract, cleanup; the analyzer
+# adds parse/write). TimingAggregate folds them over a batch in constant memory.
+#
+# Opt-in sampling profiler: VAULTGUARD_PROFILE_EVERY=N profiles every Nth call of each
+# instrumented entry point with cProfile and dumps it to VAULTGUARD_PROFILE_DIR
+# (default: <tmp>/vaultguard_profiles); the file path is returned under "profile".
+
+
+class Spans:
+    """Named wall-clock spans for one image, in seconds; repeated names accumulate."""
+
+    def __init__(self):
+        self.times: dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def merge(self, times_ms: dict | None):
+        for name, ms in (times_ms or {}).items():
+            self.times[name] = self.times.get(name, 0.0) + ms / 1000.0
+
+    def as_ms(self) -> dict:
+        return {name: round(t * 1000.0, 3) for name, t in self.times.items()}
+
+
+class _NoSpans:
+    _null = nullcontext()
+
+    def span(self, name: str):
+        return self._null
+
+
+NO_SPANS = _NoSpans()
+
+
+class TimingAggregate:
+    """
+    Batch aggregate of per-image "timings_ms" dicts: count/total/mean/max per span plus p50/p95
+    from a log-bucketed histogram (5% resolution), so memory does not grow with the batch size.
+    """
+
+    _BASE_MS = 0.01
+    _GROWTH = 1.05
+
+    def __init__(self):
+        self.spans: dict[str, dict] = {}
+
+    def add(self, timings_ms: dict | None):
+        import math
+
+        for name, ms in (timings_ms or {}).items():
+            st = self.spans.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "hist": {}})
+            st["count"] += 1
+            st["total_ms"] += ms
+            st["max_ms"] = max(st["max_ms"], ms)
+            b = 0 if ms <= self._BASE_MS else int(math.log(ms / self._BASE_MS, self._GROWTH)) + 1
+            st["hist"][b] = st["hist"].get(b, 0) + 1
+
+    def _percentile(self, st: dict, p: float) -> float:
+        rank = p / 100.0 * st["count"]
+        seen = 0
+        for b in sorted(st["hist"]):
+            seen += st["hist"][b]
+            if seen >= rank:
+                return min(st["max_ms"], self._BASE_MS * self._GROWTH**b)
+        return st["max_ms"]
+
+    def summary(self) -> dict:
+        return {
+            name: {
+                "count": st["count"],
+                "total_ms": round(st["total_ms"], 3),
+                "mean_ms": round(st["total_ms"] / st["count"], 3),
+                "p50_ms": round(self._percentile(st, 50), 3),
+                "p95_ms": round(self._percentile(st, 95), 3),
+                "max_ms": round(st["max_ms"], 3),
+            }
+            for name, st in sorted(self.spans.items(), key=lambda kv: -kv[1]["total_ms"])
+        }
+
+
+def aggregate_timings(results) -> dict:
+    agg = TimingAggregate()
+    for r in results:
+        agg.add(r.get("timings_ms"))
+    return agg.summary()
+
+
+PROFILE_EVERY = int(os.environ.get("VAULTGUARD_PROFILE_EVERY", "0") or 0)
+_profile_calls: dict[str, int] = {}
+# OCR runs on threads too: the counters and the one active profiler are shared under this lock
+# (cProfile allows a single active profiler per process on Python 3.12+).
+_profile_lock = threading.Lock()
+_profile_active = False
+
+
+@contextmanager
+def maybe_profile(label: str, every: int | None = None):
+    """
+    Sampling profiler hook: profiles every Nth call per label in this process. Yields a dict
+    that receives "profile" (the .prof path) when this call was sampled. A call due while
+    another profile is running is not sampled.
+    """
+    global _profile_active
+    every = PROFILE_EVERY if every is None else every
+    info: dict = {}
+    with _profile_lock:
+        n = _profile_calls[label] = _profile_calls.get(label, 0) + 1
+        sample = every > 0 and n % every == 0 and not _profile_active
+        if sample:
+            _profile_active = True
+    if not sample:
+        yield info
+        return
+
+    import cProfile
+    import tempfile
+
+    try:
+        out_dir = os.environ.get("VAULTGUARD_PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "vaultguard_profiles")
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, f"{label}_{os.getpid()}_{n:06d}.prof")
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:  # a profiler outside this hook is active (Python 3.12+)
+            yield info
+            return
+        try:
+            yield info
+        finally:
+            prof.disable()
+            prof.dump_stats(path)
+            info["profile"] = path
+    finally:
+        with _profile_lock:
+            _profile_active = False
+
+
+def _is_path(image) -> bool:
+    return isinstance(image, (str, os.PathLike))
+
+
+def _is_decoded(image) -> bool:
+    """True for an already decoded pixel array (2-D gray or 3-D color), as opposed to encoded bytes."""
+    return getattr(image, "ndim", 0) in (2, 3)
+
+
+def decode_image(data, flags: int | None = None):
+    """
+    Decode an encoded image (PNG/JPG/...) held in memory into a BGR array (or whatever `flags`
+    asks for). `data` is any bytes-like object: bytes, bytearray, memoryview or a 1-D uint8 array.
+    """
     import cv2
     import numpy as np
 
-    img = cv2.imread(image_path)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    img = cv2.imdecode(buf, cv2.IMREAD_COLOR if flags is None else flags)
     if img is None:
-        raise ValueError(f"Cannot read image: {image_path}")
+        raise ValueError("Cannot decode image bytes")
+    return img
+
+
+def load_image(image):
+    """
+    BGR array for any supported input: a file path, encoded bytes-like data, or a decoded array.
+    Decoded BGR arrays are returned as-is (preprocessing never writes to its input).
+    """
+    import cv2
+
+    if _is_path(image):
+        img = cv2.imread(os.fspath(image))
+        if img is None:
+            raise ValueError(f"Cannot read image: {image}")
+        return img
+    if _is_decoded(image):
+        if image.ndim == 2 or image.shape[2] == 1:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+        return image
+    return decode_image(image)
+
+
+def _preprocess_default(img, spans=NO_SPANS):
+    import cv2
+    import numpy as np
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    denoised = cv2.medianBlur(gray, 3)
+    with spans.span("grayscale"):
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    with spans.span("denoise"):
+        denoised = cv2.medianBlur(gray, 3)
 
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(denoised)
+    with spans.span("clahe"):
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        enhanced = clahe.apply(denoised)
 
     # Otsu binarization
-    _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    with spans.span("binarize"):
+        _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
     # Scale small images up a bit (helps screenshots with small fonts)
     h, w = binary.shape[:2]
     if max(h, w) < 1200:
         scale = 2.0
-        binary = cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        with spans.span("upscale"):
+            binary = cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
 
     # Light morphology to close small gaps
-    kernel = np.ones((2, 2), np.uint8)
-    binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
+    with spans.span("morphology"):
+        kernel = np.ones((2, 2), np.uint8)
+        binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
 
     return binary
 
 
-def enhanced_preprocess_for_windows_security(image_path: str):
-    """
-    Enhanced preprocessing for Windows Security screenshots:
-    - stronger contrast enhancement
-    - upscale for thin UI fonts
-    - invert if text is light-on-dark
-    - light edge/contour-based masking to focus on UI "cards"
-    """
+def _preprocess_windows_security(img, spans=NO_SPANS):
     import cv2
     import numpy as np
 
-    img = cv2.imread(image_path)
-    if img is None:
-        raise ValueError(f"Cannot read image: {image_path}")
-
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    with spans.span("grayscale"):
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
     # Upscale first to help thin fonts
     h, w = gray.shape[:2]
     if max(h, w) < 1600:
-        gray = cv2.resize(gray, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
+        with spans.span("upscale"):
+            gray = cv2.resize(gray, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
 
     # Contrast enhancement
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(gray)
+    with spans.span("clahe"):
+        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        enhanced = clahe.apply(gray)
 
     # If UI is dark mode (white text on dark background), invert for Tesseract.
-    if float(np.mean(enhanced)) < 110.0:
-        enhanced = cv2.bitwise_not(enhanced)
+    with spans.span("invert"):
+        if float(np.mean(enhanced)) < 110.0:
+            enhanced = cv2.bitwise_not(enhanced)
 
     # Mild denoise
-    enhanced = cv2.medianBlur(enhanced, 3)
+    with spans.span("denoise"):
+        enhanced = cv2.medianBlur(enhanced, 3)
 
     # Edge detection -> contours -> build a mask of likely text containers
-    edges = cv2.Canny(enhanced, 50, 150)
-    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    with spans.span("contour_mask"):
+        edges = cv2.Canny(enhanced, 50, 150)
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-    mask = np.zeros_like(enhanced)
-    for c in contours:
-        x, y, cw, ch = cv2.boundingRect(c)
-        # Heuristic: Windows UI cards/buttons sizes (after upscale)
-        if 250 < cw < 2000 and 60 < ch < 350:
-            cv2.rectangle(mask, (x, y), (x + cw, y + ch), 255, -1)
+        mask = np.zeros_like(enhanced)
+        for c in contours:
+            x, y, cw, ch = cv2.boundingRect(c)
+            # Heuristic: Windows UI cards/buttons sizes (after upscale)
+            if 250 < cw < 2000 and 60 < ch < 350:
+                cv2.rectangle(mask, (x, y), (x + cw, y + ch), 255, -1)
 
-    focused = cv2.bitwise_and(enhanced, enhanced, mask=mask) if int(np.sum(mask)) > 0 else enhanced
+        focused = cv2.bitwise_and(enhanced, enhanced, mask=mask) if int(np.sum(mask)) > 0 else enhanced
 
     # Binarize
-    _, binary = cv2.threshold(focused, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    with spans.span("binarize"):
+        _, binary = cv2.threshold(focused, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
     # Small morphology to connect broken strokes
-    kernel = np.ones((2, 2), np.uint8)
-    binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
+    with spans.span("morphology"):
+        kernel = np.ones((2, 2), np.uint8)
+        binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
 
     return binary
 
 
-def extract_text(
-    image_path: str,
-    lang: str = "ron+eng",
-    preprocess: bool = True,
-    mode: str | None = None,
-) -> dict:
-    import pytesseract
+# --- low-memory preprocessing -------------------------------------------------------------
+#
+# The regular path decodes full BGR and keeps several full-size intermediates alive, which on
+# 8K / multi-monitor captures costs hundreds of MB per worker. The low-memory path decodes
+# straight to grayscale (at reduced resolution if even that would not fit the budget), reuses that
+# one buffer for every step via dst=, and runs neighbourhood filters strip by strip so most
+# scratch memory is strip-sized (CLAHE needs at least three tile rows, see _clahe_in_strips).
+#
+# At full resolution the output matches the regular path's (test_low_memory.py forces strips),
+# except for rare +-1 CLAHE rounding and a documented corner case in windows_security card
+# detection; reduced decoding is a different resolution and therefore an approximate result.
+
+LOW_MEMORY_DEFAULT = os.environ.get("VAULTGUARD_OCR_LOW_MEMORY", "").lower() in ("1", "true", "yes")
+MEMORY_BUDGET_MB = float(os.environ.get("VAULTGUARD_OCR_MEMORY_BUDGET_MB", "256"))
+# Strip scratch ~= this many strip-sized copies (padded source, filter output, CLAHE/Canny temps).
+_STRIP_COPIES = 4
+
+
+_peak_floor_mb = 0.0  # lifetime peak before the last _reset_peak_rss
+
+
+def _win_memory_counters():
+    """PROCESS_MEMORY_COUNTERS of this process (Windows), or None."""
+    import ctypes
+    from ctypes import wintypes
+
+    class _Counters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = _Counters()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        return None
+    return counters
+
+
+def _proc_status_mb(field: str) -> float | None:
+    """A "<field>: N kB" line of /proc/self/status (Linux) in MB, or None."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def peak_rss_mb() -> float | None:
+    """
+    Peak resident set size of this process so far, in MB (None if unavailable). A lifetime
+    high-water mark: it never goes down, so it says nothing about a single image unless the
+    process did nothing else. measure_rss gives the per-image figure.
+    """
+    try:
+        if sys.platform == "win32":
+            counters = _win_memory_counters()
+            return None if counters is None else round(counters.PeakWorkingSetSize / (1024 * 1024), 1)
+
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes.
+        return max(_peak_floor_mb, round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1))
+    except Exception:  # pragma: no cover
+        return None
+
+
+def current_rss_mb() -> float | None:
+    """Resident set size of this process right now, in MB (None if unavailable, e.g. macOS)."""
+    try:
+        if sys.platform == "win32":
+            counters = _win_memory_counters()
+            return None if counters is None else round(counters.WorkingSetSize / (1024 * 1024), 1)
+    except Exception:  # pragma: no cover
+        return None
+    return _proc_status_mb("VmRSS")
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's peak-RSS counter (VmHWM) to the current RSS; Linux only."""
+    global _peak_floor_mb
+    # The reset also lowers ru_maxrss, so keep the lifetime peak for peak_rss_mb.
+    _peak_floor_mb = max(_peak_floor_mb, peak_rss_mb() or 0.0)
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def measure_rss():
+    """
+    Memory of this process across one image. Yields a dict that receives "peak_rss_mb" (the
+    highest RSS inside the block; Linux, where the peak counter can be reset, else None) and
+    "rss_delta_mb" (RSS after minus before; None where current RSS is unavailable). The peak
+    is process-wide, so images measured concurrently in one process share it; the Tesseract
+    subprocess is not included.
+    """
+    info: dict = {}
+    reset = _reset_peak_rss()
+    before = current_rss_mb()
+    try:
+        yield info
+    finally:
+        after = current_rss_mb()
+        info["peak_rss_mb"] = _proc_status_mb("VmHWM") if reset else None
+        info["rss_delta_mb"] = round(after - before, 1) if before is not None and after is not None else None
+
+
+def _image_size(image) -> tuple[int, int]:
+    """(width, height) from the image header, without decoding pixels."""
+    import io
+
     from PIL import Image
 
-    if not ensure_tesseract_configured():
-        raise RuntimeError("Tesseract not configured (tesseract.exe not found).")
+    if _is_decoded(image):
+        return image.shape[1], image.shape[0]
+    src = os.fspath(image) if _is_path(image) else io.BytesIO(image)
+    with Image.open(src) as im:
+        return im.size
 
-    start = time.time()
-    if preprocess:
-        if mode == "windows_security":
-            arr = enhanced_preprocess_for_windows_security(image_path)
+
+def plan_low_memory(width: int, height: int, budget_mb: float | None = None) -> dict:
+    """
+    Pick a decode reduction factor and strip height so grayscale buffer + strip scratch are
+    estimated to fit `budget_mb` (image working memory, on top of the interpreter/OpenCV
+    baseline). Reduced decoding (2/4/8) is a last resort, used only when the grayscale frame
+    alone would take more than 3/4 of the budget. "fits" is False when even 1/8 resolution with
+    minimal strips is estimated over budget; the low-memory path refuses such images.
+    """
+    budget = (budget_mb or MEMORY_BUDGET_MB) * 1024 * 1024
+    reduce = 1
+    while reduce < 8 and (width // reduce) * (height // reduce) > budget * 0.75:
+        reduce *= 2
+    w, h = max(1, width // reduce), max(1, height // reduce)
+    strip_rows = max(64, min(h, int((budget - w * h) / (w * _STRIP_COPIES))))
+    estimated = w * h + w * min(h, strip_rows) * _STRIP_COPIES
+    return {
+        "budget_mb": round(budget / (1024 * 1024), 1),
+        "reduce": reduce,
+        "width": w,
+        "height": h,
+        "strip_rows": strip_rows,
+        "estimated_mb": round(estimated / (1024 * 1024), 1),
+        "fits": estimated <= budget,
+    }
+
+
+def _read_gray(image, reduce: int = 1):
+    import cv2
+
+    if _is_decoded(image):
+        # Already in memory: convert (always a new buffer, so later in-place steps are safe).
+        if image.ndim == 2 or image.shape[2] == 1:
+            gray = image.reshape(image.shape[:2]).copy()
         else:
-            arr = preprocess_cv(image_path)
-        img = Image.fromarray(arr)
+            code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            gray = cv2.cvtColor(image, code)
+        if reduce > 1:
+            h, w = gray.shape
+            gray = cv2.resize(gray, (max(1, w // reduce), max(1, h // reduce)), interpolation=cv2.INTER_AREA)
+        return gray
+    flags = {1: cv2.IMREAD_GRAYSCALE, 2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4}
+    flag = flags.get(reduce, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if _is_path(image):
+        gray = cv2.imread(os.fspath(image), flag)
+        if gray is None:
+            raise ValueError(f"Cannot read image: {image}")
+        return gray
+    return decode_image(image, flag)
+
+
+def _filter_in_strips(img, fn, strip_rows: int, pad: int):
+    """
+    Replace `img` in place with fn(img), computed strip by strip. Each strip is filtered together
+    with `pad` rows of original context on both sides, so a neighbourhood filter of radius <= pad
+    gives the same result as on the full image while scratch stays strip-sized.
+    """
+    import numpy as np
+
+    h = img.shape[0]
+    if h <= strip_rows:
+        img[...] = fn(img)
+        return img
+    above = None  # original (unfiltered) rows just above the current strip
+    for y0 in range(0, h, strip_rows):
+        y1 = min(h, y0 + strip_rows)
+        below = img[y1 : min(h, y1 + pad)]
+        src = img[y0 : y1 + below.shape[0]] if above is None else np.vstack((above, img[y0 : y1 + below.shape[0]]))
+        next_above = img[max(y0, y1 - pad) : y1].copy() if y1 < h else None
+        out = fn(src)
+        off = 0 if above is None else above.shape[0]
+        img[y0:y1] = out[off : off + (y1 - y0)]
+        above = next_above
+    return img
+
+
+def _clahe_in_strips(gray, clip_limit: float, strip_rows: int):
+    """
+    In-place CLAHE on the same global 8x8 tile grid as the full-frame path, strip by strip.
+
+    Each strip is whole tile rows plus one tile row of context on each side (bilinear
+    interpolation reaches half a tile into the neighbours), padded the way OpenCV pads the full
+    frame (reflect-101 to a multiple of the grid), so every tile histogram matches
+    cv2.createCLAHE(...).apply(gray). Interpolation weights come from strip-local row numbers,
+    which can round differently in float: a few pixels per million may differ by 1. A strip's
+    output is written back only after the next strip has read its original rows as context. Scratch is therefore at least three tile
+    rows (3/8 of the frame) whatever strip_rows says.
+    """
+    import cv2
+    import numpy as np
+
+    h, w = gray.shape[:2]
+    if h <= strip_rows:
+        gray[...] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8)).apply(gray)
+        return gray
+    # OpenCV's padding rule: none if both sides divide by the grid, else pad both up (a side that
+    # already divides gets a whole extra grid step).
+    if h % 8 == 0 and w % 8 == 0:
+        hp, wp = h, w
     else:
-        img = Image.open(image_path)
+        hp, wp = h + 8 - h % 8, w + 8 - w % 8
+    tile_h = hp // 8
+    band = max(1, strip_rows // tile_h) * tile_h
+    tail = gray[[2 * (h - 1) - r for r in range(h, hp)]].copy()  # reflected rows below the frame
+
+    pending = None  # (y0, y1, output rows) not yet written back
+    for y0 in range(0, h, band):
+        y1 = min(h, y0 + band)
+        a = max(0, y0 - tile_h)
+        b = min(hp, (-(-y1 // tile_h) + 1) * tile_h)
+        src = gray[a : min(b, h)]
+        if b > h:
+            src = np.vstack((src, tail[: b - h]))
+        if wp > w:
+            src = cv2.copyMakeBorder(src, 0, 0, 0, wp - w, cv2.BORDER_REFLECT_101)
+        out = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, (b - a) // tile_h)).apply(src)
+        if pending is not None:
+            gray[pending[0] : pending[1]] = pending[2]
+        pending = (y0, y1, out[y0 - a : y1 - a, :w])
+    gray[pending[0] : pending[1]] = pending[2]
+    return gray
+
+
+def _close_in_strips(binary, strip_rows: int):
+    import cv2
+    import numpy as np
+
+    kernel = np.ones((2, 2), np.uint8)
+    return _filter_in_strips(
+        binary, lambda s: cv2.morphologyEx(s, cv2.MORPH_CLOSE, kernel, iterations=1), strip_rows, 2
+    )
+
+
+def _preprocess_default_low_memory(gray, strip_rows: int, spans=NO_SPANS):
+    import cv2
+
+    with spans.span("denoise"):
+        _filter_in_strips(gray, lambda s: cv2.medianBlur(s, 3), strip_rows, 1)
+    with spans.span("clahe"):
+        _clahe_in_strips(gray, 2.0, strip_rows)
+    # Otsu only needs the global histogram, so it runs in place on the whole buffer.
+    with spans.span("binarize"):
+        cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=gray)
+
+    h, w = gray.shape[:2]
+    if max(h, w) < 1200:
+        with spans.span("upscale"):
+            gray = cv2.resize(gray, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
+    with spans.span("morphology"):
+        return _close_in_strips(gray, strip_rows)
+
+
+def _preprocess_windows_security_low_memory(gray, strip_rows: int, spans=NO_SPANS):
+    import cv2
+    import numpy as np
+
+    h, w = gray.shape[:2]
+    if max(h, w) < 1600:
+        with spans.span("upscale"):
+            gray = cv2.resize(gray, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
+    h, w = gray.shape[:2]
+
+    with spans.span("clahe"):
+        _clahe_in_strips(gray, 3.0, strip_rows)
+    with spans.span("invert"):
+        if float(cv2.mean(gray)[0]) < 110.0:
+            cv2.bitwise_not(gray, dst=gray)
+    with spans.span("denoise"):
+        _filter_in_strips(gray, lambda s: cv2.medianBlur(s, 3), strip_rows, 1)
+
+    with spans.span("contour_mask"):
+        # Card detection per strip. Strips overlap by the max card height so a card is always
+        # fully inside at least one strip; duplicate rectangles are harmless. Contours touching a
+        # cut edge are pieces of something larger (never a card on the full frame) and are
+        # skipped. Approximate: a card nested in a larger shape that a strip cuts open can still
+        # be found here although the full-frame RETR_EXTERNAL pass would not report it.
+        card_pad = 350
+        rects = set()
+        for y0 in range(0, h, strip_rows):
+            ya, yb = max(0, y0 - card_pad), min(h, y0 + strip_rows + card_pad)
+            edges = cv2.Canny(gray[ya:yb], 50, 150)
+            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            del edges
+            for c in contours:
+                x, y, cw, ch = cv2.boundingRect(c)
+                if (ya > 0 and y == 0) or (yb < h and y + ch >= yb - ya):
+                    continue
+                if 250 < cw < 2000 and 60 < ch < 350:
+                    rects.add((x, y + ya, cw, ch))
+
+        # Zero everything outside the detected cards, strip by strip (mask scratch is strip-sized).
+        if rects:
+            for y0 in range(0, h, strip_rows):
+                y1 = min(h, y0 + strip_rows)
+                m = np.zeros((y1 - y0, w), np.uint8)
+                for x, y, cw, ch in rects:
+                    if y < y1 and y + ch >= y0:
+                        cv2.rectangle(m, (x, y - y0), (x + cw, y + ch - y0), 255, -1)
+                strip = gray[y0:y1]
+                cv2.bitwise_and(strip, m, dst=strip)
+
+    with spans.span("binarize"):
+        cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=gray)
+    with spans.span("morphology"):
+        return _close_in_strips(gray, strip_rows)
+
+
+def _preprocess_low_memory(image, mode: str | None = None, budget_mb: float | None = None, spans=NO_SPANS):
+    """Low-memory preprocessing of a path, encoded bytes or decoded array. Returns (binary, plan)."""
+    with spans.span("decode"):
+        width, height = _image_size(image)
+        plan = plan_low_memory(width, height, budget_mb)
+        if not plan["fits"]:
+            raise ValueError(
+                f"Image {width}x{height} needs ~{plan['estimated_mb']} MB even at decode reduction {plan['reduce']}, "
+                f"over the {plan['budget_mb']} MB low-memory budget"
+            )
+        gray = _read_gray(image, plan["reduce"])
+    if mode == "windows_security":
+        return _preprocess_windows_security_low_memory(gray, plan["strip_rows"], spans), plan
+    return _preprocess_default_low_memory(gray, plan["strip_rows"], spans), plan
+
+
+def _preprocess(image, mode: str | None, low_memory: bool | None, budget_mb: float | None = None, spans=NO_SPANS):
+    """Shared preprocessing dispatch for every input kind. Returns (binary, low-memory plan|None)."""
+    if LOW_MEMORY_DEFAULT if low_memory is None else low_memory:
+        return _preprocess_low_memory(image, mode=mode, budget_mb=budget_mb, spans=spans)
+    with spans.span("decode"):
+        img = load_image(image)
+    if mode == "windows_security":
+        return _preprocess_windows_security(img, spans), None
+    return _preprocess_default(img, spans), None
 
+
+def preprocess_cv(image, low_memory: bool | None = None, spans=NO_SPANS):
+    """Default preprocessing of a path, encoded bytes or decoded array."""
+    return _preprocess(image, None, low_memory, spans=spans)[0]
+
+
+def enhanced_preprocess_for_windows_security(image, low_memory: bool | None = None, spans=NO_SPANS):
+    """
+    Enhanced preprocessing for Windows Security screenshots:
+    - stronger contrast enhancement
+    - upscale for thin UI fonts
+    - invert if text is light-on-dark
+    - light edge/contour-based masking to focus on UI "cards"
+
+    `image` is a path, encoded bytes or a decoded array.
+    """
+    return _preprocess(image, "windows_security", low_memory, spans=spans)[0]
+
+
+def preprocess_encoded(data, mode: str | None = None, low_memory: bool | None = None, spans=NO_SPANS):
+    """
+    Run the preprocessing used by extract_text for `mode` on an in-memory image (encoded
+    bytes-like data or a decoded array). Split out so pipelined callers can run
+    decode+preprocess and OCR in separate stages.
+    """
+    return _preprocess(data, mode, low_memory, spans=spans)[0]
+
+
+def _load_pil(image):
+    """PIL image for OCR without preprocessing."""
+    import io
+
+    from PIL import Image
+
+    if _is_path(image):
+        return Image.open(os.fspath(image))
+    if _is_decoded(image):
+        import cv2
+
+        if image.ndim == 2 or image.shape[2] == 1:
+            return Image.fromarray(image.reshape(image.shape[:2]))
+        code = cv2.COLOR_BGRA2RGB if image.shape[2] == 4 else cv2.COLOR_BGR2RGB
+        return Image.fromarray(cv2.cvtColor(image, code))
+    return Image.open(io.BytesIO(image))
+
+
+def tesseract_config(mode: str | None = None) -> str:
     # Default config. For Windows UI, whitelist common characters to reduce noise.
     if mode == "windows_security":
-        config = '--oem 3 --psm 6 -c tessedit_char_whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 :.-()[]/%"'
-    else:
-        config = "--oem 3 --psm 6"
-    text = pytesseract.image_to_string(img, lang=lang, config=config)
-    elapsed = time.time() - start
+        return '--oem 3 --psm 6 -c tessedit_char_whitelist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 :.-()[]/%"'
+    return "--oem 3 --psm 6"
+
 
+def _ocr_result(text: str, lang: str, elapsed: float, mode: str | None) -> dict:
     return {
         "text": (text or "").strip(),
         "lang": lang,
@@ -204,18 +850,494 @@ def extract_text(
     }
 
 
+AUTO_LANG = "auto"
+FAST_LANG = "eng"
+ROMANIAN_LANG = "ron+eng"
+DEFAULT_LANG = os.environ.get("VAULTGUARD_OCR_LANG", "ron+eng")
+LANG_CACHE_SIZE = int(os.environ.get("VAULTGUARD_OCR_LANG_CACHE", "4096"))
+
+_RO_DIACRITICS = set("ăâîșşțţĂÂÎȘŞȚŢ")
+# Romanian status words/labels from the parser rules that an English UI never shows. The
+# windows_security whitelist drops diacritics, so these words carry the detection there.
+_RO_WORDS = re.compile(
+    r"\b(activat|dezactivat|oprit|pornit|actualizat|automat|activ|inactiv|notificare"
+    r"|parol[aă]|puternic[aă]?|slab[aă]|simpl[aău]|securitate|protec[tțţ]ie|set[aă]ri)\b",
+    re.IGNORECASE,
+)
+
+_lang_cache: OrderedDict[str, tuple[str, dict]] = OrderedDict()
+_lang_lock = threading.Lock()  # pipelines run OCR on several threads
+
+
+def detect_romanian(text: str) -> dict:
+    """Cheap check of an "eng" pass: does the text need the Romanian model?"""
+    diacritics = sum(1 for ch in text if ch in _RO_DIACRITICS)
+    words = sorted({m.group(0).lower() for m in _RO_WORDS.finditer(text)})
+    return {"romanian": bool(diacritics or words), "diacritics": diacritics, "words": words}
+
+
+def _source_key(image) -> str | None:
+    """Cheap identity of a file input (path, size, mtime); None for in-memory input."""
+    if not isinstance(image, (str, os.PathLike)):
+        return None
+    try:
+        st = os.stat(image)
+    except OSError:
+        return None
+    return f"{os.path.abspath(image)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _remember_lang(key: str, lang: str, detection: dict):
+    with _lang_lock:
+        _lang_cache[key] = (lang, detection)
+        _lang_cache.move_to_end(key)
+        while len(_lang_cache) > LANG_CACHE_SIZE:
+            _lang_cache.popitem(last=False)
+
+
+def _cached_lang(key: str | None) -> tuple[str, dict] | None:
+    if not key:
+        return None
+    with _lang_lock:
+        cached = _lang_cache.get(key)
+        if cached is not None:
+            _lang_cache.move_to_end(key)
+        return cached
+
+
+def _tesseract_auto(img, mode: str | None, spans, cache_key: str | None = None) -> dict:
+    """
+    lang="auto": OCR with "eng" and retry with "ron+eng" only if the text looks Romanian. With a
+    cache_key the chosen language is remembered, so the same input again takes a single pass.
+    """
+    import pytesseract
+
+    config = tesseract_config(mode)
+    key = f"{cache_key}|{mode}" if cache_key else None
+    cached = _cached_lang(key)
+    if cached is not None:
+        lang, detection = cached[0], {**cached[1], "cached": True}
+        with spans.span("tesseract"):
+            text = pytesseract.image_to_string(img, lang=lang, config=config)
+    else:
+        with spans.span("tesseract"):
+            text = pytesseract.image_to_string(img, lang=FAST_LANG, config=config)
+        with spans.span("lang_detect"):
+            detection = detect_romanian(text)
+        lang = FAST_LANG
+        if detection["romanian"]:
+            lang = ROMANIAN_LANG
+            with spans.span("tesseract_retry"):
+                text = pytesseract.image_to_string(img, lang=lang, config=config)
+        if key:
+            _remember_lang(key, lang, detection)
+        detection = {**detection, "cached": False}
+    with spans.span("cleanup"):
+        result = _ocr_result(text, lang, 0.0, mode)
+    result["lang_requested"] = AUTO_LANG
+    result["lang_detection"] = detection
+    return result
+
+
+def _tesseract(img, lang: str, mode: str | None, spans, cache_key: str | None = None) -> dict:
+    """Tesseract on a PIL image; returns the result dict (processing_time_s is set by the caller)."""
+    import pytesseract
+
+    if lang == AUTO_LANG:
+        return _tesseract_auto(img, mode, spans, cache_key)
+    with spans.span("tesseract"):
+        text = pytesseract.image_to_string(img, lang=lang, config=tesseract_config(mode))
+    with spans.span("cleanup"):
+        return _ocr_result(text, lang, 0.0, mode)
+
+
+def ocr_preprocessed(
+    arr,
+    lang: str = DEFAULT_LANG,
+    mode: str | None = None,
+    spans: Spans | None = None,
+    cache_key: str | None = None,
+) -> dict:
+    """
+    Run Tesseract on an already preprocessed array (output of preprocess_encoded/preprocess_cv).
+    processing_time_s only covers the OCR call; timings_ms holds this call's spans merged into
+    `spans` (pass the preprocess Spans to get one breakdown). cache_key (e.g. the source image's
+    hash) lets lang="auto" remember its choice.
+    """
+    from PIL import Image
+
+    if not ensure_tesseract_configured():
+        raise RuntimeError("Tesseract not configured (tesseract.exe not found).")
+
+    spans = spans if spans is not None else Spans()
+    start = time.time()
+    with maybe_profile("ocr_preprocessed") as prof:
+        with spans.span("to_pil"):
+            img = Image.fromarray(arr)
+        result = _tesseract(img, lang, mode, spans, cache_key)
+    result["processing_time_s"] = time.time() - start
+    result["timings_ms"] = spans.as_ms()
+    result.update(prof)
+    return result
+
+
+def extract_text(
+    image,
+    lang: str = DEFAULT_LANG,
+    preprocess: bool = True,
+    mode: str | None = None,
+    low_memory: bool | None = None,
+    memory_budget_mb: float | None = None,
+    cache_key: str | None = None,
+) -> dict:
+    """
+    OCR one image: a file path, encoded image bytes (bytes/bytearray/memoryview) or a decoded
+    numpy array; nothing is written to disk.
+
+    With low_memory (default: VAULTGUARD_OCR_LOW_MEMORY) preprocessing decodes straight to
+    grayscale and works in place / in strips within memory_budget_mb
+    (default: VAULTGUARD_OCR_MEMORY_BUDGET_MB); the chosen plan is returned under "memory" and
+    an image that cannot fit the budget raises ValueError. "peak_rss_mb"/"rss_delta_mb" measure
+    this call (see measure_rss), "process_peak_rss_mb" the process lifetime.
+    Per-step timings are returned under "timings_ms". With lang="auto" the language actually
+    used is returned as "lang" and the detection details under "lang_detection"; it is
+    remembered per cache_key (default for a path: path, size and mtime).
+    """
+    from PIL import Image
+
+    if not ensure_tesseract_configured():
+        raise RuntimeError("Tesseract not configured (tesseract.exe not found).")
+
+    spans = Spans()
+    plan = None
+    start = time.time()
+    with measure_rss() as mem, maybe_profile("extract_text") as prof:
+        if preprocess:
+            arr, plan = _preprocess(image, mode, low_memory, memory_budget_mb, spans)
+            with spans.span("to_pil"):
+                img = Image.fromarray(arr)
+            del arr
+        else:
+            with spans.span("decode"):
+                img = _load_pil(image)
+        if cache_key is None:
+            cache_key = _source_key(image)
+        if cache_key is not None and not preprocess:
+            cache_key += "|raw"
+        result = _tesseract(img, lang, mode, spans, cache_key)
+    result["processing_time_s"] = time.time() - start
+    result["timings_ms"] = spans.as_ms()
+    result.update(mem)
+    result["process_peak_rss_mb"] = peak_rss_mb()
+    if plan is not None:
+        result["memory"] = plan
+    result.update(prof)
+    return result
+
+
+ATLAS_GAP = 64
+# Tesseract accepts pages up to 32767 px; smaller pages keep memory and layout analysis cheap.
+ATLAS_MAX_HEIGHT = int(os.environ.get("VAULTGUARD_OCR_ATLAS_MAX_HEIGHT", "8000"))
+
+
+def atlas_pages(heights: list[int], max_height: int | None = None, gap: int = ATLAS_GAP) -> list[list[int]]:
+    """Group image indices, in order, into pages of at most max_height px (an oversized image gets its own)."""
+    max_height = max_height or ATLAS_MAX_HEIGHT
+    pages: list[list[int]] = []
+    page: list[int] = []
+    used = gap
+    for i, h in enumerate(heights):
+        if page and used + h + gap > max_height:
+            pages.append(page)
+            page, used = [], gap
+        page.append(i)
+        used += h + gap
+    if page:
+        pages.append(page)
+    return pages
+
+
+def _atlas_ocr(tiles: list, lang: str, mode: str | None, gap: int, spans) -> list[tuple[str, float | None]]:
+    """
+    One Tesseract pass over `tiles` (2-D uint8 arrays) stacked top to bottom on a white page;
+    returns (text, mean word confidence) per tile.
+    """
+    import bisect
+
+    import numpy as np
+    import pytesseract
+    from PIL import Image
+
+    with spans.span("atlas_pack"):
+        width = max(t.shape[1] for t in tiles) + 2 * gap
+        height = sum(t.shape[0] + gap for t in tiles) + gap
+        page = np.full((height, width), 255, dtype=np.uint8)
+        tops = []
+        y = gap
+        for t in tiles:
+            page[y : y + t.shape[0], gap : gap + t.shape[1]] = t
+            tops.append(y)
+            y += t.shape[0] + gap
+        img = Image.fromarray(page)
+        del page
+    with spans.span("tesseract"):
+        data = pytesseract.image_to_data(
+            img, lang=lang, config=tesseract_config(mode), output_type=pytesseract.Output.DICT
+        )
+    with spans.span("atlas_split"):
+        # (block, par, line) -> words per tile; dicts keep Tesseract's reading order.
+        lines: list[dict] = [{} for _ in tiles]
+        confs: list[list[float]] = [[] for _ in tiles]
+        # pytesseract returns {} (no columns at all) when the TSV has no rows.
+        for k, word in enumerate(data.get("text", [])):
+            word = (word or "").strip()
+            if not word:
+                continue
+            tile = bisect.bisect_right(tops, data["top"][k] + data["height"][k] / 2) - 1
+            if tile < 0:
+                continue
+            key = (data["block_num"][k], data["par_num"][k], data["line_num"][k])
+            lines[tile].setdefault(key, []).append(word)
+            conf = float(data["conf"][k])
+            if conf >= 0:
+                confs[tile].append(conf)
+    return [
+        ("\n".join(" ".join(words) for words in tile_lines.values()), round(sum(c) / len(c), 2) if c else None)
+        for tile_lines, c in zip(lines, confs)
+    ]
+
+
+def _atlas_pass(
+    arrays: list,
+    indices: list[int],
+    lang: str,
+    mode: str | None,
+    gap: int,
+    max_height: int,
+    spans: list,
+    span_name: str,
+) -> dict:
+    """OCR arrays[indices] atlas page by atlas page; {index: (text, conf, page info)}."""
+    out = {}
+    pages = atlas_pages([arrays[i].shape[0] for i in indices], max_height, gap)
+    for page_no, page in enumerate(pages):
+        members = [indices[j] for j in page]
+        page_spans = Spans()
+        texts = _atlas_ocr([arrays[i] for i in members], lang, mode, gap, page_spans)
+        # Page-level work is shared evenly by the images on the page.
+        share = {name: ms / len(members) for name, ms in page_spans.as_ms().items()}
+        if span_name != "tesseract":
+            share[span_name] = share.pop("tesseract")
+        for i, (text, conf) in zip(members, texts):
+            spans[i].merge(share)
+            out[i] = (text, conf, {"page": page_no, "pages": len(pages), "tiles": len(members)})
+    return out
+
+
+def extract_text_atlas(
+    images,
+    lang: str = DEFAULT_LANG,
+    preprocess: bool = True,
+    mode: str | None = None,
+    low_memory: bool | None = None,
+    max_page_height: int | None = None,
+    gap: int = ATLAS_GAP,
+) -> list[dict]:
+    """
+    OCR many small images (paths, encoded bytes or decoded arrays) with one Tesseract call per
+    atlas page. Returns one extract_text-shaped result per input, in order, plus "atlas"
+    (page, pages, tiles) and a real "confidence_est" (mean word confidence). Per-page time is
+    split evenly over the images on it; "peak_rss_mb"/"rss_delta_mb" cover the image's own
+    preprocessing, since atlas pages are shared.
+
+    Best for inputs much smaller than max_page_height; large screenshots gain nothing over
+    extract_text. With lang="auto" the whole batch runs with "eng" first and only the images
+    that look Romanian are re-run, together, with "ron+eng".
+    """
+    import numpy as np
+
+    if not ensure_tesseract_configured():
+        raise RuntimeError("Tesseract not configured (tesseract.exe not found).")
+
+    max_page_height = max_page_height or ATLAS_MAX_HEIGHT
+    arrays, spans, prep_s, prep_mem = [], [], [], []
+    for image in images:
+        s = Spans()
+        t0 = time.time()
+        with measure_rss() as mem:
+            if preprocess:
+                arr = _preprocess(image, mode, low_memory, spans=s)[0]
+            else:
+                with s.span("decode"):
+                    arr = np.asarray(_load_pil(image).convert("L"))
+        arrays.append(arr)
+        spans.append(s)
+        prep_s.append(time.time() - t0)
+        prep_mem.append(mem)
+
+    everything = list(range(len(arrays)))
+    t0 = time.time()
+    first = FAST_LANG if lang == AUTO_LANG else lang
+    found = _atlas_pass(arrays, everything, first, mode, gap, max_page_height, spans, "tesseract")
+    langs = {i: first for i in everything}
+    detections = {}
+    if lang == AUTO_LANG:
+        for i in everything:
+            with spans[i].span("lang_detect"):
+                detections[i] = {**detect_romanian(found[i][0]), "cached": False}
+        retry = [i for i in everything if detections[i]["romanian"]]
+        if retry:
+            found.update(_atlas_pass(arrays, retry, ROMANIAN_LANG, mode, gap, max_page_height, spans, "tesseract_retry"))
+            langs.update({i: ROMANIAN_LANG for i in retry})
+    ocr_s = (time.time() - t0) / max(1, len(arrays))
+
+    rss = peak_rss_mb()
+    results = []
+    for i in everything:
+        text, conf, atlas = found[i]
+        result = _ocr_result(text, langs[i], prep_s[i] + ocr_s, mode)
+        result["confidence_est"] = conf
+        if lang == AUTO_LANG:
+            result["lang_requested"] = AUTO_LANG
+            result["lang_detection"] = detections[i]
+        result["timings_ms"] = spans[i].as_ms()
+        result.update(prep_mem[i])
+        result["process_peak_rss_mb"] = rss
+        result["atlas"] = atlas
+        results.append(result)
+    return results
+
+
+class KeywordMatcher:
+    """
+    Batch keyword scanner with the same semantics as `kw.lower() in text.lower()`.
+
+    Keywords are lowercased once at construction. scan() works keyword-major over a chunk of
+    documents joined into one lowered string: each keyword is searched across the whole chunk
+    with str.find (C speed), and after a hit the search jumps to the next document, so the work
+    per keyword is bounded by the number of documents that contain it. Hits are written straight
+    into a numpy docs x keywords matrix.
+    """
+
+    def __init__(self, keywords: list[str] | tuple[str, ...], chunk_size: int = 5000):
+        self.keywords = list(keywords)
+        self._lowered = [kw.lower() for kw in self.keywords]
+        self.chunk_size = max(1, chunk_size)
+
+    def hits(self, text: str | None) -> list[str]:
+        text_lower = (text or "").lower()
+        return [kw for kw, low in zip(self.keywords, self._lowered) if low in text_lower]
+
+    def _scan_chunk(self, texts: list[str], out) -> None:
+        import bisect
+
+        # "\x00" never occurs in OCR text, so keywords cannot match across document boundaries.
+        lowered = [(t or "").lower() for t in texts]
+        corpus = "\x00".join(lowered)
+        starts = []
+        pos = 0
+        for t in lowered:
+            starts.append(pos)
+            pos += len(t) + 1
+        find = corpus.find
+        locate = bisect.bisect_right
+        for j, kw in enumerate(self._lowered):
+            if not kw:
+                out[:, j] = True
+                continue
+            docs = []
+            p = find(kw)
+            while p >= 0:
+                d = locate(starts, p) - 1
+                docs.append(d)
+                if d + 1 >= len(starts):
+                    break
+                p = find(kw, starts[d + 1])
+            out[docs, j] = True
+
+    def scan(self, texts) -> "np.ndarray":  # noqa: F821
+        """Scan many texts (any iterable); returns a boolean docs x keywords hit matrix."""
+        import numpy as np
+
+        blocks = []
+        chunk: list[str] = []
+        for t in texts:
+            chunk.append(t)
+            if len(chunk) >= self.chunk_size:
+                block = np.zeros((len(chunk), len(self.keywords)), dtype=bool)
+                self._scan_chunk(chunk, block)
+                blocks.append(block)
+                chunk = []
+        if chunk or not blocks:
+            block = np.zeros((len(chunk), len(self.keywords)), dtype=bool)
+            self._scan_chunk(chunk, block)
+            blocks.append(block)
+        return blocks[0] if len(blocks) == 1 else np.vstack(blocks)
+
+    def scan_packed(self, texts) -> "np.ndarray":  # noqa: F821
+        """
+        Compact form of scan(): uint8 bitset of shape (docs, ceil(keywords / 8)),
+        little-endian bit order (keyword i -> byte i // 8, bit i % 8).
+        """
+        import numpy as np
+
+        return np.packbits(self.scan(texts), axis=1, bitorder="little")
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def keyword_matcher(keywords: list[str] | tuple[str, ...] | None = None) -> KeywordMatcher:
+    """Compiled matcher for `keywords` (default SECURITY_KEYWORDS), cached per keyword set."""
+    return _cached_matcher(tuple(keywords or SECURITY_KEYWORDS))
+
+
+def keyword_stats(matrix, keywords: list[str] | None = None) -> dict:
+    """
+    Aggregate statistics over a docs x keywords hit matrix from KeywordMatcher.scan.
+    """
+    import numpy as np
+
+    keywords = list(keywords or SECURITY_KEYWORDS)
+    m = np.asarray(matrix, dtype=bool)
+    docs = int(m.shape[0])
+    per_doc = m.sum(axis=1)
+    per_kw = m.sum(axis=0)
+    return {
+        "documents": docs,
+        "avg_keywords_per_doc": round(float(per_doc.mean()), 2) if docs else 0.0,
+        "docs_without_keywords": int((per_doc == 0).sum()),
+        "keyword_hits": {kw: int(n) for kw, n in zip(keywords, per_kw)},
+        "keyword_coverage": {kw: round(float(n) / docs, 4) if docs else 0.0 for kw, n in zip(keywords, per_kw)},
+    }
+
+
+def import_security_parser():
+    """The security_parser module from the sibling tool folder (repo or installed layout)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    for candidate in (
+        os.path.join(here, "..", "vaultguard-security-parser"),  # repo layout
+        os.path.join(here, "..", "security"),  # installed %USERPROFILE%\vaultguard layout
+    ):
+        if os.path.isdir(candidate) and candidate not in sys.path:
+            sys.path.insert(0, candidate)
+    import security_parser  # type: ignore
+
+    return security_parser
+
+
 def extract_with_keyword_assist(
-    image_path: str,
+    image,
     keywords: list[str] | None = None,
-    lang: str = "ron+eng",
+    lang: str = DEFAULT_LANG,
 ) -> dict:
     """
     OCR with Windows Security preprocessing + keyword detection. Returns OCR text + keyword hits.
     """
-    keywords = keywords or SECURITY_KEYWORDS
-    result = extract_text(image_path, lang=lang, preprocess=True, mode="windows_security")
-    text_lower = (result.get("text") or "").lower()
-    found = [kw for kw in keywords if kw.lower() in text_lower]
+    result = extract_text(image, lang=lang, preprocess=True, mode="windows_security")
+    found = keyword_matcher(keywords).hits(result.get("text"))
     return {
         **result,
         "keywords_found": found,
@@ -249,38 +1371,111 @@ def list_images(folder: str) -> list[str]:
     return sorted(files)
 
 
-def create_demo_image(out_path: str):
+DEMO_LINES = [
+    "VaultGuard Security OCR Demo",
+    "Windows Security: ON",
+    "Firewall: ENABLED",
+    "Antivirus: UP TO DATE",
+    "SmartScreen: ENABLED",
+    "Password policy: STRONG",
+    "Backup: OFF (RISK)",
+]
+
+
+def create_demo_image(
+    out_path: str,
+    lines: list[str] | None = None,
+    size: tuple[int, int] = (1100, 500),
+    theme: str = "light",
+    font_scale: float = 1.0,
+    noise: float = 0.0,
+    cards: bool = False,
+    seed: int | None = None,
+):
+    """
+    Render a Windows-Security-style text panel. Defaults reproduce the original demo image;
+    the extra knobs are used by ocr_benchmark.py to build a varied synthetic corpus:
+    theme "light"/"dark", font_scale, gaussian `noise` (stddev as a fraction of 255, seeded)
+    and `cards` (draw a UI card behind each line).
+    """
     from PIL import Image, ImageDraw
     from PIL import ImageFont
 
-    img = Image.new("RGB", (1100, 500), color="white")
+    dark = theme == "dark"
+    img = Image.new("RGB", size, color=(32, 32, 32) if dark else "white")
     d = ImageDraw.Draw(img)
 
+    font_size = max(8, round(34 * font_scale))
     try:
-        font = ImageFont.truetype("arial.ttf", 34)
+        font = ImageFont.truetype("arial.ttf", font_size)
     except Exception:
-        font = ImageFont.load_default()
-
-    lines = [
-        "VaultGuard Security OCR Demo",
-        "Windows Security: ON",
-        "Firewall: ENABLED",
-        "Antivirus: UP TO DATE",
-        "SmartScreen: ENABLED",
-        "Password policy: STRONG",
-        "Backup: OFF (RISK)",
-    ]
-    y = 30
-    for line in lines:
-        d.text((40, y), line, fill="black", font=font)
-        y += 55
+        try:
+            font = ImageFont.load_default(size=font_size) if font_scale != 1.0 else ImageFont.load_default()
+        except TypeError:  # Pillow < 10.1 has no sized default font
+            font = ImageFont.load_default()
+
+    step = round(55 * font_scale)
+    y = round(30 * font_scale)
+    for line in lines or DEMO_LINES:
+        if cards:
+            d.rounded_rectangle(
+                (20, y - step // 6, size[0] - 20, y + step - step // 6),
+                radius=6,
+                fill=(43, 43, 43) if dark else (243, 243, 243),
+                outline=(70, 70, 70) if dark else (200, 200, 200),
+            )
+        d.text((40, y), line, fill="white" if dark else "black", font=font)
+        y += step
+
+    if noise > 0:
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        arr = np.asarray(img, dtype=np.float32)
+        arr += rng.normal(0.0, noise * 255.0, arr.shape)
+        img = Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8))
 
     img.save(out_path)
 
 
+USAGE = (
+    "Usage: python ocr_engine.py <image_path|folder_path|--demo [out_folder]|--improve [folder]"
+    "|--keyword-stats <ocr_results_folder>>"
+)
+
+
+def _indexed(index, func, image, **kwargs) -> dict:
+    """func(image, ...) counted in the processing index; a failure is counted, then re-raised."""
+    try:
+        res = func(image, **kwargs)
+    except Exception:
+        index.record("ocr", error=True)
+        raise
+    index.record("ocr", res.get("processing_time_s"))
+    return res
+
+
 def main(argv: list[str]) -> int:
     vault_root = vault_root_from_this_file()
 
+    # Answer usage requests before touching Tesseract.
+    if len(argv) < 2 or argv[1] in ("-h", "--help"):
+        print(USAGE)
+        return 0 if len(argv) >= 2 else 1
+
+    # Pure text analytics over saved extracts; needs no Tesseract.
+    if argv[1] == "--keyword-stats":
+        folder = argv[2] if len(argv) >= 3 else os.path.join(vault_root, "ocr_results")
+        if not os.path.isdir(folder):
+            print(f"❌ Folder not found: {folder}")
+            return 1
+        files = sorted(os.path.join(folder, n) for n in os.listdir(folder) if n.endswith("_extracted.txt"))
+        # Same header stripping the analyzer applies before parsing.
+        read_ocr_text = import_security_parser().read_ocr_text
+        matrix = keyword_matcher().scan(read_ocr_text(p) for p in files)
+        print(json.dumps(keyword_stats(matrix), indent=2, ensure_ascii=False))
+        return 0
+
     ok, tpath = configure_tesseract()
     if not ok:
         print("❌ Tesseract not configured / not installed.")
@@ -288,13 +1483,20 @@ def main(argv: list[str]) -> int:
         print("Install from: https://github.com/UB-Mannheim/tesseract/wiki")
         return 2
 
+    from processing_index import ProcessingIndex
+
+    with ProcessingIndex() as index:
+        return _run(argv, vault_root, index)
+
+
+def _run(argv: list[str], vault_root: str, index) -> int:
     if len(argv) >= 2 and argv[1] == "--demo":
         out_folder = argv[2] if len(argv) >= 3 else os.path.join(vault_root, "test_images")
         os.makedirs(out_folder, exist_ok=True)
         demo_path = os.path.join(out_folder, "demo_test.png")
         create_demo_image(demo_path)
         print(f"✅ Demo image created: {demo_path}")
-        res = extract_text(demo_path)
+        res = _indexed(index, extract_text, demo_path)
         out = save_result(vault_root, demo_path, res)
         print(f"✅ OCR OK. Saved: {out}")
         return 0
@@ -310,15 +1512,11 @@ def main(argv: list[str]) -> int:
             return 0
         for i, p in enumerate(images, 1):
             print(f"[{i}/{len(images)}] OCR+keywords: {os.path.basename(p)}")
-            res = extract_with_keyword_assist(p)
+            res = _indexed(index, extract_with_keyword_assist, p)
             out = save_result(vault_root, p, res)
             print(f"   Saved: {out} keywords={res['keyword_count']}")
         return 0
 
-    if len(argv) < 2:
-        print("Usage: python ocr_engine.py <image_path|folder_path|--demo [out_folder]>")
-        return 1
-
     target = argv[1]
     if os.path.isdir(target):
         images = list_images(target)
@@ -328,14 +1526,14 @@ def main(argv: list[str]) -> int:
         print(f"🔍 Found {len(images)} image(s) in {target}")
         for i, p in enumerate(images, 1):
             print(f"[{i}/{len(images)}] OCR: {os.path.basename(p)}")
-            res = extract_text(p)
+            res = _indexed(index, extract_text, p)
             out = save_result(vault_root, p, res)
             print(f"   Saved: {out} (t={res['processing_time_s']:.2f}s)")
         return 0
 
     if os.path.isfile(target):
         print(f"OCR: {target}")
-        res = extract_text(target)
+        res = _indexed(index, extract_text, target)
         out = save_result(vault_root, target, res)
         print(f"Saved: {out} (t={res['processing_time_s']:.2f}s)")
         return 0
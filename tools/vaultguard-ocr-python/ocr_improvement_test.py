@@ -1,7 +1,8 @@
 """
 OCR Improvement Test (Windows Security focused)
 
-Runs keyword-assisted OCR on all images in ~/vaultguard/test_images and writes:
+Runs Windows Security OCR on all images in ~/vaultguard/test_images, scores keywords for the
+whole batch in one KeywordMatcher.scan() call and writes:
   ~/vaultguard/ocr_improvement_report.json
 """
 
@@ -30,32 +31,36 @@ def main() -> int:
     import sys
 
     sys.path.insert(0, os.path.join(vault, "ocr"))
-    from ocr_engine import extract_with_keyword_assist  # type: ignore
+    from ocr_engine import SECURITY_KEYWORDS, extract_text, keyword_matcher, keyword_stats  # type: ignore
 
     images = [f for f in os.listdir(test_dir) if f.lower().endswith((".png", ".jpg", ".jpeg", ".bmp"))]
     images.sort()
 
     results = []
+    texts = []
     for name in images:
         p = os.path.join(test_dir, name)
         try:
-            r = extract_with_keyword_assist(p)
-            text_preview = (r.get("text") or "")[:300]
+            r = extract_text(p, preprocess=True, mode="windows_security")
+            text = r.get("text") or ""
+            texts.append(text)
             results.append(
                 {
                     "file": name,
                     "mode": r.get("mode"),
                     "processing_time_s": r.get("processing_time_s"),
-                    "keyword_count": r.get("keyword_count"),
-                    "keywords_found": r.get("keywords_found"),
-                    "text_preview": text_preview,
+                    "text_preview": text[:300],
                 }
             )
         except Exception as e:
             results.append({"file": name, "error": str(e)})
 
     ok = [r for r in results if "error" not in r]
-    avg_kw = (sum(r.get("keyword_count", 0) for r in ok) / len(ok)) if ok else 0.0
+    matrix = keyword_matcher().scan(texts)
+    for r, row in zip(ok, matrix):
+        r["keywords_found"] = [kw for kw, hit in zip(SECURITY_KEYWORDS, row) if hit]
+        r["keyword_count"] = int(row.sum())
+    stats = keyword_stats(matrix)
     avg_time = (sum(r.get("processing_time_s", 0.0) for r in ok) / len(ok)) if ok else 0.0
 
     report = {
@@ -63,7 +68,8 @@ def main() -> int:
         "ocr_engine_version": "enhanced_windows_security_v1",
         "total_images": len(results),
         "ok_images": len(ok),
-        "avg_keywords_per_image": round(avg_kw, 2),
+        "avg_keywords_per_image": stats["avg_keywords_per_doc"],
+        "keyword_coverage": stats["keyword_coverage"],
         "avg_processing_time_s": round(avg_time, 3),
         "detailed_results": results,
     }
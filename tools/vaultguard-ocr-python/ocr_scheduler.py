@@ -0,0 +1,226 @@
+"""
+VAULTGUARD OCR SCHEDULER
+
+Keeps parallel OCR from oversubscribing the CPU. Tesseract (OpenMP) and OpenCV each start their
+own thread pools, so N worker processes on an N-core machine can end up running N x N threads.
+The scheduler picks workers x threads-per-worker and every worker process applies its share:
+OMP_THREAD_LIMIT for the tesseract processes it spawns and cv2.setNumThreads for preprocessing.
+
+Where the plan comes from, first match wins:
+  1. VAULTGUARD_OCR_WORKERS / VAULTGUARD_OCR_THREADS
+  2. a calibration saved by --calibrate (VAULTGUARD_OCR_SCHEDULE, default <vaultguard>/ocr_schedule.json),
+     valid for the CPU count it was measured on
+  3. threads = cpu_count // workers
+
+Usage:
+  python ocr_scheduler.py --show [workers]
+  python ocr_scheduler.py --calibrate <image|folder> [--seconds 60] [--mode windows_security]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from functools import partial
+
+_applied: dict | None = None
+
+
+def _env_int(name: str) -> int | None:
+    try:
+        value = int(os.environ.get(name, "") or 0)
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def schedule_path() -> str:
+    from ocr_engine import vault_root_from_this_file
+
+    return os.environ.get("VAULTGUARD_OCR_SCHEDULE") or os.path.join(vault_root_from_this_file(), "ocr_schedule.json")
+
+
+def load_schedule(cpus: int | None = None) -> dict | None:
+    """Saved calibration, or None if missing or measured on a machine with another CPU count."""
+    cpus = cpus or os.cpu_count() or 1
+    try:
+        with open(schedule_path(), "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return saved if saved.get("cpus") == cpus else None
+
+
+def plan_threads(workers: int | None = None, cpus: int | None = None) -> dict:
+    """
+    Workers x threads-per-worker for parallel OCR. `workers` fixes the process count (e.g. from
+    --workers); threads then default to an even share of the CPUs.
+    """
+    cpus = cpus or os.cpu_count() or 1
+    env_workers, env_threads = _env_int("VAULTGUARD_OCR_WORKERS"), _env_int("VAULTGUARD_OCR_THREADS")
+    saved = load_schedule(cpus)
+    source = "auto"
+    if workers is None:
+        if env_workers:
+            workers, source = env_workers, "env"
+        elif saved:
+            workers, source = saved["workers"], "calibrated"
+        else:
+            workers = cpus
+    if env_threads:
+        threads, source = env_threads, "env"
+    elif saved and saved["workers"] == workers:
+        threads, source = saved["threads"], "calibrated"
+    else:
+        threads = max(1, cpus // workers)
+    return {"workers": workers, "threads": threads, "cpus": cpus, "source": source}
+
+
+def apply_thread_limits(threads: int) -> dict:
+    """
+    Limit this process (and the tesseract processes it spawns) to `threads` threads. Used as the
+    process-pool initializer of OCR workers; idempotent.
+    """
+    global _applied
+    threads = max(1, int(threads))
+    # Read by tesseract's OpenMP runtime; pytesseract passes our environment to the subprocess.
+    os.environ["OMP_THREAD_LIMIT"] = str(threads)
+    try:
+        import cv2
+
+        cv2.setNumThreads(threads)
+    except ImportError:  # pragma: no cover
+        pass
+    _applied = {"threads": threads, "pid": os.getpid()}
+    return _applied
+
+
+def worker_initializer(threads: int, *then):
+    """Picklable pool initializer: thread limits, then any extra no-arg initializers."""
+    return partial(_init_worker, threads, then)
+
+
+def _init_worker(threads: int, then: tuple):
+    for fn in then:
+        fn()
+    apply_thread_limits(threads)
+
+
+def applied() -> dict | None:
+    return _applied
+
+
+def candidates(cpus: int) -> list[tuple[int, int]]:
+    """Worker counts in powers of two up to `cpus`, each with an even thread share and with 1 thread."""
+    out = []
+    w = 1
+    while True:
+        w = min(w, cpus)
+        for t in sorted({max(1, cpus // w), 1}, reverse=True):
+            if (w, t) not in out:
+                out.append((w, t))
+        if w == cpus:
+            return out
+        w *= 2
+
+
+def _calibration_task(data: bytes, mode: str | None) -> float:
+    from ocr_engine import extract_text
+
+    t0 = time.perf_counter()
+    extract_text(data, mode=mode)
+    return time.perf_counter() - t0
+
+
+def _measure(samples: list[bytes], workers: int, threads: int, mode: str | None) -> dict:
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = [samples[i % len(samples)] for i in range(max(len(samples), workers * 2))]
+    with ProcessPoolExecutor(max_workers=workers, initializer=worker_initializer(threads)) as pool:
+        # Warm up every worker (imports, tesseract discovery) outside the timed window.
+        list(pool.map(_calibration_task, samples[:1] * workers, [mode] * workers))
+        t0 = time.perf_counter()
+        list(pool.map(_calibration_task, jobs, [mode] * len(jobs)))
+        wall = time.perf_counter() - t0
+    return {"workers": workers, "threads": threads, "images": len(jobs), "images_per_s": round(len(jobs) / wall, 3)}
+
+
+def calibrate(
+    samples: list[bytes],
+    mode: str | None = "windows_security",
+    cpus: int | None = None,
+    max_seconds: float = 60.0,
+    save: bool = True,
+) -> dict:
+    """
+    Time a short OCR run for each workers x threads candidate and keep the fastest. Candidates
+    go from few wide workers to many narrow ones; the run stops early when `max_seconds` is spent.
+    """
+    if not samples:
+        raise ValueError("calibration needs at least one sample image")
+    cpus = cpus or os.cpu_count() or 1
+    trials = []
+    start = time.perf_counter()
+    for workers, threads in candidates(cpus):
+        if trials and time.perf_counter() - start > max_seconds:
+            break
+        trials.append(_measure(samples, workers, threads, mode))
+    best = max(trials, key=lambda t: t["images_per_s"])
+    schedule = {
+        "workers": best["workers"],
+        "threads": best["threads"],
+        "cpus": cpus,
+        "mode": mode or "default",
+        "images_per_s": best["images_per_s"],
+        "calibrated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "trials": trials,
+    }
+    if save:
+        path = schedule_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(schedule, f, indent=2)
+        os.replace(tmp, path)
+        schedule["path"] = path
+    return schedule
+
+
+def _opt(args: list[str], flag: str, default: str | None = None) -> str | None:
+    if flag in args:
+        i = args.index(flag)
+        return args[i + 1] if i + 1 < len(args) else default
+    return default
+
+
+def main(argv: list[str]) -> int:
+    args = argv[1:]
+    if args and args[0] == "--show":
+        workers = int(args[1]) if len(args) >= 2 else None
+        print(json.dumps(plan_threads(workers), indent=2))
+        return 0
+    if len(args) >= 2 and args[0] == "--calibrate":
+        from ocr_engine import ensure_tesseract_configured, list_images
+
+        if not ensure_tesseract_configured():
+            print("❌ Tesseract not configured / not installed.")
+            return 2
+        paths = list_images(args[1])[:8] if os.path.isdir(args[1]) else [args[1]]
+        samples = []
+        for p in paths:
+            with open(p, "rb") as f:
+                samples.append(f.read())
+        mode = _opt(args, "--mode", "windows_security")
+        schedule = calibrate(samples, mode=None if mode == "default" else mode, max_seconds=float(_opt(args, "--seconds", "60")))
+        for t in schedule["trials"]:
+            print(f"  workers={t['workers']:<3} threads={t['threads']:<3} {t['images_per_s']} img/s")
+        print(f"✅ Chosen: workers={schedule['workers']} threads={schedule['threads']} -> {schedule.get('path')}")
+        return 0
+    print("Usage: python ocr_scheduler.py --show [workers] | --calibrate <image|folder> [--seconds 60] [--mode windows_security]")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,282 @@
+"""
+VAULTGUARD PROCESSING INDEX
+
+Running totals of OCR and analysis work, kept in one small JSON file so reports never have to
+list test_images/ or ocr_results/. ocr_engine.py and security_analyzer.py record every processed
+image; generate_report.py only reads the index, so its cost does not depend on corpus size.
+
+Per kind ("ocr", "analysis") the index holds: processed / error counts, total processing time,
+per-day counts and times, and (analysis) a score histogram. Records are buffered and merged
+into the file every `flush_every` records or `flush_s` seconds and on close(): the file is
+re-read under a lock file, the buffered deltas are added and the result is atomically
+replaced, so several runs can update the same index.
+
+Location: VAULTGUARD_PROCESSING_INDEX, default <vaultguard>/processing_index.json.
+
+Usage:
+  python processing_index.py --show
+  python processing_index.py --rebuild   (one-off scan of ocr_results/ and security_results/)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+FORMAT_VERSION = 1
+KINDS = ("ocr", "analysis")
+LOCK_STALE_S = 30.0
+
+
+def vault_dir() -> str:
+    """The VaultGuard working directory; generate_report.py resolves it through here too."""
+    userprofile = os.environ.get("USERPROFILE")
+    if userprofile:
+        return os.path.join(userprofile, "vaultguard")
+    # .../vaultguard/ocr/processing_index.py -> vaultguard/
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def index_path() -> str:
+    return os.environ.get("VAULTGUARD_PROCESSING_INDEX") or os.path.join(vault_dir(), "processing_index.json")
+
+
+def empty_index() -> dict:
+    return {"version": FORMAT_VERSION, "updated": None, **{kind: _empty_kind() for kind in KINDS}}
+
+
+def _empty_kind() -> dict:
+    return {"count": 0, "errors": 0, "total_s": 0.0, "days": {}, "scores": {}}
+
+
+def _merge(dst: dict, src: dict):
+    dst["count"] += src["count"]
+    dst["errors"] += src["errors"]
+    dst["total_s"] = round(dst["total_s"] + src["total_s"], 6)
+    for day, d in src["days"].items():
+        cur = dst["days"].setdefault(day, {"count": 0, "errors": 0, "total_s": 0.0})
+        cur["count"] += d["count"]
+        cur["errors"] += d["errors"]
+        cur["total_s"] = round(cur["total_s"] + d["total_s"], 6)
+    for score, n in src["scores"].items():
+        dst["scores"][score] = dst["scores"].get(score, 0) + n
+
+
+def load_index(path: str | None = None) -> dict:
+    """The index on disk, or an empty one when missing or unreadable."""
+    try:
+        with open(path or index_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return empty_index()
+    if data.get("version") != FORMAT_VERSION:
+        return empty_index()
+    for kind in KINDS:
+        data.setdefault(kind, _empty_kind())
+    return data
+
+
+class _FileLock:
+    """Cross-process lock via O_EXCL lock file; a lock older than LOCK_STALE_S is taken over."""
+
+    def __init__(self, path: str, timeout_s: float = 10.0):
+        self.path = path + ".lock"
+        self.timeout_s = timeout_s
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout_s
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > LOCK_STALE_S:
+                        os.unlink(self.path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"processing index is locked: {self.path}")
+                time.sleep(0.02)
+
+    def __exit__(self, *exc):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class ProcessingIndex:
+    """
+    Buffered writer for the processing index. record() is cheap (in-memory deltas); the file is
+    touched only on flush.
+    """
+
+    def __init__(self, path: str | None = None, flush_every: int = 50, flush_s: float = 5.0):
+        self.path = path or index_path()
+        self.flush_every = max(1, flush_every)
+        self.flush_s = flush_s
+        self._pending = {kind: _empty_kind() for kind in KINDS}
+        self._pending_n = 0
+        self._flushed_at = time.monotonic()
+
+    def record(
+        self,
+        kind: str,
+        seconds: float | None = None,
+        error: bool = False,
+        score: float | None = None,
+        when: datetime | None = None,
+    ):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown processing kind: {kind}")
+        p = self._pending[kind]
+        day = (when or datetime.now()).strftime("%Y-%m-%d")
+        d = p["days"].setdefault(day, {"count": 0, "errors": 0, "total_s": 0.0})
+        p["count"] += 1
+        d["count"] += 1
+        if error:
+            p["errors"] += 1
+            d["errors"] += 1
+        if seconds:
+            p["total_s"] += seconds
+            d["total_s"] += seconds
+        if score is not None and not error:
+            key = f"{float(score):g}"
+            p["scores"][key] = p["scores"].get(key, 0) + 1
+        self._pending_n += 1
+        if self._pending_n >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_s:
+            self.flush()
+
+    def flush(self):
+        self._flushed_at = time.monotonic()
+        if not self._pending_n:
+            return
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        with _FileLock(self.path):
+            data = load_index(self.path)
+            for kind in KINDS:
+                _merge(data[kind], self._pending[kind])
+            data["updated"] = datetime.now().isoformat(timespec="seconds")
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        self._pending = {kind: _empty_kind() for kind in KINDS}
+        self._pending_n = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def summarize(data: dict, days: int = 14) -> dict:
+    """Report-ready figures from a loaded index: totals, averages, error rates, recent days."""
+    out = {"updated": data.get("updated")}
+    for kind in KINDS:
+        k = data[kind]
+        ok = k["count"] - k["errors"]
+        recent = sorted(k["days"].items())[-days:]
+        out[kind] = {
+            "count": k["count"],
+            "errors": k["errors"],
+            "error_rate": round(k["errors"] / k["count"], 4) if k["count"] else None,
+            "avg_s": round(k["total_s"] / ok, 3) if ok > 0 and k["total_s"] else None,
+            "days": [
+                {
+                    "day": day,
+                    "count": d["count"],
+                    "errors": d["errors"],
+                    "avg_s": round(d["total_s"] / (d["count"] - d["errors"]), 3)
+                    if d["count"] > d["errors"] and d["total_s"]
+                    else None,
+                }
+                for day, d in recent
+            ],
+            "scores": dict(sorted(k["scores"].items(), key=lambda kv: float(kv[0]))),
+        }
+    return out
+
+
+def _header_fields(path: str) -> dict:
+    fields = {}
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not line.startswith("# "):
+                break
+            key, _, value = line[2:].partition(":")
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+def rebuild(vault: str | None = None, path: str | None = None) -> dict:
+    """
+    Build the index from existing ocr_results/*_extracted.txt headers and
+    security_results/*_analysis.json files, replacing the current one. Scans the whole corpus
+    once; afterwards runs keep it up to date.
+    """
+    vault = vault or vault_dir()
+    path = path or index_path()
+    index = ProcessingIndex(path, flush_every=10**9, flush_s=float("inf"))
+    ocr_dir = os.path.join(vault, "ocr_results")
+    if os.path.isdir(ocr_dir):
+        for entry in os.scandir(ocr_dir):
+            if not entry.name.endswith("_extracted.txt"):
+                continue
+            fields = _header_fields(entry.path)
+            try:
+                when = datetime.fromisoformat(fields.get("Date", ""))
+            except ValueError:
+                when = datetime.fromtimestamp(entry.stat().st_mtime)
+            try:
+                seconds = float(fields.get("ProcessingTimeS", ""))
+            except ValueError:
+                seconds = None
+            index.record("ocr", seconds, when=when)
+    res_dir = os.path.join(vault, "security_results")
+    if os.path.isdir(res_dir):
+        for entry in os.scandir(res_dir):
+            if not entry.name.endswith("_analysis.json"):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    payload = json.load(f)
+            except (OSError, ValueError):
+                continue
+            ocr = payload.get("ocr") or {}
+            try:
+                when = datetime.strptime(payload.get("timestamp", ""), "%Y%m%d_%H%M%S")
+            except ValueError:
+                when = datetime.fromtimestamp(entry.stat().st_mtime)
+            score = (payload.get("security_analysis") or {}).get("security_score")
+            index.record("analysis", ocr.get("processing_time_s"), score=score, when=when)
+    if os.path.exists(path):
+        os.remove(path)
+    index.close()
+    return load_index(path)
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) >= 2 and argv[1] == "--rebuild":
+        data = rebuild()
+        print(f"{index_path()}: {data['ocr']['count']} OCR, {data['analysis']['count']} analyses")
+        return 0
+    if len(argv) >= 2 and argv[1] == "--show":
+        print(json.dumps(summarize(load_index()), indent=2, ensure_ascii=False))
+        return 0
+    print("Usage: python processing_index.py --show | --rebuild")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
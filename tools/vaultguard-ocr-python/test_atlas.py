@@ -0,0 +1,69 @@
+"""
+Atlas batching checks for the VaultGuard OCR Engine (pytest).
+
+Images are packed into pages that respect the height limit, and every word Tesseract reports on a
+page comes back in the result of the image it was drawn from, in input order. Tesseract itself is
+replaced by a box finder over the page, so only packing and splitting are under test.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+import ocr_engine
+
+
+def _fake_image_to_data(img, lang=None, config=None, output_type=None):
+    """One "word" per dark band of rows; its text is the band height."""
+    page = np.asarray(img)
+    dark = (page < 128).any(axis=1)
+    data = {k: [] for k in ("text", "top", "height", "conf", "block_num", "par_num", "line_num")}
+    y = 0
+    while y < len(dark):
+        if not dark[y]:
+            y += 1
+            continue
+        start = y
+        while y < len(dark) and dark[y]:
+            y += 1
+        for key, value in (("text", f"h{y - start}"), ("top", start), ("height", y - start), ("conf", 90.0)):
+            data[key].append(value)
+        for key in ("block_num", "par_num", "line_num"):
+            data[key].append(len(data["text"]))
+    return data
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch):
+    import pytesseract
+
+    calls = []
+    monkeypatch.setattr(ocr_engine, "ensure_tesseract_configured", lambda: True)
+    monkeypatch.setattr(pytesseract, "image_to_data", lambda img, **kw: calls.append(img.size) or _fake_image_to_data(img))
+    return calls
+
+
+def _card(height: int, width: int = 300) -> np.ndarray:
+    img = np.full((height + 20, width, 3), 255, dtype=np.uint8)
+    img[10 : 10 + height, 20 : width - 20] = 0
+    return img
+
+
+def test_atlas_pages_respect_height_limit():
+    assert ocr_engine.atlas_pages([100, 100, 100], max_height=400, gap=50) == [[0, 1], [2]]
+    assert ocr_engine.atlas_pages([900, 10], max_height=400, gap=50) == [[0], [1]]
+
+
+def test_words_map_back_to_their_image(fake_tesseract):
+    heights = [11 + i for i in range(12)]
+    results = ocr_engine.extract_text_atlas([_card(h) for h in heights], lang="eng", preprocess=False, max_page_height=400)
+
+    assert [r["text"] for r in results] == [f"h{h}" for h in heights]
+    assert len(fake_tesseract) == results[0]["atlas"]["pages"] > 1
+    first_page = [r for r in results if r["atlas"]["page"] == 0]
+    assert all(r["atlas"]["tiles"] == len(first_page) for r in first_page)
+    for r in results:
+        assert r["confidence_est"] == 90.0
+        assert r["lang"] == "eng" and r["mode"] == "default"
+        assert {"decode", "atlas_pack", "tesseract", "atlas_split"} <= set(r["timings_ms"])
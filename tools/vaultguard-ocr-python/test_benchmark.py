@@ -0,0 +1,84 @@
+"""
+Benchmark harness checks for the VaultGuard OCR Engine (pytest).
+
+generate_corpus is reproducible: the same seed gives a byte-identical ground_truth.json and
+images. run_config scores a backend against the ground truth and keeps going when it fails: a
+failing image becomes one error, and a batch backend that fails outright records one error per
+image instead of aborting the configuration. Backends are stubbed, so no Tesseract is needed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+import ocr_benchmark
+
+
+def _files(corpus) -> dict[str, bytes]:
+    return {name: (corpus / name).read_bytes() for name in sorted(os.listdir(corpus))}
+
+
+def test_same_seed_gives_identical_corpus(tmp_path):
+    a, b, c = tmp_path / "a", tmp_path / "b", tmp_path / "c"
+    ocr_benchmark.generate_corpus(str(a), count=4, seed=7, small=True)
+    ocr_benchmark.generate_corpus(str(b), count=4, seed=7, small=True)
+    ocr_benchmark.generate_corpus(str(c), count=4, seed=8, small=True)
+    assert sorted(_files(a)) == ["ground_truth.json"] + [f"synthetic_{i:05d}.png" for i in range(4)]
+    assert _files(a) == _files(b)
+    assert _files(a)["ground_truth.json"] != _files(c)["ground_truth.json"]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    out = tmp_path / "corpus"
+    ocr_benchmark.generate_corpus(str(out), count=3, seed=11, small=True)
+    return out
+
+
+def _perfect_text(corpus, path: str) -> str:
+    """The text a perfect OCR would read from a corpus image (title omitted)."""
+    truth = json.loads((corpus / "ground_truth.json").read_text(encoding="utf-8"))
+    spec = next(s for s in truth["images"] if s["file"] == os.path.basename(path))
+    lines = []
+    for name, status in spec["settings"].items():
+        label, good, bad = ocr_benchmark.LINE_TEMPLATES[spec["language"]][name]
+        lines.append(f"{label}: {good if status == 'secure' else bad}")
+    return "\n".join(lines)
+
+
+def test_run_config_scores_a_stubbed_backend(corpus, monkeypatch):
+    def backend(path, mode, low_memory):
+        if path.endswith("00001.png"):
+            raise RuntimeError("tesseract crashed")
+        return {"text": _perfect_text(corpus, path), "timings_ms": {"tesseract": 2.0}}, {"preprocess": 0.001, "ocr": 0.002}
+
+    monkeypatch.setitem(ocr_benchmark.BACKENDS, "stub", backend)
+    report = ocr_benchmark.run_config(str(corpus), "default", False, "stub")
+    assert report["images"] == 2
+    assert report["errors"] == [{"file": "synthetic_00001.png", "error": "tesseract crashed"}]
+    assert report["accuracy"]["settings_total"] == 2 * len(ocr_benchmark.SETTINGS)
+    # Perfect text scores whatever the parser makes of the corpus wording.
+    parser = ocr_benchmark._import_parser()
+    truth = json.loads((corpus / "ground_truth.json").read_text(encoding="utf-8"))
+    expected = [
+        ocr_benchmark._score(parser.parse_text(_perfect_text(corpus, s["file"])), s["settings"])
+        for s in truth["images"]
+        if s["file"] != "synthetic_00001.png"
+    ]
+    assert report["accuracy"]["settings_correct"] == round(sum(c for c, _, _ in expected) / report["accuracy"]["settings_total"], 4)
+    assert report["stage_latency"]["ocr"]["count"] == 2
+    assert report["span_latency"]["tesseract"]["count"] == 2
+
+
+def test_run_config_survives_a_failing_batch_backend(corpus, monkeypatch):
+    def batch(paths, mode, low_memory):
+        raise RuntimeError("atlas page too tall")
+
+    monkeypatch.setitem(ocr_benchmark.BATCH_BACKENDS, "stub_batch", batch)
+    report = ocr_benchmark.run_config(str(corpus), "windows_security", True, "stub_batch")
+    assert report["images"] == 0 and report["images_per_s"] == 0
+    assert report["errors"] == [{"file": f"synthetic_{i:05d}.png", "error": "atlas page too tall"} for i in range(3)]
+    assert report["accuracy"]["images_all_correct"] is None
@@ -0,0 +1,82 @@
+"""
+Processing index checks (pytest).
+
+Records from several writers merge into one index file; the report is built from the index
+alone, and --rebuild recovers the same figures from existing result files.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import generate_report
+import processing_index
+from processing_index import ProcessingIndex, load_index, rebuild, summarize
+
+
+@pytest.fixture
+def vault(tmp_path, monkeypatch):
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    monkeypatch.delenv("VAULTGUARD_PROCESSING_INDEX", raising=False)
+    return os.path.join(str(tmp_path), "vaultguard")
+
+
+def test_writers_merge_and_report_reads_index(vault):
+    day1, day2 = datetime(2026, 1, 5, 10), datetime(2026, 1, 6, 10)
+    with ProcessingIndex(flush_every=2) as a, ProcessingIndex() as b:
+        a.record("ocr", 1.0, when=day1)
+        a.record("ocr", 3.0, when=day2)  # flushed here
+        b.record("ocr", error=True, when=day2)
+        b.record("analysis", 2.0, score=75.0, when=day2)
+        b.record("analysis", 2.0, score=75.0, when=day2)
+        b.record("analysis", 4.0, score=100.0, when=day2)
+    stats = summarize(load_index())
+    assert stats["ocr"]["count"] == 3 and stats["ocr"]["errors"] == 1
+    assert stats["ocr"]["avg_s"] == 2.0
+    assert [d["day"] for d in stats["ocr"]["days"]] == ["2026-01-05", "2026-01-06"]
+    assert stats["analysis"]["scores"] == {"75": 2, "100": 1}
+    assert not os.path.exists(processing_index.index_path() + ".lock")
+
+    assert generate_report.main() == 0
+    with open(os.path.join(vault, "OCR_PROCESSING_REPORT.md"), encoding="utf-8") as f:
+        report = f.read()
+    assert "Procesate: **3**" in report
+    assert "| 2026-01-06 | 2 | 1 | 3.0 |" in report
+    assert "- 75%: 2" in report
+
+
+def test_rebuild_from_result_files(vault):
+    ocr_dir = os.path.join(vault, "ocr_results")
+    res_dir = os.path.join(vault, "security_results")
+    os.makedirs(ocr_dir)
+    os.makedirs(res_dir)
+    for i in range(3):
+        with open(os.path.join(ocr_dir, f"img{i}_extracted.txt"), "w", encoding="utf-8") as f:
+            f.write(f"# VaultGuard OCR Extract\n# Date: 2026-01-0{i + 1}T10:00:00\n# ProcessingTimeS: 0.500\n")
+    payload = {"timestamp": "20260102_100000", "ocr": {"processing_time_s": 0.5}, "security_analysis": {"security_score": 50.0}}
+    with open(os.path.join(res_dir, "img0_analysis.json"), "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+
+    with ProcessingIndex() as index:  # stale figures are replaced, not added to
+        index.record("ocr", 9.0)
+    data = rebuild()
+    assert data["ocr"]["count"] == 3 and data["ocr"]["total_s"] == 1.5
+    assert sorted(data["ocr"]["days"]) == ["2026-01-01", "2026-01-02", "2026-01-03"]
+    assert data["analysis"]["scores"] == {"50": 1}
+
+
+def test_report_and_index_share_the_installed_root(tmp_path, monkeypatch):
+    monkeypatch.delenv("USERPROFILE", raising=False)
+    monkeypatch.delenv("VAULTGUARD_PROCESSING_INDEX", raising=False)
+    # Installed layout: <vaultguard>/ocr/processing_index.py
+    monkeypatch.setattr(processing_index, "__file__", str(tmp_path / "vaultguard" / "ocr" / "processing_index.py"))
+    with ProcessingIndex() as index:
+        index.record("ocr", 1.0)
+    assert generate_report.main() == 0
+    vault = tmp_path / "vaultguard"
+    assert (vault / "processing_index.json").is_file()
+    assert "Procesate: **1**" in (vault / "OCR_PROCESSING_REPORT.md").read_text(encoding="utf-8")
@@ -0,0 +1,64 @@
+"""
+In-memory input checks for the VaultGuard OCR Engine (pytest).
+
+A path, the encoded bytes (bytes / bytearray / memoryview) and the decoded array of the same
+image must preprocess to identical binaries, in both regular and low-memory mode.
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+import ocr_engine
+
+MODES = (None, "windows_security")
+
+
+@pytest.fixture(scope="module")
+def demo_png(tmp_path_factory) -> str:
+    path = os.path.join(str(tmp_path_factory.mktemp("inputs")), "demo.png")
+    ocr_engine.create_demo_image(path)
+    return path
+
+
+def _sources(path: str) -> dict:
+    import cv2
+
+    with open(path, "rb") as f:
+        data = f.read()
+    bgr = cv2.imread(path)
+    return {
+        "bytes": data,
+        "bytearray": bytearray(data),
+        "memoryview": memoryview(data),
+        "bgr": bgr,
+        "bgra": cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA),
+    }
+
+
+@pytest.mark.parametrize("low_memory", [False, True])
+@pytest.mark.parametrize("mode", MODES)
+def test_in_memory_inputs_match_path(demo_png, mode, low_memory):
+    import numpy as np
+
+    expected = ocr_engine.preprocess_encoded(demo_png, mode=mode, low_memory=low_memory)
+    for kind, source in _sources(demo_png).items():
+        got = ocr_engine.preprocess_encoded(source, mode=mode, low_memory=low_memory)
+        assert np.array_equal(got, expected), kind
+
+
+def test_decoded_array_is_not_modified(demo_png):
+    import cv2
+
+    bgr = cv2.imread(demo_png)
+    before = bgr.copy()
+    ocr_engine.enhanced_preprocess_for_windows_security(bgr, low_memory=False)
+    ocr_engine.enhanced_preprocess_for_windows_security(bgr, low_memory=True)
+    assert (bgr == before).all()
+
+
+def test_undecodable_bytes_raise():
+    with pytest.raises(ValueError):
+        ocr_engine.preprocess_cv(b"not an image", low_memory=False)
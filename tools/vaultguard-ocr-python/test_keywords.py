@@ -0,0 +1,80 @@
+"""
+Keyword matching checks for the VaultGuard OCR Engine (pytest).
+
+KeywordMatcher.scan must give exactly `kw.lower() in text.lower()` for every document and
+keyword: overlapping keywords, hits at the very start and end of a document, keywords that
+would only match across two neighbouring documents, empty keywords and documents, chunk
+boundaries and case folding that changes the string length. --keyword-stats reads extracts
+the way the analyzer does (header stripped by security_parser.read_ocr_text).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import random
+
+import numpy as np
+import pytest
+
+import ocr_engine
+from ocr_engine import KeywordMatcher
+
+KEYWORDS = ["update", "windows update", "date", "Firewall", "fire", "wall", "", "i̇", "x"]
+DOCS = [
+    "Windows Update: automatic",
+    "update",  # the whole document
+    "firewall",
+    "ends with fire",
+    "wall starts this one",  # "fire" + "wall" only across the boundary with the previous doc
+    "",
+    None,
+    "İSTANBUL",  # lowers to two code points
+    "x",
+    "FIREWALL: OFF\nBackup: ON",
+]
+
+
+def _expected(texts, keywords) -> np.ndarray:
+    return np.array([[kw.lower() in (t or "").lower() for kw in keywords] for t in texts], dtype=bool).reshape(
+        len(texts), len(keywords)
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 5000])
+def test_scan_matches_substring_semantics(chunk_size):
+    matcher = KeywordMatcher(KEYWORDS, chunk_size=chunk_size)
+    got = matcher.scan(DOCS)
+    assert np.array_equal(got, _expected(DOCS, KEYWORDS))
+    assert not got[DOCS.index("wall starts this one"), KEYWORDS.index("Firewall")]
+    assert got[:, KEYWORDS.index("")].all()
+    for i, text in enumerate(DOCS):
+        assert matcher.hits(text) == [kw for j, kw in enumerate(KEYWORDS) if got[i, j]]
+
+
+def test_scan_matches_substring_semantics_on_random_text():
+    rng = random.Random(0)
+    alphabet = "abAB \n:"
+    texts = ["".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 12))) for _ in range(300)]
+    keywords = sorted({"".join(rng.choice("abAB ") for _ in range(rng.randrange(0, 4))) for _ in range(40)})
+    assert np.array_equal(KeywordMatcher(keywords, chunk_size=7).scan(texts), _expected(texts, keywords))
+
+
+def test_empty_inputs_and_packed_bits():
+    assert KeywordMatcher(KEYWORDS).scan([]).shape == (0, len(KEYWORDS))
+    assert KeywordMatcher([]).scan(DOCS).shape == (len(DOCS), 0)
+    packed = KeywordMatcher(KEYWORDS).scan_packed(DOCS)
+    assert np.array_equal(np.unpackbits(packed, axis=1, bitorder="little")[:, : len(KEYWORDS)], _expected(DOCS, KEYWORDS))
+
+
+def test_keyword_stats_cli_ignores_extract_headers(tmp_path):
+    for i, text in enumerate(["Firewall: ON", "Backup: OFF"]):
+        header = f"# VaultGuard OCR Extract\n# Image: firewall_{i}.png\n# Lang: eng\n" + "=" * 60 + "\n\n"
+        (tmp_path / f"img{i}_extracted.txt").write_text(header + text + "\n", encoding="utf-8")
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        assert ocr_engine.main(["ocr_engine.py", "--keyword-stats", str(tmp_path)]) == 0
+    stats = json.loads(out.getvalue())
+    assert stats["documents"] == 2
+    assert stats["keyword_hits"]["firewall"] == 1 and stats["keyword_hits"]["backup"] == 1
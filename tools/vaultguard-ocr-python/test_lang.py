@@ -0,0 +1,110 @@
+"""
+Automatic language selection checks for the VaultGuard OCR Engine (pytest).
+
+detect_romanian flags Romanian diacritics and Romanian status words, including their
+diacritic-free spellings left by the windows_security whitelist, and leaves English UI text
+(whose words share prefixes with the Romanian ones) alone. With lang="auto" the chosen language
+is remembered per file (path, size, mtime) or caller cache_key; in-memory input without a key
+is not cached. Tesseract is replaced by a stub that reads Romanian only with the ron model.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+
+import pytest
+
+import ocr_engine
+from ocr_engine import detect_romanian
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Firewall: Activat",
+        "Protecție în timp real: DEZACTIVAT",
+        "Protectie antivirus: Oprit",  # windows_security whitelist drops the diacritics
+        "Setari de securitate",
+        "Parola: puternica",
+        "Protecţie (cedilla)",
+        "Actualizări automate",
+    ],
+)
+def test_detects_romanian(text):
+    assert detect_romanian(text)["romanian"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Windows Defender Firewall: ON",
+        "Real-time protection: Active",
+        "Automatic updates: Activated",
+        "Password strength: Strong. Simple passwords are weak.",
+        "Security settings; notifications enabled",
+        "",
+    ],
+)
+def test_leaves_english_alone(text):
+    assert detect_romanian(text) == {"romanian": False, "diacritics": 0, "words": []}
+
+
+def test_detection_details():
+    assert detect_romanian("Firewall: OPRIT, Backup: oprit, Protecție: activ") == {
+        "romanian": True,
+        "diacritics": 1,
+        "words": ["activ", "oprit", "protecție"],
+    }
+
+
+@pytest.fixture
+def tesseract_calls(monkeypatch):
+    import pytesseract
+
+    calls = []
+
+    def image_to_string(img, lang=None, config=None):
+        calls.append(lang)
+        return "Firewall: Dezactivat" if "ron" in lang else "Firewall: Dezactlvat oprit"
+
+    monkeypatch.setattr(ocr_engine, "ensure_tesseract_configured", lambda: True)
+    monkeypatch.setattr(ocr_engine, "_lang_cache", OrderedDict())
+    monkeypatch.setattr(pytesseract, "image_to_string", image_to_string)
+    return calls
+
+
+def test_auto_lang_is_remembered_per_file(tmp_path, tesseract_calls):
+    path = str(tmp_path / "demo.png")
+    ocr_engine.create_demo_image(path)
+    tesseract_calls.clear()
+
+    first = ocr_engine.extract_text(path, lang="auto", preprocess=False)
+    assert tesseract_calls == ["eng", "ron+eng"]
+    assert first["lang"] == "ron+eng" and first["lang_detection"]["cached"] is False
+
+    tesseract_calls.clear()
+    again = ocr_engine.extract_text(path, lang="auto", preprocess=False)
+    assert tesseract_calls == ["ron+eng"] and again["lang_detection"]["cached"] is True
+
+    # A rewritten file is a new image.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    tesseract_calls.clear()
+    ocr_engine.extract_text(path, lang="auto", preprocess=False)
+    assert tesseract_calls == ["eng", "ron+eng"]
+
+
+def test_in_memory_input_needs_a_cache_key(tmp_path, tesseract_calls):
+    path = str(tmp_path / "demo.png")
+    ocr_engine.create_demo_image(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    for _ in range(2):
+        ocr_engine.extract_text(data, lang="auto", preprocess=False)
+    assert ocr_engine._lang_cache == OrderedDict()
+
+    tesseract_calls.clear()
+    for _ in range(2):
+        ocr_engine.extract_text(data, lang="auto", preprocess=False, cache_key="sha256:abc")
+    assert tesseract_calls == ["eng", "ron+eng", "ron+eng"]
@@ -0,0 +1,75 @@
+"""
+Low-memory preprocessing checks for the VaultGuard OCR Engine (pytest).
+
+With a budget small enough that plan_low_memory splits the frame into strips (but still decodes
+at full resolution), the strip-based path must give the regular path's binary, in both modes.
+Strip CLAHE uses the full frame's tile grid (also on sizes OpenCV pads); it may differ from
+cv2 by +-1 on rare pixels where strip-local row numbers round the interpolation weights
+differently. An image that cannot fit the budget even at 1/8 resolution is refused, and
+measure_rss reports the peak inside its block, not the process lifetime (Linux).
+"""
+
+from __future__ import annotations
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import ocr_engine
+
+
+def _cards(height: int, width: int) -> np.ndarray:
+    """Windows-Security-like page: light cards with a border and a text line on a grey background."""
+    img = np.full((height, width, 3), 200, np.uint8)
+    for i, y in enumerate(range(40, height - 200, 190)):
+        cv2.rectangle(img, (60, y), (min(width - 60, 1500), y + 150), (245, 245, 245), -1)
+        cv2.rectangle(img, (60, y), (min(width - 60, 1500), y + 150), (90, 90, 90), 2)
+        cv2.putText(img, f"Firewall {i}: ON", (100, y + 95), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (20, 20, 20), 3)
+    return img
+
+
+@pytest.mark.parametrize("size", [(3000, 1800), (2601, 1803)])
+@pytest.mark.parametrize("budget_mb", [16, 8])
+@pytest.mark.parametrize(
+    "mode, full", [(None, ocr_engine._preprocess_default), ("windows_security", ocr_engine._preprocess_windows_security)]
+)
+def test_strips_match_full_frame(size, budget_mb, mode, full):
+    img = _cards(*size)
+    out, plan = ocr_engine._preprocess_low_memory(img, mode=mode, budget_mb=budget_mb)
+    assert plan["reduce"] == 1 and plan["strip_rows"] < size[0]  # really split, full resolution
+    assert np.array_equal(out, full(img))
+
+
+@pytest.mark.parametrize("shape", [(2600, 3000), (2601, 3003), (777, 1234)])
+def test_clahe_in_strips_matches_cv2(shape):
+    rng = np.random.default_rng(0)
+    gray = cv2.GaussianBlur((rng.random(shape) * 255).astype(np.uint8), (9, 9), 3)
+    expected = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8)).apply(gray)
+    for strip_rows in (64, 200):
+        diff = np.abs(ocr_engine._clahe_in_strips(gray.copy(), 3.0, strip_rows).astype(int) - expected)
+        assert diff.max() <= 1
+        assert np.count_nonzero(diff) <= gray.size // 100_000
+
+
+def test_over_budget_image_is_refused():
+    plan = ocr_engine.plan_low_memory(2000, 1000, budget_mb=0.05)
+    assert plan["reduce"] == 8 and not plan["fits"]
+    assert ocr_engine.plan_low_memory(3000, 1800, budget_mb=8)["fits"]
+    with pytest.raises(ValueError, match="low-memory budget"):
+        ocr_engine._preprocess_low_memory(_cards(1000, 2000), budget_mb=0.05)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="needs a resettable peak RSS (Linux)")
+def test_measure_rss_reports_the_peak_of_its_block():
+    with ocr_engine.measure_rss() as spike:
+        before = ocr_engine.current_rss_mb()
+        buf = np.ones(96 * 1024 * 1024, np.uint8)  # written, so resident
+        del buf
+    with ocr_engine.measure_rss() as quiet:
+        pass
+    assert spike["peak_rss_mb"] >= before + 90
+    assert spike["rss_delta_mb"] < 90  # released again
+    assert quiet["peak_rss_mb"] < spike["peak_rss_mb"] - 60  # the earlier spike is not carried over
+    assert ocr_engine.peak_rss_mb() >= spike["peak_rss_mb"]
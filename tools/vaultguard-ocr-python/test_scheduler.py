@@ -0,0 +1,72 @@
+"""
+OCR scheduler checks (pytest).
+
+plan_threads takes the worker count from its argument, then VAULTGUARD_OCR_WORKERS, then a
+calibration saved for this CPU count, and threads from VAULTGUARD_OCR_THREADS, then the
+calibration (only for the worker count it was measured with), then an even CPU share.
+candidates() lists the calibration grid.
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import ocr_scheduler
+from ocr_scheduler import candidates, plan_threads
+
+
+@pytest.fixture
+def schedule(tmp_path, monkeypatch):
+    """Writes a calibration file; no env overrides unless a test sets them."""
+    path = tmp_path / "ocr_schedule.json"
+    monkeypatch.setenv("VAULTGUARD_OCR_SCHEDULE", str(path))
+    monkeypatch.delenv("VAULTGUARD_OCR_WORKERS", raising=False)
+    monkeypatch.delenv("VAULTGUARD_OCR_THREADS", raising=False)
+
+    def save(workers: int, threads: int, cpus: int = 8):
+        path.write_text(json.dumps({"workers": workers, "threads": threads, "cpus": cpus}), encoding="utf-8")
+
+    return save
+
+
+def test_even_share_without_env_or_calibration(schedule):
+    assert plan_threads(cpus=8) == {"workers": 8, "threads": 1, "cpus": 8, "source": "auto"}
+    assert plan_threads(3, cpus=8) == {"workers": 3, "threads": 2, "cpus": 8, "source": "auto"}
+    assert plan_threads(16, cpus=8)["threads"] == 1
+
+
+def test_calibration_applies_to_its_cpu_count_and_workers(schedule):
+    schedule(workers=2, threads=3)
+    assert plan_threads(cpus=8) == {"workers": 2, "threads": 3, "cpus": 8, "source": "calibrated"}
+    assert plan_threads(2, cpus=8)["threads"] == 3
+    # Measured for 2 workers: another count gets the even share.
+    assert plan_threads(4, cpus=8) == {"workers": 4, "threads": 2, "cpus": 8, "source": "auto"}
+    # Measured on another machine: ignored.
+    assert plan_threads(cpus=4)["source"] == "auto"
+    assert ocr_scheduler.load_schedule(cpus=4) is None
+
+
+def test_env_overrides_calibration_and_argument_overrides_env(schedule, monkeypatch):
+    schedule(workers=2, threads=3)
+    monkeypatch.setenv("VAULTGUARD_OCR_WORKERS", "6")
+    assert plan_threads(cpus=8) == {"workers": 6, "threads": 1, "cpus": 8, "source": "env"}
+    assert plan_threads(2, cpus=8)["workers"] == 2
+
+    monkeypatch.setenv("VAULTGUARD_OCR_THREADS", "5")
+    assert plan_threads(2, cpus=8) == {"workers": 2, "threads": 5, "cpus": 8, "source": "env"}
+    monkeypatch.setenv("VAULTGUARD_OCR_THREADS", "zero")  # invalid values are ignored
+    assert plan_threads(2, cpus=8) == {"workers": 2, "threads": 3, "cpus": 8, "source": "calibrated"}
+
+
+@pytest.mark.parametrize(
+    "cpus, expected",
+    [
+        (1, [(1, 1)]),
+        (4, [(1, 4), (1, 1), (2, 2), (2, 1), (4, 1)]),
+        (6, [(1, 6), (1, 1), (2, 3), (2, 1), (4, 1), (6, 1)]),
+    ],
+)
+def test_candidates(cpus, expected):
+    assert candidates(cpus) == expected
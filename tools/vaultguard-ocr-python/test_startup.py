@@ -0,0 +1,64 @@
+"""
+Startup checks for the VaultGuard OCR Engine (pytest).
+
+Importing ocr_engine (and answering --help) must not load the OCR stack, the import must fit
+an import-time budget, and a successful Tesseract discovery must run once per process while a
+failed one is retried.
+
+Budget: VAULTGUARD_IMPORT_BUDGET_MS (default 150 ms, cumulative as reported by -X importtime).
+"""
+
+from __future__ import annotations
+
+import os
+
+from import_probe import import_time_ms, loaded_modules
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUDGET_MS = float(os.environ.get("VAULTGUARD_IMPORT_BUDGET_MS", "150"))
+
+
+def test_import_within_budget():
+    assert import_time_ms("ocr_engine", HERE) < BUDGET_MS
+
+
+def test_import_and_help_do_not_load_ocr_stack():
+    assert loaded_modules("import ocr_engine", cwd=HERE) == []
+    assert loaded_modules("import ocr_engine; ocr_engine.main(['ocr_engine.py', '--help'])", cwd=HERE) == []
+
+
+def test_successful_tesseract_discovery_is_memoized(tmp_path, monkeypatch):
+    import ocr_engine
+
+    binary = tmp_path / "tesseract"
+    binary.write_text("")
+    monkeypatch.setenv("VAULTGUARD_TESSERACT_PATH", str(binary))
+    calls = []
+    real_exists = os.path.exists
+    monkeypatch.setattr(os.path, "exists", lambda p: calls.append(p) or real_exists(p))
+    ocr_engine.reset_tesseract_config()
+    try:
+        for _ in range(5):
+            assert ocr_engine.ensure_tesseract_configured()
+        assert calls == [str(binary)]
+    finally:
+        ocr_engine.reset_tesseract_config()
+
+
+def test_failed_tesseract_discovery_is_retried(tmp_path, monkeypatch):
+    import ocr_engine
+
+    binary = tmp_path / "tesseract"
+    monkeypatch.setenv("VAULTGUARD_TESSERACT_PATH", str(binary))
+    calls = []
+    real_exists = os.path.exists
+    monkeypatch.setattr(os.path, "exists", lambda p: calls.append(p) or real_exists(p))
+    ocr_engine.reset_tesseract_config()
+    try:
+        for _ in range(3):
+            assert ocr_engine.configure_tesseract() == (False, str(binary))
+        assert calls == [str(binary)] * 3  # every call looks again
+        binary.write_text("")  # installed while the process keeps running
+        assert ocr_engine.configure_tesseract() == (True, str(binary))
+    finally:
+        ocr_engine.reset_tesseract_config()
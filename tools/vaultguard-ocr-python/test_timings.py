@@ -0,0 +1,167 @@
+"""
+Instrumentation checks for the VaultGuard OCR Engine (pytest).
+
+Spans accumulate repeated names (also when the block raises) and merge millisecond dicts;
+TimingAggregate reports exact count/total/mean/max and p50/p95 from its log-bucketed histogram,
+never below the nearest-rank percentile and at most one 5% bucket above it; maybe_profile
+samples every Nth call per label and dumps a profile only for those, counts exactly under
+concurrent callers and never starts a second profile while one is running. Clocks are faked, so
+nothing depends on machine speed.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+
+import pytest
+
+import ocr_engine
+from ocr_engine import NO_SPANS, Spans, TimingAggregate, aggregate_timings, maybe_profile
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """perf_counter that advances by the given steps (seconds), one per call."""
+    steps = []
+    now = [100.0]
+
+    def perf_counter():
+        now[0] += steps.pop(0) if steps else 0.0
+        return now[0]
+
+    monkeypatch.setattr(ocr_engine.time, "perf_counter", perf_counter)
+    return steps
+
+
+def test_spans_accumulate_and_merge(clock):
+    spans = Spans()
+    clock.extend([0.0, 0.002, 0.0, 0.0005, 0.0, 0.010])
+    with spans.span("decode"):
+        pass
+    with spans.span("decode"):
+        pass
+    with pytest.raises(ValueError):
+        with spans.span("tesseract"):
+            raise ValueError("tesseract failed")
+    spans.merge({"decode": 1.0, "parse": 0.25})
+    spans.merge(None)
+    assert spans.as_ms() == {"decode": 3.5, "tesseract": 10.0, "parse": 0.25}
+    with NO_SPANS.span("anything"):
+        pass
+
+
+def _nearest_rank(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    k = max(1, -(-len(ordered) * p // 100))  # ceil(p/100 * n)
+    return ordered[int(k) - 1]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [float(v) for v in range(1, 101)],
+        [7.0] * 20,
+        [0.001, 0.005, 0.0, 3.0],  # at or below the first bucket
+        [1.0, 1000.0],
+        [0.5 * 1.37**i for i in range(60)],
+    ],
+)
+def test_timing_aggregate_percentiles(values):
+    agg = TimingAggregate()
+    for v in values:
+        agg.add({"ocr": v})
+    st = agg.summary()["ocr"]
+    assert st["count"] == len(values)
+    assert st["total_ms"] == round(sum(values), 3)
+    assert st["mean_ms"] == round(sum(values) / len(values), 3)
+    assert st["max_ms"] == round(max(values), 3)
+    for p in (50, 95):
+        exact = _nearest_rank(values, p)
+        estimate = agg._percentile(agg.spans["ocr"], p)
+        assert exact - 1e-9 <= estimate <= max(exact * TimingAggregate._GROWTH, TimingAggregate._BASE_MS) + 1e-9
+        assert estimate <= max(values)
+        assert st[f"p{p}_ms"] == round(estimate, 3)
+
+
+def test_timing_aggregate_summary_shape():
+    summary = aggregate_timings([{"timings_ms": {"decode": 1.0, "tesseract": 9.0}}, {"timings_ms": None}, {}])
+    assert list(summary) == ["tesseract", "decode"]  # heaviest span first
+    assert summary["decode"] == {"count": 1, "total_ms": 1.0, "mean_ms": 1.0, "p50_ms": 1.0, "p95_ms": 1.0, "max_ms": 1.0}
+    assert TimingAggregate().summary() == {}
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("VAULTGUARD_PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(ocr_engine, "_profile_calls", {})
+    return tmp_path
+
+
+def test_maybe_profile_samples_every_nth_call(profile_dir):
+    sampled = []
+    for _ in range(7):
+        with maybe_profile("extract_text", every=3) as info:
+            sum(range(100))
+        sampled.append(info.get("profile"))
+    assert [p is not None for p in sampled] == [False, False, True, False, False, True, False]
+    assert all(os.path.isfile(p) and p.endswith(".prof") for p in sampled if p)
+    assert sorted(os.listdir(profile_dir)) == [os.path.basename(p) for p in sampled if p]
+
+    # Counters are per label.
+    with maybe_profile("preprocess", every=3) as info:
+        pass
+    assert "profile" not in info
+
+
+def test_maybe_profile_disabled_and_raising(profile_dir, monkeypatch):
+    monkeypatch.setattr(ocr_engine, "PROFILE_EVERY", 0)
+    for _ in range(5):
+        with maybe_profile("extract_text") as info:
+            pass
+        assert info == {}
+    assert os.listdir(profile_dir) == []
+
+    with pytest.raises(RuntimeError):
+        with maybe_profile("ocr", every=1) as info:
+            raise RuntimeError("boom")
+    assert os.path.isfile(info["profile"])  # a failing sampled call is still dumped
+
+
+def test_maybe_profile_concurrent_callers(profile_dir):
+    threads, calls = 8, 200
+
+    def worker(infos):
+        for _ in range(calls):
+            with maybe_profile("ocr", every=1) as info:
+                pass
+            infos.append(info)
+
+    per_thread = [[] for _ in range(threads)]
+    with maybe_profile("ocr", every=1) as outer:
+        pool = [threading.Thread(target=worker, args=(infos,)) for infos in per_thread]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+    assert ocr_engine._profile_calls["ocr"] == 1 + threads * calls
+    assert all(info == {} for infos in per_thread for info in infos)  # due, but one is running
+    assert os.listdir(profile_dir) == [os.path.basename(outer["profile"])]
+
+    with maybe_profile("ocr", every=1) as info:  # released again
+        pass
+    assert "profile" in info
+
+    # Without a running profile, concurrent sampled calls never overlap and all counts land.
+    ocr_engine._profile_calls.clear()
+    per_thread = [[] for _ in range(threads)]
+    pool = [threading.Thread(target=worker, args=(infos,)) for infos in per_thread]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    assert ocr_engine._profile_calls["ocr"] == threads * calls
+    assert not ocr_engine._profile_active
+    sampled = [info["profile"] for infos in per_thread for info in infos if "profile" in info]
+    assert sampled and len(set(sampled)) == len(sampled)
+    assert all(os.path.isfile(p) for p in sampled)
@@ -0,0 +1,217 @@
+"""
+VAULTGUARD STAGED PIPELINE
+
+Small bounded-queue pipeline used by security_analyzer.analyze_folder:
+
+  read (threads) -> preprocess (processes) -> ocr (threads) -> parse/write (threads)
+
+Each stage has its own pool of worker threads pulling from a bounded input queue. Thread
+stages run their function inline; process stages hand the call to a ProcessPoolExecutor
+and wait on the future, so N driver threads keep N worker processes busy. Bounded queues
+give back-pressure: a slow stage stalls its producers instead of buffering the whole folder.
+
+A failing item does not stop the run: the error is carried to the output and the item
+skips the remaining stages.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
+
+_SENTINEL = object()
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Any],
+        workers: int = 1,
+        processes: bool = False,
+        queue_size: int | None = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.processes = processes
+        self.queue_size = queue_size or self.workers * 2
+
+
+class StageStats:
+    def __init__(self, stage: Stage):
+        self.stage = stage
+        self.items = 0
+        self.errors = 0
+        self.busy_s = 0.0
+        self.first_start: float | None = None
+        self.last_end: float | None = None
+        self.queue_max = 0
+        self.queue_depth_sum = 0
+        self.queue_samples = 0
+        self._lock = threading.Lock()
+
+    def sample_queue(self, depth: int):
+        with self._lock:
+            self.queue_max = max(self.queue_max, depth)
+            self.queue_depth_sum += depth
+            self.queue_samples += 1
+
+    def record(self, started: float, ended: float, ok: bool):
+        with self._lock:
+            self.items += 1
+            if not ok:
+                self.errors += 1
+            self.busy_s += ended - started
+            if self.first_start is None or started < self.first_start:
+                self.first_start = started
+            if self.last_end is None or ended > self.last_end:
+                self.last_end = ended
+
+    def as_dict(self) -> dict:
+        active = (self.last_end - self.first_start) if self.items and self.first_start is not None else 0.0
+        return {
+            "kind": "process" if self.stage.processes else "thread",
+            "workers": self.stage.workers,
+            "items": self.items,
+            "errors": self.errors,
+            "busy_s": round(self.busy_s, 3),
+            "active_s": round(active, 3),
+            "throughput_per_s": round(self.items / active, 2) if active > 0 else None,
+            # Share of worker capacity spent inside the stage function.
+            "utilization": round(self.busy_s / (active * self.stage.workers), 3) if active > 0 else None,
+            "queue_size": self.stage.queue_size,
+            "queue_max": self.queue_max,
+            "queue_mean": round(self.queue_depth_sum / self.queue_samples, 2) if self.queue_samples else 0.0,
+        }
+
+
+class Pipeline:
+    def __init__(self, stages: list[Stage], initializer: Callable[[], None] | None = None):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.initializer = initializer
+        self.stats = {s.name: StageStats(s) for s in stages}
+        self.wall_s = 0.0
+        self.completed = 0
+
+    def run(self, items: Iterable[Any]) -> Iterator[tuple[Any, Any, BaseException | None]]:
+        """
+        Push `items` through all stages. Yields (item, result, error) in completion order;
+        `error` is the exception raised by the first failing stage (result is then None).
+        """
+        queues = [queue.Queue(maxsize=s.queue_size) for s in self.stages]
+        out_q: queue.Queue = queue.Queue()
+        pools: dict[str, ProcessPoolExecutor] = {}
+        stop = threading.Event()
+        threads: list[threading.Thread] = []
+        start = time.perf_counter()
+        self.completed = 0
+
+        for s in self.stages:
+            if s.processes:
+                pools[s.name] = ProcessPoolExecutor(max_workers=s.workers, initializer=self.initializer)
+
+        def put(q: queue.Queue, obj) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(obj, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed():
+            for item in items:
+                # envelope: [original item, current value, error]
+                if not put(queues[0], [item, item, None]):
+                    return
+            for _ in range(self.stages[0].workers):
+                put(queues[0], _SENTINEL)
+
+        def make_worker(idx: int, remaining: list[int], lock: threading.Lock):
+            stage = self.stages[idx]
+            stats = self.stats[stage.name]
+            in_q = queues[idx]
+            pool = pools.get(stage.name)
+            last = idx == len(self.stages) - 1
+
+            def worker():
+                while True:
+                    env = in_q.get()
+                    if env is _SENTINEL:
+                        break
+                    stats.sample_queue(in_q.qsize())
+                    if env[2] is None and not stop.is_set():
+                        t0 = time.perf_counter()
+                        try:
+                            if pool is not None:
+                                env[1] = pool.submit(stage.fn, env[1]).result()
+                            else:
+                                env[1] = stage.fn(env[1])
+                            ok = True
+                        except BaseException as e:  # noqa: BLE001 - carried to the caller
+                            env[1], env[2] = None, e
+                            ok = False
+                        stats.record(t0, time.perf_counter(), ok)
+                    if last:
+                        out_q.put(env)
+                    elif not put(queues[idx + 1], env):
+                        break
+                with lock:
+                    remaining[0] -= 1
+                    done = remaining[0] == 0
+                if done:
+                    if last:
+                        out_q.put(_SENTINEL)
+                    else:
+                        for _ in range(self.stages[idx + 1].workers):
+                            put(queues[idx + 1], _SENTINEL)
+
+            return worker
+
+        feeder = threading.Thread(target=feed, name="pipeline-feed", daemon=True)
+        threads.append(feeder)
+        for idx, s in enumerate(self.stages):
+            remaining = [s.workers]
+            lock = threading.Lock()
+            for n in range(s.workers):
+                threads.append(
+                    threading.Thread(target=make_worker(idx, remaining, lock), name=f"pipeline-{s.name}-{n}", daemon=True)
+                )
+        for t in threads:
+            t.start()
+
+        try:
+            while True:
+                env = out_q.get()
+                if env is _SENTINEL:
+                    break
+                self.completed += 1
+                yield env[0], env[1], env[2]
+        finally:
+            stop.set()
+            # Unblock workers still waiting on input after an early exit.
+            for q in queues:
+                for _ in range(len(threads)):
+                    try:
+                        q.put_nowait(_SENTINEL)
+                    except queue.Full:
+                        break
+            for t in threads:
+                t.join(timeout=5)
+            for pool in pools.values():
+                pool.shutdown(wait=True, cancel_futures=True)
+            self.wall_s = time.perf_counter() - start
+
+    def report(self) -> dict:
+        return {
+            "wall_s": round(self.wall_s, 3),
+            "items": self.completed,
+            "items_per_s": round(self.completed / self.wall_s, 2) if self.wall_s > 0 else None,
+            "stages": {name: st.as_dict() for name, st in self.stats.items()},
+        }
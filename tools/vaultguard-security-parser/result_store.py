@@ -0,0 +1,182 @@
+"""
+VAULTGUARD RESULT STORE
+
+Optional consolidated sink for security_analyzer output. Instead of three small files per image
+(ocr_results/*_extracted.txt, security_results/*_analysis.json, *_report.txt), each analysis
+payload (OCR text included) is appended to one SQLite file indexed by image hash and timestamp.
+Text reports are rendered on request instead of eagerly for every image.
+
+Usage:
+  python result_store.py <store.db> --report <image_hash|image_name>
+  python result_store.py <store.db> --list [N]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+
+def image_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def render_report(payload: dict) -> str:
+    a = payload.get("security_analysis", {})
+    lines = []
+    lines.append("=" * 60)
+    lines.append("VAULTGUARD SECURITY ANALYSIS REPORT (MVP)")
+    lines.append("=" * 60)
+    lines.append(f"Image: {payload.get('image')}")
+    lines.append(f"Timestamp: {payload.get('timestamp')}")
+    lines.append(f"Security score: {a.get('security_score')}%")
+    lines.append("")
+    lines.append("SETTINGS:")
+    for k, v in (a.get("settings") or {}).items():
+        if v.get("detected"):
+            lines.append(f"- {k}: {v.get('status')} (conf {v.get('confidence')}%)")
+    lines.append("")
+    lines.append("RISKS:")
+    for r in a.get("risks") or []:
+        lines.append(f"- {r}")
+    lines.append("")
+    lines.append("RECOMMENDATIONS:")
+    for r in a.get("recommendations") or []:
+        lines.append(f"- {r}")
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+class ResultStore:
+    """
+    Append-only SQLite store for analysis payloads.
+
+    Writes are batched: rows are committed every `commit_every` appends and on flush()/close(),
+    so a large run pays one fsync per batch instead of three file creations per image.
+    """
+
+    def __init__(self, path: str, commit_every: int = 200):
+        self.path = path
+        self.commit_every = max(1, commit_every)
+        self._pending = 0
+        self._lock = threading.Lock()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        # The analyzer appends from its pipeline writer thread, not the thread that opened the store.
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analysis_results (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              image_hash TEXT NOT NULL,
+              image TEXT NOT NULL,
+              timestamp TEXT NOT NULL,
+              security_score REAL,
+              payload TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_hash ON analysis_results(image_hash)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_ts ON analysis_results(timestamp)")
+        self.conn.commit()
+
+    def append(self, payload: dict, image_hash: str) -> int:
+        score = (payload.get("security_analysis") or {}).get("security_score")
+        with self._lock:
+            cur = self.conn.execute(
+                """
+                INSERT INTO analysis_results(image_hash, image, timestamp, security_score, payload)
+                VALUES(?, ?, ?, ?, ?)
+                """,
+                (
+                    image_hash,
+                    payload.get("image") or "",
+                    payload.get("timestamp") or "",
+                    score,
+                    json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+                ),
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self.conn.commit()
+                self._pending = 0
+            return int(cur.lastrowid)
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self.conn.commit()
+                self._pending = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def has(self, image_hash: str) -> bool:
+        """True when the store has a row for the image hash."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM analysis_results WHERE image_hash = ? LIMIT 1", (image_hash,)
+            ).fetchone()
+        return row is not None
+
+    def get(self, key: str) -> dict | None:
+        """Latest payload for an image hash, or for an image file name when no hash matches."""
+        self.flush()
+        row = self.conn.execute(
+            "SELECT payload FROM analysis_results WHERE image_hash = ? ORDER BY id DESC LIMIT 1",
+            (key,),
+        ).fetchone()
+        if row is None:
+            row = self.conn.execute(
+                "SELECT payload FROM analysis_results WHERE image = ? ORDER BY id DESC LIMIT 1",
+                (key,),
+            ).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def report(self, key: str) -> str | None:
+        payload = self.get(key)
+        return render_report(payload) if payload else None
+
+    def latest(self, limit: int = 20) -> list[dict]:
+        self.flush()
+        rows = self.conn.execute(
+            """
+            SELECT image_hash, image, timestamp, security_score
+            FROM analysis_results ORDER BY timestamp DESC, id DESC LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) >= 3 and os.path.isfile(argv[1]):
+        store = ResultStore(argv[1])
+        try:
+            if argv[2] == "--report" and len(argv) >= 4:
+                text = store.report(argv[3])
+                if text is None:
+                    print(f"No result for: {argv[3]}")
+                    return 1
+                print(text, end="")
+                return 0
+            if argv[2] == "--list":
+                limit = int(argv[3]) if len(argv) >= 4 else 20
+                print(json.dumps(store.latest(limit), indent=2, ensure_ascii=False))
+                return 0
+        finally:
+            store.close()
+    print("Usage: python result_store.py <store.db> --report <image_hash|image_name> | --list [N]")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -4,17 +4,46 @@ VAULTGUARD OCR + SECURITY ANALYZER (SUBPUNCT 2.3.3)
 Flow:
   images (test_images/) -> OCR -> extracted text file (ocr_results/) -> parse -> JSON + report (security_results/)
 
+Folders are processed as a staged pipeline (see pipeline.py): file reads and result writes
+run on threads, preprocessing runs in worker processes and OCR on threads that each drive one
+tesseract process (pytesseract already runs it out of process), with bounded queues in between
+so disk, CPU and Tesseract stay busy at the same time. --workers N keeps N images in
+preprocessing or OCR at once.
+
+With --store (or VAULTGUARD_RESULT_STORE) results go to one indexed SQLite store instead of
+per-image extract/JSON/report files; reports are then rendered on request with --report.
+
+Each worker gets an even share of the CPUs for Tesseract/OpenCV threads (ocr_scheduler.py);
+without --workers the worker count comes from VAULTGUARD_OCR_WORKERS or a saved calibration
+(python ocr_scheduler.py --calibrate <folder>). The chosen plan is reported under
+pipeline.scheduler in the summary.
+
+Folder runs stream one JSONL record per image to a per-folder journal
+(security_results/RUN_<folder>_<hash>.jsonl) as each image completes, and keep only running
+aggregates (score distribution, per-setting counts, timing spans) in memory; the SUMMARY_*.json
+written at the end is built from those aggregates. After a crash, --resume skips the images
+already in the journal, retries the ones journaled as failed and rebuilds the aggregates from
+the rest. Every analyzed image is also counted in the OCR tools' processing index
+(processing_index.py), which generate_report.py reads.
+
 Usage:
-  python security_analyzer.py <image_path|folder_path>
+  python security_analyzer.py <image_path|folder_path> [--workers N] [--store results.db] [--resume]
+  python security_analyzer.py --store results.db --report <image_hash|image_name>
   python security_analyzer.py  (defaults to ~/vaultguard/test_images)
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import sys
+import time
 from datetime import datetime
+from functools import cached_property
+
+# pipeline/result_store (multiprocessing, sqlite3) and the OCR stack are imported on first use so
+# short invocations and spawned worker processes (which re-import this module) start fast.
 
 
 def vault_dir() -> str:
@@ -28,8 +57,10 @@ def vault_dir() -> str:
 def ensure_paths():
     # Add vaultguard/ocr and vaultguard/security to sys.path when running from installed location.
     base = vault_dir()
-    sys.path.insert(0, os.path.join(base, "ocr"))
-    sys.path.insert(0, os.path.join(base, "security"))
+    for sub in ("ocr", "security"):
+        p = os.path.join(base, sub)
+        if p not in sys.path:
+            sys.path.insert(0, p)
 
 
 def list_images(folder: str) -> list[str]:
@@ -41,39 +72,221 @@ def list_images(folder: str) -> list[str]:
     return sorted(imgs)
 
 
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
 def write_text(path: str, content: str):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         f.write(content)
 
 
+def journal_path(results_dir: str, folder: str) -> str:
+    folder = os.path.abspath(folder)
+    tag = hashlib.sha1(folder.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(results_dir, f"RUN_{os.path.basename(folder) or 'root'}_{tag}.jsonl")
+
+
+class RunJournal:
+    """
+    Append-only JSONL record of a folder run, one line per finished image, flushed as written so
+    a crash loses at most the line being written. load() streams the complete records of an
+    earlier run and cuts off a torn last line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = None
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return
+        good = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good += len(line)
+                yield record
+        if good != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    def rewrite(self, keep):
+        """Drop the records for which keep(record) is false."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in self.load():
+                if keep(record):
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+
+    def open(self, resume: bool):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._f = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def append(self, record: dict):
+        self._f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+# --- pipeline stage functions (module level so process pools can pickle them) ---
+
+OCR_MODE = "windows_security"
+
+
+def _read_stage(image_path: str) -> dict:
+    from result_store import image_hash
+
+    with open(image_path, "rb") as f:
+        data = f.read()
+    return {"image_path": image_path, "data": data, "image_hash": image_hash(data)}
+
+
+def _preprocess_stage(job: dict) -> dict:
+    from ocr_engine import Spans, maybe_profile, measure_rss, peak_rss_mb, preprocess_encoded  # type: ignore
+
+    spans = Spans()
+    t0 = time.time()
+    with measure_rss() as mem, maybe_profile("preprocess"):
+        arr = preprocess_encoded(job["data"], mode=OCR_MODE, spans=spans)
+    return {
+        "image_path": job["image_path"],
+        "image_hash": job["image_hash"],
+        "array": arr,
+        "preprocess_s": time.time() - t0,
+        "timings_ms": spans.as_ms(),
+        # Preprocessing is the memory-heavy step and runs one image at a time per worker, so its
+        # window is this image's peak; report it alongside the OCR result.
+        "rss": {**mem, "process_peak_rss_mb": peak_rss_mb()},
+    }
+
+
+def _ocr_stage(job: dict) -> dict:
+    from ocr_engine import Spans, ocr_preprocessed  # type: ignore
+
+    spans = Spans()
+    spans.merge(job["timings_ms"])
+    ocr = ocr_preprocessed(job["array"], mode=OCR_MODE, spans=spans, cache_key=job["image_hash"])
+    ocr["processing_time_s"] = job["preprocess_s"] + ocr["processing_time_s"]
+    ocr.update(job["rss"])
+    return {"image_path": job["image_path"], "image_hash": job["image_hash"], "ocr": ocr}
+
+
 class VaultGuardSecurityAnalyzer:
-    def __init__(self):
+    def __init__(self, store_path: str | None = None):
         ensure_paths()
-        from ocr_engine import extract_text, save_result  # type: ignore
-        from security_parser import SecuritySettingsParser  # type: ignore
-
         self.vault = vault_dir()
-        self.extract_text = extract_text
-        self.save_result = save_result
-        self.parser = SecuritySettingsParser()
-
         self.results_dir = os.path.join(self.vault, "security_results")
         os.makedirs(self.results_dir, exist_ok=True)
 
-    def analyze_image(self, image_path: str) -> dict:
-        base = os.path.splitext(os.path.basename(image_path))[0]
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        store_path = store_path or os.environ.get("VAULTGUARD_RESULT_STORE")
+        self.store = None
+        if store_path:
+            from result_store import ResultStore
+
+            self.store = ResultStore(store_path)
+        # Set during analyze_folder: rows are then committed in the store's batches, not per image.
+        self._folder_run = False
+
+    @cached_property
+    def engine(self):
+        import ocr_engine  # type: ignore
+
+        return ocr_engine
+
+    @cached_property
+    def parser(self):
+        from security_parser import SecuritySettingsParser  # type: ignore
+
+        return SecuritySettingsParser()
+
+    def extract_text(self, *args, **kwargs) -> dict:
+        return self.engine.extract_text(*args, **kwargs)
+
+    def save_result(self, *args, **kwargs) -> str:
+        return self.engine.save_result(*args, **kwargs)
 
+    @property
+    def supports_pipeline(self) -> bool:
+        # Older installed engines only expose extract_text; those fall back to the sequential loop.
+        return hasattr(self.engine, "preprocess_encoded") and hasattr(self.engine, "ocr_preprocessed")
+
+    @cached_property
+    def index(self):
+        try:
+            from processing_index import ProcessingIndex  # type: ignore
+        except ImportError as e:  # older installed OCR tools: no processing index
+            print(f"⚠ Processing index unavailable, results are not counted for reports: {e}", file=sys.stderr)
+            return None
+        return ProcessingIndex()
+
+    def index_result(self, r: dict):
+        if self.index is not None:
+            self.index.record(
+                "analysis", r.get("processing_time_s"), error="error" in r, score=r.get("score")
+            )
+
+    def close(self):
+        if "index" in self.__dict__ and self.index is not None:
+            self.index.close()
+        if self.store is not None:
+            self.store.close()
+
+    def analyze_image(self, image_path: str) -> dict:
+        with open(image_path, "rb") as f:
+            data = f.read()
+        # Engines with in-memory input OCR the bytes already read; older ones re-read the path.
+        return self.analyze_bytes(data, image_path, source=data if self.supports_pipeline else image_path)
+
+    def analyze_bytes(self, data, name: str, source=None) -> dict:
+        """
+        Analyze an in-memory image (encoded bytes, memoryview or decoded array), e.g. an upload
+        body, without writing it to disk first. `name` labels the result files / store row,
+        which is committed before returning (folder runs commit in batches instead).
+        """
+        source = data if source is None else source
         # Prefer the Windows Security OCR mode when available.
         try:
-            ocr = self.extract_text(image_path, mode="windows_security")
+            ocr = self.extract_text(source, mode=OCR_MODE)
         except TypeError:
-            ocr = self.extract_text(image_path)
-        ocr_txt_path = self.save_result(self.vault, image_path, ocr)
+            ocr = self.extract_text(source)
+        h = None
+        if self.store is not None:
+            from result_store import image_hash
+
+            h = image_hash(data)
+        r = self._finish_image(name, ocr, h)
+        if self.store is not None and not self._folder_run:
+            self.store.flush()
+        return r
+
+    def _finish_image(self, image_path: str, ocr: dict, img_hash: str | None = None) -> dict:
+        """Parse the OCR text and record the result (store row, or extract/JSON/report files)."""
+        base = os.path.splitext(os.path.basename(image_path))[0]
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        spans = self.engine.Spans()
+        spans.merge(ocr.get("timings_ms"))
+
+        # With a result store the OCR text lives in the stored payload, not in ocr_results/.
+        with spans.span("write"):
+            ocr_txt_path = self.save_result(self.vault, image_path, ocr) if self.store is None else None
 
         ocr_text = ocr.get("text", "") or ""
-        analysis = self.parser.parse_text(ocr_text)
+        with spans.span("parse"):
+            analysis = self.parser.parse_text(ocr_text)
+        ocr["timings_ms"] = spans.as_ms()
+        statuses = {name: st.get("status") for name, st in (analysis.get("settings") or {}).items()}
         analysis["source_image"] = os.path.basename(image_path)
         analysis["ocr_text_file"] = ocr_txt_path
         analysis["ocr_text_len"] = len(ocr_text)
@@ -86,76 +299,223 @@ class VaultGuardSecurityAnalyzer:
             "ocr_text_excerpt": ocr_text[:400],
         }
 
-        json_path = os.path.join(self.results_dir, f"{base}_analysis.json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2, ensure_ascii=False)
-
-        report_path = os.path.join(self.results_dir, f"{base}_report.txt")
-        self._write_report(report_path, payload)
+        if self.store is not None:
+            with spans.span("write"):
+                self.store.append(payload, img_hash or "")
+            return {
+                "image": payload["image"],
+                "image_hash": img_hash,
+                "store": self.store.path,
+                "score": analysis.get("security_score", 0.0),
+                "processing_time_s": ocr.get("processing_time_s"),
+                "statuses": statuses,
+                "timings_ms": spans.as_ms(),
+            }
+
+        with spans.span("write"):
+            json_path = os.path.join(self.results_dir, f"{base}_analysis.json")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2, ensure_ascii=False)
+
+            report_path = os.path.join(self.results_dir, f"{base}_report.txt")
+            self._write_report(report_path, payload)
 
         return {
+            "image": payload["image"],
             "json": json_path,
             "report": report_path,
             "score": analysis.get("security_score", 0.0),
+            "processing_time_s": ocr.get("processing_time_s"),
+            "statuses": statuses,
+            "timings_ms": spans.as_ms(),
         }
 
-    def analyze_folder(self, folder: str) -> dict:
+    def analyze_folder(self, folder: str, workers: int | None = None, resume: bool = False) -> dict:
+        from security_parser import ScoreAggregate  # type: ignore
+
         imgs = list_images(folder)
+        journal = RunJournal(journal_path(self.results_dir, folder))
+        scores = ScoreAggregate()
+        timings = self.engine.TimingAggregate()
+        done = set()
+        if resume:
+            stale = False
+            for r in journal.load():
+                # Failed images are retried. Store rows are committed in batches: a journaled
+                # image whose row never made it to disk is analyzed again too.
+                if "error" in r or (
+                    self.store is not None and r.get("image_hash") and not self.store.has(r["image_hash"])
+                ):
+                    stale = True
+                    continue
+                done.add(r.get("image"))
+                self._aggregate(scores, timings, r)
+            if stale:
+                journal.rewrite(lambda r: "error" not in r and r.get("image") in done)
+        todo = [img for img in imgs if os.path.basename(img) not in done]
         out = {
             "folder": folder,
             "count": len(imgs),
-            "results": [],
+            "resumed": len(imgs) - len(todo),
+            "journal": journal.path,
             "timestamp": datetime.now().isoformat(timespec="seconds"),
         }
-        for i, img in enumerate(imgs, 1):
-            print(f"[{i}/{len(imgs)}] {os.path.basename(img)}")
-            r = self.analyze_image(img)
-            out["results"].append(r)
+        journal.open(resume=resume)
+
+        def record(r: dict):
+            journal.append(r)
+            self._aggregate(scores, timings, r)
+            self.index_result(r)
+
+        self._folder_run = True
+        try:
+            if not workers:
+                workers = self.scheduler.plan_threads()["workers"] if self.scheduler is not None else default_workers()
+            if workers > 1 and self.supports_pipeline and len(todo) > 1:
+                out["pipeline"] = self._analyze_pipelined(todo, workers, record)
+            else:
+                for i, img in enumerate(todo, 1):
+                    print(f"[{i}/{len(todo)}] {os.path.basename(img)}")
+                    try:
+                        r = self.analyze_image(img)
+                    except Exception as e:
+                        print(f"   ERROR: {e}")
+                        r = {"image": os.path.basename(img), "error": str(e)}
+                    record(r)
+        finally:
+            self._folder_run = False
+            journal.close()
+            if "index" in self.__dict__ and self.index is not None:
+                self.index.flush()
+        if self.store is not None:
+            self.store.flush()
+            out["store"] = self.store.path
+        out.update(scores.summary())
+        out["timings"] = timings.summary()
         summary_path = os.path.join(self.results_dir, f"SUMMARY_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
         with open(summary_path, "w", encoding="utf-8") as f:
             json.dump(out, f, indent=2, ensure_ascii=False)
         out["summary"] = summary_path
         return out
 
+    @staticmethod
+    def _aggregate(scores, timings, r: dict):
+        if "error" in r:
+            scores.add(r)
+            return
+        settings = {name: {"status": status} for name, status in (r.get("statuses") or {}).items()}
+        scores.add({"security_score": r.get("score"), "settings": settings})
+        timings.add(r.get("timings_ms"))
+
+    @cached_property
+    def scheduler(self):
+        try:
+            import ocr_scheduler  # type: ignore
+        except ImportError:  # older installed OCR tools: no thread limits
+            return None
+        return ocr_scheduler
+
+    def build_pipeline(self, workers: int, threads: int | None = None):
+        """
+        Pipeline keeping `workers` images in flight: preprocessing processes plus OCR threads,
+        each thread waiting on its own tesseract process. Needs at least 2 workers; a single
+        worker runs the images one by one instead (see analyze_folder).
+        """
+        from pipeline import Pipeline, Stage
+
+        if workers < 2:
+            raise ValueError("the pipeline needs at least 2 workers")
+        initializer = ensure_paths
+        if threads and self.scheduler is not None:
+            # Preprocessing workers limit OpenCV to their share; tesseract processes started by
+            # the OCR threads inherit OMP_THREAD_LIMIT from this process.
+            initializer = self.scheduler.worker_initializer(threads, ensure_paths)
+            self.scheduler.apply_thread_limits(threads)
+        # Tesseract dominates per-image cost, so most workers go to the OCR stage.
+        pre = max(1, workers // 3)
+        ocr = workers - pre
+        return Pipeline(
+            [
+                Stage("read", _read_stage, workers=2),
+                Stage("preprocess", _preprocess_stage, workers=pre, processes=True),
+                Stage("ocr", _ocr_stage, workers=ocr),
+                Stage(
+                    "parse_write",
+                    lambda job: self._finish_image(job["image_path"], job["ocr"], job["image_hash"]),
+                    workers=1,
+                ),
+            ],
+            initializer=initializer,
+        )
+
+    def _analyze_pipelined(self, imgs: list[str], workers: int, record) -> dict:
+        plan = self.scheduler.plan_threads(workers) if self.scheduler is not None else None
+        pipe = self.build_pipeline(workers, plan["threads"] if plan else None)
+        for img, r, err in pipe.run(imgs):
+            print(f"[{pipe.completed}/{len(imgs)}] {os.path.basename(img)}")
+            if err is not None:
+                print(f"   ERROR: {err}")
+                record({"image": os.path.basename(img), "error": str(err)})
+            else:
+                record(r)
+        report = pipe.report()
+        if plan is not None:
+            report["scheduler"] = plan
+        return report
+
     def _write_report(self, path: str, payload: dict):
-        a = payload.get("security_analysis", {})
-        lines = []
-        lines.append("=" * 60)
-        lines.append("VAULTGUARD SECURITY ANALYSIS REPORT (MVP)")
-        lines.append("=" * 60)
-        lines.append(f"Image: {payload.get('image')}")
-        lines.append(f"Timestamp: {payload.get('timestamp')}")
-        lines.append(f"Security score: {a.get('security_score')}%")
-        lines.append("")
-        lines.append("SETTINGS:")
-        for k, v in (a.get("settings") or {}).items():
-            if v.get("detected"):
-                lines.append(f"- {k}: {v.get('status')} (conf {v.get('confidence')}%)")
-        lines.append("")
-        lines.append("RISKS:")
-        for r in a.get("risks") or []:
-            lines.append(f"- {r}")
-        lines.append("")
-        lines.append("RECOMMENDATIONS:")
-        for r in a.get("recommendations") or []:
-            lines.append(f"- {r}")
-        lines.append("")
-        write_text(path, "\n".join(lines) + "\n")
+        from result_store import render_report
 
+        write_text(path, render_report(payload))
 
-def main(argv: list[str]) -> int:
-    analyzer = VaultGuardSecurityAnalyzer()
-    target = argv[1] if len(argv) >= 2 else os.path.join(vault_dir(), "test_images")
 
-    if os.path.isdir(target):
-        res = analyzer.analyze_folder(target)
-        print(json.dumps(res, indent=2, ensure_ascii=False))
-        return 0
-    if os.path.isfile(target):
-        res = analyzer.analyze_image(target)
-        print(json.dumps(res, indent=2, ensure_ascii=False))
+def main(argv: list[str]) -> int:
+    args = list(argv[1:])
+    opts = {}
+    for flag in ("--workers", "--store", "--report"):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i : i + 2]
+    workers = int(opts["--workers"]) if "--workers" in opts else None
+    resume = "--resume" in args
+    if resume:
+        args.remove("--resume")
+
+    if "--report" in opts:
+        store_path = opts.get("--store") or os.environ.get("VAULTGUARD_RESULT_STORE")
+        if not store_path or not os.path.isfile(store_path):
+            print("--report needs an existing --store results file")
+            return 1
+        from result_store import ResultStore
+
+        store = ResultStore(store_path)
+        try:
+            text = store.report(opts["--report"])
+        finally:
+            store.close()
+        if text is None:
+            print(f"No result for: {opts['--report']}")
+            return 1
+        print(text, end="")
         return 0
 
+    analyzer = VaultGuardSecurityAnalyzer(store_path=opts.get("--store"))
+    target = args[0] if args else os.path.join(vault_dir(), "test_images")
+
+    try:
+        if os.path.isdir(target):
+            res = analyzer.analyze_folder(target, workers=workers, resume=resume)
+            print(json.dumps(res, indent=2, ensure_ascii=False))
+            return 0
+        if os.path.isfile(target):
+            res = analyzer.analyze_image(target)
+            analyzer.index_result(res)
+            print(json.dumps(res, indent=2, ensure_ascii=False))
+            return 0
+    finally:
+        analyzer.close()
+
     print(f"Invalid path: {target}")
     return 1
 
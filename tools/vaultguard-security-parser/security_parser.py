@@ -10,19 +10,33 @@ Analyzes OCR-extracted text and detects security settings:
 - BitLocker / Drive encryption
 - UAC
 
+Rules come from versioned rule packs, one JSON file per locale (rules/<locale>.json: name,
+version, locale, settings). Packs are validated and compiled once per content hash per
+process, reloaded when the file changes, and every result records the pack it was produced with under "rule_pack" (name, version, hash).
+
+Bulk mode re-scores an archive of OCR extracts (e.g. ocr_results/*_extracted.txt) in a process
+pool with the rules compiled once per worker. Results stream to one JSONL file (one analysis
+per line, in completion order), followed by aggregate statistics: the score distribution and
+per-setting status counts.
+
 Usage:
   python security_parser.py --test
   python security_parser.py <file.txt>
+  python security_parser.py --bulk <dir|glob> [<dir|glob> ...] [--out results.jsonl] [--workers N]
+  python security_parser.py --rules [locale|pack.json]
 """
 
 from __future__ import annotations
 
+import glob
 import json
+import os
 import re
+import sys
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, List
-import sys
 
 
 @dataclass
@@ -33,109 +47,157 @@ class SettingResult:
     evidence: List[str]
 
 
-class SecuritySettingsParser:
-    def __init__(self):
-        self.rules = self._load_security_rules()
+RULES_DIR = os.environ.get("VAULTGUARD_RULES_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules")
+DEFAULT_RULE_PACK = os.environ.get("VAULTGUARD_RULE_PACK", "ro-en")
+RELOAD_CHECK_S = float(os.environ.get("VAULTGUARD_RULES_RELOAD_S", "2"))
+_PATTERN_FLAGS = re.IGNORECASE | re.DOTALL
 
-    def _load_security_rules(self) -> dict:
-        # NOTE: MVP rules are keyword/pattern-based. Can be extended with locale dictionaries.
-        return {
-            "firewall": {
-                "patterns": [
-                    r"firewall\s*[:\-]?\s*(on|enabled|running|active|activ|activat|pornit)",
-                    r"firewall\s*[:\-]?\s*(off|disabled|stopped|oprit|dezactivat|inactiv)",
-                    r"(windows defender firewall|firewall).*(on|enabled|running|active|activ|activat|pornit)",
-                    r"(windows defender firewall|firewall).*(off|disabled|stopped|oprit|dezactivat|inactiv)",
-                ],
-                "positive_keywords": ["on", "enabled", "running", "active", "activ", "activat", "pornit"],
-                "negative_keywords": ["off", "disabled", "stopped", "oprit", "dezactivat", "inactiv"],
-            },
-            "antivirus": {
-                "patterns": [
-                    r"(antivirus|defender)\s*[:\-]?\s*(on|enabled|running|active|activ|activat|actualizat|up to date)",
-                    r"(antivirus|defender)\s*[:\-]?\s*(off|disabled|stopped|oprit|dezactivat|outdated)",
-                    r"(windows defender|defender antivirus|antivirus|virus.*protection).*(on|enabled|running|active|activ|activat|actualizat|up to date)",
-                    r"(windows defender|defender antivirus|antivirus|virus.*protection).*(off|disabled|stopped|oprit|dezactivat|outdated)",
-                ],
-                "positive_keywords": ["on", "enabled", "running", "active", "activ", "activat", "actualizat", "up to date"],
-                "negative_keywords": ["off", "disabled", "stopped", "oprit", "dezactivat", "outdated"],
-            },
-            "windows_update": {
-                "patterns": [
-                    r"(windows update|update)\s*[:\-]?\s*(on|enabled|automatic|activ|activat|automat|pornit)",
-                    r"(windows update|update)\s*[:\-]?\s*(off|disabled|manual|oprit|dezactivat)",
-                    r"(windows update|updates?).*(on|enabled|automatic|activ|activat|automat|pornit)",
-                    r"(windows update|updates?).*(off|disabled|manual|oprit|dezactivat)",
-                ],
-                "positive_keywords": ["on", "enabled", "automatic", "activ", "activat", "automat", "pornit"],
-                "negative_keywords": ["off", "disabled", "manual", "oprit", "dezactivat"],
-            },
-            "password_policy": {
-                "patterns": [
-                    r"(password|parol[ăa]).*(strong|complex|puternic[ăa]|enforced)",
-                    r"(password|parol[ăa]).*(weak|simple|slab[ăa]|simpl[ăa])",
-                ],
-                "positive_keywords": ["strong", "complex", "puternica", "puternică", "puternic", "enforced"],
-                "negative_keywords": ["weak", "simple", "slaba", "slabă", "simpla", "simplă", "simplu"],
-            },
-            "backup": {
-                "patterns": [
-                    r"(backup)\s*[:\-]?\s*(on|enabled|automatic|activ|activat|automat)",
-                    r"(backup)\s*[:\-]?\s*(off|disabled|none|oprit|dezactivat|nu)",
-                    r"backu[pb]\s*(on|enabled|automatic|activ|activat|automat)",
-                    r"backu[pb]\s*(off|disabled|none|oprit|dezactivat|nu)",
-                    r"[bg]ackup\s*(on|enabled|automatic|activ|activat|automat)",
-                    r"[bg]ackup\s*(off|disabled|none|oprit|dezactivat|nu)",
-                    r"[bg]ackup.*(on|enabled|automatic|activ|activat|automat)",
-                    r"[bg]ackup.*(off|disabled|none|oprit|dezactivat|nu)",
-                    r"(backup|file history|windows backup).*(on|enabled|automatic|activ|activat|automat)",
-                    r"(backup|file history|windows backup).*(off|disabled|none|oprit|dezactivat|nu)",
-                ],
-                "positive_keywords": ["on", "enabled", "automatic", "activ", "activat", "automat"],
-                "negative_keywords": ["off", "disabled", "none", "oprit", "dezactivat", "nu"],
-            },
-            "bitlocker": {
-                "patterns": [
-                    r"(bitlocker|encryption)\s*[:\-]?\s*(on|enabled|encrypted|activ|activat)",
-                    r"(bitlocker|encryption)\s*[:\-]?\s*(off|disabled|unencrypted|oprit|dezactivat)",
-                    r"(bitlocker|drive encryption|device encryption).*(on|enabled|encrypted|activ|activat)",
-                    r"(bitlocker|drive encryption|device encryption).*(off|disabled|unencrypted|oprit|dezactivat)",
-                ],
-                "positive_keywords": ["on", "enabled", "encrypted", "activ", "activat"],
-                "negative_keywords": ["off", "disabled", "unencrypted", "oprit", "dezactivat"],
-            },
-            "uac": {
-                "patterns": [
-                    r"(uac)\s*[:\-]?\s*(on|enabled|always notify|activ|activat|notificare)",
-                    r"(uac)\s*[:\-]?\s*(off|disabled|never notify|oprit|dezactivat)",
-                    r"(user account control|uac).*(on|enabled|always notify|activ|activat|notificare)",
-                    r"(user account control|uac).*(off|disabled|never notify|oprit|dezactivat)",
-                ],
-                "positive_keywords": ["on", "enabled", "always notify", "activ", "activat", "notificare"],
-                "negative_keywords": ["off", "disabled", "never notify", "oprit", "dezactivat"],
-            },
+
+class RulePack:
+    """
+    A loaded rule pack: metadata, normalized settings and their compiled patterns. Compiled
+    patterns are shared by every pack (and parser) in the process with the same content hash.
+    """
+
+    def __init__(self, path: str, meta: dict, settings: dict, compiled: dict, digest: str, stat_key: tuple):
+        self.path = path
+        self.name = meta.get("name") or os.path.splitext(os.path.basename(path))[0]
+        self.version = str(meta.get("version") or "0")
+        self.locale = meta.get("locale") or ""
+        self.hash = digest
+        self.settings = settings
+        self.stat_key = stat_key
+        self.compiled = compiled
+
+    def info(self) -> dict:
+        return {"name": self.name, "version": self.version, "locale": self.locale, "hash": self.hash[:16]}
+
+
+# content hash -> (metadata, settings, compiled patterns)
+_loaded_by_hash: Dict[str, tuple] = {}
+_packs: Dict[str, RulePack] = {}
+
+
+def rule_pack_path(pack: str | None = None) -> str:
+    """A pack file path, or the path of a locale's pack (<RULES_DIR>/<locale>.json)."""
+    pack = pack or DEFAULT_RULE_PACK
+    if pack.endswith(".json") or os.sep in pack or "/" in pack:
+        return pack
+    return os.path.join(RULES_DIR, f"{pack}.json")
+
+
+def _normalize_pack(path: str, pack: dict) -> tuple[dict, dict, dict]:
+    """
+    Validate a parsed pack; returns (metadata, settings with keywords lower-cased, compiled
+    patterns per setting). Each pattern is compiled once, by the validation itself.
+    """
+    settings = pack.get("settings")
+    if not isinstance(settings, dict) or not settings:
+        raise ValueError(f"Rule pack {path}: 'settings' must be a non-empty object")
+    out = {}
+    compiled = {}
+    for name, rule in settings.items():
+        patterns = rule.get("patterns") or []
+        compiled[name] = []
+        for pattern in patterns:
+            try:
+                compiled[name].append(re.compile(pattern, _PATTERN_FLAGS))
+            except re.error as e:
+                raise ValueError(f"Rule pack {path}: bad pattern for {name!r}: {e}") from None
+        out[name] = {
+            "patterns": list(patterns),
+            "positive_keywords": [k.lower() for k in rule.get("positive_keywords") or []],
+            "negative_keywords": [k.lower() for k in rule.get("negative_keywords") or []],
         }
+    meta = {k: pack.get(k) for k in ("name", "version", "locale")}
+    return meta, out, compiled
+
+
+def load_rule_pack(pack: str | None = None) -> RulePack:
+    """
+    Load a rule pack by locale or path. Memoized per process on the file's mtime/size; content
+    seen before in this process (same hash, e.g. an edit that was reverted) reuses its
+    validated settings and compiled patterns.
+    """
+    import hashlib
+
+    path = os.path.abspath(rule_pack_path(pack))
+    st = os.stat(path)
+    stat_key = (st.st_mtime_ns, st.st_size)
+    cached = _packs.get(path)
+    if cached is not None and cached.stat_key == stat_key:
+        return cached
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached is not None and cached.hash == digest:
+        cached.stat_key = stat_key  # touched, not changed
+        return cached
+    loaded = _loaded_by_hash.get(digest)
+    if loaded is None:
+        loaded = _normalize_pack(path, json.loads(raw.decode("utf-8")))
+        _loaded_by_hash[digest] = loaded
+    rp = RulePack(path, *loaded, digest, stat_key)
+    _packs[path] = rp
+    return rp
+
+
+class SecuritySettingsParser:
+    def __init__(self, rule_pack: str | None = None, reload_check_s: float | None = None):
+        """
+        `rule_pack` is a locale (rules/<locale>.json) or a pack path; default VAULTGUARD_RULE_PACK.
+        The pack file is checked for changes at most every `reload_check_s` seconds
+        (VAULTGUARD_RULES_RELOAD_S, 0 disables) and reloaded in place, so long-running processes
+        pick up rule edits without a restart.
+        """
+        self.rule_pack_name = rule_pack
+        self.reload_check_s = RELOAD_CHECK_S if reload_check_s is None else reload_check_s
+        self.pack = load_rule_pack(rule_pack)
+        self._checked_at = time.monotonic()
+
+    @property
+    def rules(self) -> dict:
+        return self.pack.settings
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Reload the rule pack if its file changed; True when a different pack is now active."""
+        now = time.monotonic()
+        if not force and (self.reload_check_s <= 0 or now - self._checked_at < self.reload_check_s):
+            return False
+        self._checked_at = now
+        try:
+            pack = load_rule_pack(self.rule_pack_name)
+        except (OSError, ValueError) as e:
+            # Keep serving with the last good pack while a bad edit is being fixed.
+            print(f"⚠ Rule pack reload failed, keeping {self.pack.name} {self.pack.version}: {e}", file=sys.stderr)
+            return False
+        changed = pack.hash != self.pack.hash
+        self.pack = pack
+        return changed
 
     def parse_text(self, text: str) -> dict:
         if not text or not text.strip():
             return {"error": "empty_text"}
 
+        self.reload_if_changed()
+        pack = self.pack
         text_lower = text.lower()
         results = {
             "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "rule_pack": pack.info(),
             "settings": {},
             "security_score": 0.0,
             "recommendations": [],
             "risks": [],
         }
 
-        total = len(self.rules)
+        total = len(pack.settings)
         positive = 0
 
-        for setting_name, rule in self.rules.items():
+        for setting_name, rule in pack.settings.items():
             evidence: List[str] = []
-            for pattern in rule["patterns"]:
-                for m in re.finditer(pattern, text_lower, re.IGNORECASE | re.DOTALL):
+            for pattern in pack.compiled[setting_name]:
+                for m in pattern.finditer(text_lower):
                     snippet = m.group(0).strip()
                     if snippet and snippet not in evidence:
                         evidence.append(snippet[:200])
@@ -207,15 +269,171 @@ class SecuritySettingsParser:
 
     def analyze_file(self, file_path: str) -> dict:
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                text = f.read()
-            analysis = self.parse_text(text)
+            analysis = self.parse_text(read_ocr_text(file_path))
             analysis["source_file"] = file_path
             return analysis
         except Exception as e:
             return {"error": str(e), "file": file_path}
 
 
+EXTRACT_SEPARATOR = "=" * 60 + "\n"
+
+
+def read_ocr_text(path: str) -> str:
+    """
+    Text of an OCR file. For ocr_engine extracts (*_extracted.txt) the "# Image/# Date/..." header
+    is dropped so the rules see only OCR output, exactly as security_analyzer parses it.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if content.startswith("# VaultGuard OCR Extract"):
+        i = content.find(EXTRACT_SEPARATOR)
+        if i >= 0:
+            return content[i + len(EXTRACT_SEPARATOR) :]
+    return content
+
+
+class ScoreAggregate:
+    """
+    Online statistics over parse_text results: score distribution (exact per-score counts, so
+    percentiles are exact; scores are multiples of 100/len(rules)) and per-setting status counts.
+    Memory depends on the number of distinct scores and settings, not on the number of results.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.score_sum = 0.0
+        self.scores: Dict[float, int] = {}
+        self.settings: Dict[str, Dict[str, int]] = {}
+        self.risk_levels: Dict[str, int] = {"high": 0, "medium": 0, "none": 0}
+
+    def add(self, analysis: dict):
+        if not analysis or "error" in analysis:
+            self.errors += 1
+            return
+        score = float(analysis.get("security_score") or 0.0)
+        self.count += 1
+        self.score_sum += score
+        self.scores[score] = self.scores.get(score, 0) + 1
+        insecure = 0
+        for name, st in (analysis.get("settings") or {}).items():
+            counts = self.settings.setdefault(name, {"secure": 0, "insecure": 0, "neutral": 0, "unknown": 0})
+            status = st.get("status", "unknown")
+            counts[status] = counts.get(status, 0) + 1
+            insecure += 1 if status == "insecure" else 0
+        self.risk_levels["high" if insecure >= 3 else "medium" if insecure else "none"] += 1
+
+    def percentile(self, p: float) -> float | None:
+        if not self.count:
+            return None
+        rank = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for score in sorted(self.scores):
+            seen += self.scores[score]
+            if seen >= rank:
+                return score
+        return max(self.scores)
+
+    def summary(self) -> dict:
+        return {
+            "analyzed": self.count,
+            "errors": self.errors,
+            "score": {
+                "mean": round(self.score_sum / self.count, 2) if self.count else None,
+                "p10": self.percentile(10),
+                "p50": self.percentile(50),
+                "p90": self.percentile(90),
+                "min": min(self.scores) if self.scores else None,
+                "max": max(self.scores) if self.scores else None,
+                "histogram": {str(k): self.scores[k] for k in sorted(self.scores)},
+            },
+            "insecure_counts": {name: c["insecure"] for name, c in self.settings.items()},
+            "settings": self.settings,
+            "risk_levels": self.risk_levels,
+        }
+
+
+def expand_sources(sources: list[str]) -> list[str]:
+    """Files from directories (their *.txt files) and glob patterns (** allowed), deduplicated, sorted."""
+    files = set()
+    for src in sources:
+        if os.path.isdir(src):
+            files.update(os.path.join(src, n) for n in os.listdir(src) if n.lower().endswith(".txt"))
+        elif os.path.isfile(src):
+            files.add(src)
+        else:
+            files.update(p for p in glob.glob(src, recursive=True) if os.path.isfile(p))
+    return sorted(files)
+
+
+_bulk_parser: SecuritySettingsParser | None = None
+
+
+def _init_bulk_worker():
+    # One parser (and one set of compiled rules) per worker process.
+    global _bulk_parser
+    _bulk_parser = SecuritySettingsParser()
+
+
+def _bulk_analyze(path: str) -> dict:
+    if _bulk_parser is None:
+        _init_bulk_worker()
+    return _bulk_parser.analyze_file(path)
+
+
+def bulk_analyze(sources: list[str], out_path: str | None = None, workers: int | None = None) -> dict:
+    """
+    Analyze every file matched by `sources`, writing one JSON line per file to `out_path`
+    (stdout when None or "-"). Returns the aggregate summary.
+    """
+    files = expand_sources(sources)
+    workers = max(1, workers or os.cpu_count() or 1)
+    agg = ScoreAggregate()
+    out = sys.stdout if out_path in (None, "-") else open(out_path, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        if workers == 1 or len(files) < 2:
+            results = map(_bulk_analyze, files)
+            pool = None
+        else:
+            from multiprocessing import Pool
+
+            pool = Pool(workers, initializer=_init_bulk_worker)
+            # Small chunks keep the output streaming; big enough to amortize IPC per file.
+            results = pool.imap_unordered(_bulk_analyze, files, chunksize=max(1, min(64, len(files) // (workers * 8))))
+        try:
+            for analysis in results:
+                agg.add(analysis)
+                out.write(json.dumps(analysis, ensure_ascii=False, separators=(",", ":")) + "\n")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    wall = time.perf_counter() - start
+    summary = agg.summary()
+    summary.update(
+        {
+            "files": len(files),
+            "workers": workers,
+            "wall_s": round(wall, 3),
+            "files_per_s": round(len(files) / wall, 1) if wall > 0 else None,
+            "output": out_path if out_path not in (None, "-") else "-",
+        }
+    )
+    return summary
+
+
+def _opt(args: list[str], flag: str) -> str | None:
+    if flag in args:
+        i = args.index(flag)
+        return args[i + 1] if i + 1 < len(args) else None
+    return None
+
+
 def test_parser() -> dict:
     parser = SecuritySettingsParser()
     sample = """
@@ -237,17 +455,28 @@ def main(argv: list[str]) -> int:
     if len(argv) >= 2 and argv[1] == "--test":
         test_parser()
         return 0
+    if len(argv) >= 2 and argv[1] == "--rules":
+        pack = load_rule_pack(argv[2] if len(argv) >= 3 else None)
+        print(json.dumps({**pack.info(), "path": pack.path, "settings": list(pack.settings)}, indent=2, ensure_ascii=False))
+        return 0
+    if len(argv) >= 3 and argv[1] == "--bulk":
+        args = argv[2:]
+        out_path, workers = _opt(args, "--out"), _opt(args, "--workers")
+        sources = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or args[i - 1] not in ("--out", "--workers"))]
+        summary = bulk_analyze(sources, out_path=out_path, workers=int(workers) if workers else None)
+        # Keep stdout pure JSONL when results stream there.
+        print(json.dumps(summary, indent=2, ensure_ascii=False), file=sys.stderr if summary["output"] == "-" else sys.stdout)
+        return 0
     if len(argv) >= 2:
         p = argv[1]
         parser = SecuritySettingsParser()
         if os.path.isfile(p):
             print(json.dumps(parser.analyze_file(p), indent=2, ensure_ascii=False))
             return 0
-    print("Usage: python security_parser.py --test | <file.txt>")
+    print("Usage: python security_parser.py --test | <file.txt> | --bulk <dir|glob> ... [--out results.jsonl] [--workers N] | --rules [locale]")
     return 1
 
 
 if __name__ == "__main__":
-    import os
     raise SystemExit(main(list(sys.argv)))
 
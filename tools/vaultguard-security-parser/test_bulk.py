@@ -0,0 +1,53 @@
+"""
+Bulk re-scoring checks for security_parser (pytest).
+
+--bulk must produce the same analyses as one-file analyze_file, whatever the worker count, and
+aggregate them into the score distribution and per-setting insecure counts.
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from security_parser import SecuritySettingsParser, bulk_analyze, expand_sources
+
+TEXTS = [
+    "Windows Defender Firewall: ON\nBackup: OFF",
+    "Firewall: OPRIT\nBitLocker: ENCRYPTED",
+    "Windows Update: AUTOMATIC\nUAC: ALWAYS NOTIFY",
+]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for i, text in enumerate(TEXTS):
+        folder = tmp_path if i < 2 else tmp_path / "sub"
+        header = f"# VaultGuard OCR Extract\n# Image: img{i}.png\n" + "=" * 60 + "\n\n"
+        (folder / f"img{i}_extracted.txt").write_text(header + text + "\n", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bulk_matches_single_file(archive, workers):
+    out = archive / "out.jsonl"
+    summary = bulk_analyze([str(archive), str(archive / "sub" / "*.txt")], out_path=str(out), workers=workers)
+
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert len(rows) == summary["files"] == summary["analyzed"] == 3
+    parser = SecuritySettingsParser()
+    for row in rows:
+        expected = parser.analyze_file(row["source_file"])
+        assert row["settings"] == expected["settings"]
+        assert row["security_score"] == expected["security_score"]
+
+    assert sum(summary["score"]["histogram"].values()) == 3
+    assert summary["insecure_counts"]["firewall"] == 1
+    assert summary["insecure_counts"]["backup"] == 1
+
+
+def test_expand_sources_dedupes(archive):
+    files = expand_sources([str(archive), str(archive / "*.txt"), str(archive / "**" / "*.txt")])
+    assert len(files) == 3
@@ -0,0 +1,96 @@
+"""
+Staged pipeline checks (pytest).
+
+Items pass through every stage (thread and process stages alike) and come out once each, in
+input order when every stage has one worker. A failing item carries its error to the output and
+skips the later stages without stopping the run. Bounded queues stop the feeder from running
+ahead of a stalled stage. build_pipeline splits its workers between preprocessing processes and
+OCR threads.
+"""
+
+from __future__ import annotations
+
+import operator
+import threading
+import time
+
+import pytest
+
+from pipeline import Pipeline, Stage
+
+
+def _fail_on_3(x: int) -> int:
+    if x == 3:
+        raise ValueError("bad item 3")
+    return x
+
+
+def test_stage_defaults():
+    assert Stage("s", abs, workers=0).workers == 1
+    assert Stage("s", abs, workers=3).queue_size == 6
+    assert Stage("s", abs, queue_size=1).queue_size == 1
+    with pytest.raises(ValueError):
+        Pipeline([])
+
+
+def test_single_workers_keep_input_order():
+    pipe = Pipeline([Stage("double", lambda x: x * 2), Stage("neg", operator.neg, processes=True)])
+    out = list(pipe.run(range(20)))
+    assert out == [(i, -2 * i, None) for i in range(20)]
+    report = pipe.report()
+    assert report["items"] == pipe.completed == 20
+    assert report["stages"]["double"]["kind"] == "thread"
+    assert report["stages"]["neg"]["kind"] == "process"
+    assert report["stages"]["neg"]["items"] == 20
+
+
+def test_parallel_workers_process_every_item_once():
+    pipe = Pipeline([Stage("a", lambda x: x + 1, workers=3), Stage("b", lambda x: x * 10, workers=2)])
+    out = list(pipe.run(range(50)))
+    assert sorted(out) == [(i, (i + 1) * 10, None) for i in range(50)]
+
+
+def test_errors_skip_later_stages():
+    seen = []
+    pipe = Pipeline([Stage("check", _fail_on_3), Stage("record", lambda x: seen.append(x) or x)])
+    out = {item: (result, err) for item, result, err in pipe.run(range(6))}
+    assert out[3][0] is None and isinstance(out[3][1], ValueError)
+    assert all(out[i] == (i, None) for i in range(6) if i != 3)
+    assert 3 not in seen and len(seen) == 5
+    stages = pipe.report()["stages"]
+    assert stages["check"]["errors"] == 1 and stages["record"]["items"] == 5
+
+
+def test_bounded_queues_hold_back_the_feeder():
+    release = threading.Event()
+    pulled = []
+
+    def items():
+        for i in range(100):
+            pulled.append(i)
+            yield i
+
+    pipe = Pipeline([Stage("a", lambda x: x, queue_size=1), Stage("b", lambda x: release.wait(5) and x, queue_size=1)])
+    out = []
+    consumer = threading.Thread(target=lambda: out.extend(pipe.run(items())))
+    consumer.start()
+    time.sleep(0.3)
+    # Stalled: feeder 1 + queue a 1 + stage a 1 + queue b 1 + stage b 1.
+    assert len(pulled) <= 5
+    assert out == []
+    release.set()
+    consumer.join(10)
+    assert [r[1] for r in out] == list(range(100))
+    assert pipe.report()["stages"]["b"]["queue_max"] <= 1
+
+
+def test_build_pipeline_splits_workers():
+    import security_analyzer
+
+    analyzer = security_analyzer.VaultGuardSecurityAnalyzer.__new__(security_analyzer.VaultGuardSecurityAnalyzer)
+    for workers in (2, 3, 8):
+        stages = {s.name: s for s in analyzer.build_pipeline(workers).stages}
+        assert stages["preprocess"].processes and not stages["ocr"].processes
+        assert stages["preprocess"].workers + stages["ocr"].workers == workers
+    with pytest.raises(ValueError):
+        analyzer.build_pipeline(1)
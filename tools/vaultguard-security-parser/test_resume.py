@@ -0,0 +1,159 @@
+"""
+Streaming folder-run checks for security_analyzer (pytest).
+
+analyze_folder journals one record per image and builds its summary from running aggregates; a
+run interrupted partway and continued with resume=True must end with the same summary as an
+uninterrupted run, without analyzing finished images again. An image that fails is journaled
+as an error and the run goes on. With a result store, a folder run commits rows in the store's
+batches (and at the end), while a single analyze_image commits before returning.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "vaultguard-ocr-python"))
+
+import security_analyzer  # noqa: E402
+
+TEXTS = [
+    "Windows Defender Firewall: ON\nBackup: OFF",
+    "Firewall: OPRIT\nBitLocker: ENCRYPTED",
+    "Windows Update: AUTOMATIC\nUAC: ALWAYS NOTIFY",
+    "Firewall: ON\nBitLocker: OFF\nBackup: OFF",
+]
+
+
+class FakeOcrAnalyzer(security_analyzer.VaultGuardSecurityAnalyzer):
+    """Takes the OCR text from the image file itself, and can crash after N images."""
+
+    def __init__(self, crash_after: int | None = None):
+        super().__init__()
+        self.crash_after = crash_after
+        self.analyzed = []
+
+    def analyze_image(self, image_path: str) -> dict:
+        if self.crash_after is not None and len(self.analyzed) == self.crash_after:
+            raise KeyboardInterrupt
+        self.analyzed.append(os.path.basename(image_path))
+        with open(image_path, encoding="utf-8") as f:
+            text = f.read()
+        ocr = {"text": text, "lang": "eng", "processing_time_s": 0.01, "timings_ms": {"ocr": 10.0}}
+        return self._finish_image(image_path, ocr)
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+    monkeypatch.delenv("VAULTGUARD_RESULT_STORE", raising=False)
+    images = tmp_path / "images"
+    images.mkdir()
+    for i, text in enumerate(TEXTS):
+        (images / f"img{i}.png").write_text(text, encoding="utf-8")
+    return str(images)
+
+
+def _summary(out: dict) -> dict:
+    return {k: out[k] for k in ("analyzed", "errors", "score", "insecure_counts", "settings", "risk_levels")}
+
+
+def test_resume_matches_uninterrupted_run(folder):
+    full = FakeOcrAnalyzer().analyze_folder(folder, workers=1)
+    assert "results" not in full
+    assert full["analyzed"] == len(TEXTS) and full["resumed"] == 0
+    assert full["insecure_counts"]["backup"] == 2
+    assert full["timings"]["ocr"]["count"] == len(TEXTS)
+    with open(full["summary"], encoding="utf-8") as f:
+        assert json.load(f)["score"] == full["score"]
+
+    crashing = FakeOcrAnalyzer(crash_after=2)
+    with pytest.raises(KeyboardInterrupt):
+        crashing.analyze_folder(folder, workers=1)
+    journal = security_analyzer.journal_path(crashing.results_dir, folder)
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"image": "img2.png", "sco')  # torn write from the crash
+
+    resumed = FakeOcrAnalyzer()
+    out = resumed.analyze_folder(folder, workers=1, resume=True)
+    assert resumed.analyzed == ["img2.png", "img3.png"]
+    assert out["resumed"] == 2
+    assert _summary(out) == _summary(full)
+    with open(journal, encoding="utf-8") as f:
+        assert [json.loads(line)["image"] for line in f] == [f"img{i}.png" for i in range(len(TEXTS))]
+
+
+def test_resume_retries_failed_images(folder):
+    full = FakeOcrAnalyzer().analyze_folder(folder, workers=1)
+    journal = full["journal"]
+    with open(journal, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    records[1] = {"image": "img1.png", "error": "tesseract crashed"}  # as a pipelined run journals it
+    with open(journal, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in records)
+
+    resumed = FakeOcrAnalyzer()
+    out = resumed.analyze_folder(folder, workers=1, resume=True)
+    assert resumed.analyzed == ["img1.png"]
+    assert _summary(out) == _summary(full)
+    with open(journal, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert not any("error" in r for r in lines)
+    assert sorted(r["image"] for r in lines) == [f"img{i}.png" for i in range(len(TEXTS))]
+
+
+def test_folder_run_without_processing_index(folder, monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "processing_index", None)  # older OCR tools
+    out = FakeOcrAnalyzer().analyze_folder(folder, workers=1)
+    assert out["analyzed"] == len(TEXTS)
+    assert "Processing index unavailable" in capsys.readouterr().err
+
+
+def test_failing_image_does_not_abort_sequential_run(folder):
+    class CorruptImage(FakeOcrAnalyzer):
+        def analyze_image(self, image_path: str) -> dict:
+            if image_path.endswith("img1.png"):
+                raise ValueError("Cannot decode image bytes")
+            return super().analyze_image(image_path)
+
+    out = CorruptImage().analyze_folder(folder, workers=1)
+    assert out["errors"] == 1 and out["analyzed"] == len(TEXTS) - 1
+    with open(out["journal"], encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[1] == {"image": "img1.png", "error": "Cannot decode image bytes"}
+    assert [r["image"] for r in records] == [f"img{i}.png" for i in range(len(TEXTS))]
+
+    resumed = FakeOcrAnalyzer()
+    resumed.analyze_folder(folder, workers=1, resume=True)
+    assert resumed.analyzed == ["img1.png"]
+
+
+class StoreAnalyzer(security_analyzer.VaultGuardSecurityAnalyzer):
+    """Runs the real analyze_image/analyze_bytes path; OCR just decodes the file's text."""
+
+    def extract_text(self, source, mode=None) -> dict:
+        if not isinstance(source, (bytes, bytearray, memoryview)):
+            with open(source, "rb") as f:
+                source = f.read()
+        return {"text": bytes(source).decode("utf-8"), "lang": "eng", "processing_time_s": 0.01}
+
+
+def test_folder_run_commits_store_in_batches(folder, tmp_path, monkeypatch):
+    analyzer = StoreAnalyzer(str(tmp_path / "results.db"))
+    flushes = []
+    real_flush = analyzer.store.flush
+    monkeypatch.setattr(analyzer.store, "flush", lambda: flushes.append(1) or real_flush())
+
+    out = analyzer.analyze_folder(folder, workers=1)
+    assert out["analyzed"] == len(TEXTS)
+    assert len(flushes) == 1  # once at the end, not per image
+    with open(out["journal"], encoding="utf-8") as f:
+        assert all(analyzer.store.has(json.loads(line)["image_hash"]) for line in f)
+
+    analyzer.analyze_image(os.path.join(folder, "img0.png"))
+    assert len(flushes) == 2  # single-image use commits right away
+    analyzer.close()
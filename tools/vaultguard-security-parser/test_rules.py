@@ -0,0 +1,70 @@
+"""
+Rule pack checks for security_parser (pytest).
+
+Results record the pack they were produced with; an edited pack is picked up by a running
+parser, and a broken edit keeps the last good pack.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+
+import pytest
+
+import security_parser
+from security_parser import SecuritySettingsParser, load_rule_pack
+
+
+@pytest.fixture
+def pack_path(tmp_path):
+    path = tmp_path / "ro-en.json"
+    shutil.copy(security_parser.rule_pack_path("ro-en"), path)
+    return str(path)
+
+
+def _edit(path: str, **changes):
+    with open(path, "r", encoding="utf-8") as f:
+        pack = json.load(f)
+    pack.update(changes)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(pack, f)
+    # Make the change visible to the mtime check even on coarse filesystem clocks.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_result_records_rule_pack(pack_path):
+    out = SecuritySettingsParser(pack_path).parse_text("Firewall: ON")
+    pack = load_rule_pack(pack_path)
+    assert out["rule_pack"] == {"name": "windows-security", "version": "1.0.0", "locale": "ro-en", "hash": pack.hash[:16]}
+    # Same content under another path: validated and compiled once per process.
+    copy = os.path.join(os.path.dirname(pack_path), "copy.json")
+    shutil.copy(pack_path, copy)
+    assert load_rule_pack(copy).compiled is pack.compiled
+
+
+def test_hot_reload(pack_path, capsys):
+    parser = SecuritySettingsParser(pack_path, reload_check_s=0)
+    settings = load_rule_pack(pack_path).settings
+    assert parser.parse_text("Backup: OFF")["settings"]["backup"]["status"] == "insecure"
+
+    backup = dict(settings["backup"], positive_keywords=["off"], negative_keywords=[])
+    _edit(pack_path, version="1.0.1", settings=dict(settings, backup=backup))
+    assert parser.reload_if_changed(force=True)
+    out = parser.parse_text("Backup: OFF")
+    assert out["rule_pack"]["version"] == "1.0.1"
+    assert out["settings"]["backup"]["status"] == "secure"
+
+    with open(pack_path, "w", encoding="utf-8") as f:
+        f.write("{broken")
+    assert not parser.reload_if_changed(force=True)
+    assert parser.pack.version == "1.0.1"
+    assert "Rule pack reload failed" in capsys.readouterr().err
+
+
+def test_bad_pattern_rejected(pack_path):
+    _edit(pack_path, settings={"firewall": {"patterns": ["(unclosed"], "positive_keywords": [], "negative_keywords": []}})
+    with pytest.raises(ValueError, match="bad pattern"):
+        load_rule_pack(pack_path)
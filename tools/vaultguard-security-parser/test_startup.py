@@ -0,0 +1,38 @@
+"""
+Startup checks for the security parser/analyzer (pytest).
+
+Importing the analyzer, constructing it and running the parser self-test must not load the OCR
+stack or the pipeline/result-store machinery, and imports must fit VAULTGUARD_IMPORT_BUDGET_MS
+(default 150 ms, cumulative as reported by -X importtime). The probes come from the OCR tools'
+import_probe.py.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "vaultguard-ocr-python"))
+
+from import_probe import HEAVY_MODULES, import_time_ms, loaded_modules  # noqa: E402
+
+DEFERRED_MODULES = HEAVY_MODULES + ("multiprocessing", "sqlite3")
+BUDGET_MS = float(os.environ.get("VAULTGUARD_IMPORT_BUDGET_MS", "150"))
+
+
+def test_imports_within_budget():
+    assert import_time_ms("security_parser", HERE) < BUDGET_MS
+    assert import_time_ms("security_analyzer", HERE) < BUDGET_MS
+
+
+def test_parser_self_test_does_not_load_ocr_stack():
+    code = "import contextlib, io, security_parser\nwith contextlib.redirect_stdout(io.StringIO()): security_parser.main(['security_parser.py', '--test'])"
+    assert loaded_modules(code, DEFERRED_MODULES, HERE) == []
+
+
+def test_analyzer_construction_is_lazy(tmp_path):
+    env = {**os.environ, "USERPROFILE": str(tmp_path)}
+    env.pop("VAULTGUARD_RESULT_STORE", None)
+    code = "import security_analyzer; security_analyzer.VaultGuardSecurityAnalyzer()"
+    assert loaded_modules(code, DEFERRED_MODULES, HERE, env) == []
@@ -0,0 +1,121 @@
+"""
+Result store checks (pytest).
+
+Payloads round-trip through the SQLite store by image hash and by image name, reports are
+rendered from the stored payload, and appends become visible to other connections only in
+commit_every batches (or on flush/close): a process that dies before the batch is committed
+loses exactly the uncommitted rows.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from result_store import ResultStore, image_hash, render_report
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _payload(name: str, score: float, ts: str = "20260101_100000") -> dict:
+    return {
+        "image": name,
+        "timestamp": ts,
+        "ocr": {"text": f"text of {name}"},
+        "security_analysis": {
+            "security_score": score,
+            "settings": {
+                "firewall": {"detected": True, "status": "ON", "confidence": 90},
+                "backup": {"detected": False, "status": None, "confidence": 0},
+            },
+            "risks": ["Backup not detected"],
+            "recommendations": ["Enable File History"],
+        },
+    }
+
+
+def _committed_rows(path: str) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM analysis_results").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "store" / "results.db")
+
+
+def test_round_trip_by_hash_and_name(db):
+    store = ResultStore(db)
+    h = image_hash(b"img0")
+    store.append(_payload("img0.png", 50.0), h)
+    store.append(_payload("img0.png", 75.0, ts="20260102_100000"), h)  # re-analysis of the same image
+    store.append(_payload("img1.png", 100.0), image_hash(b"img1"))
+    assert store.get(h)["security_analysis"]["security_score"] == 75.0
+    assert store.get("img1.png")["ocr"]["text"] == "text of img1.png"
+    assert store.get("missing") is None and store.report("missing") is None
+    assert [r["image"] for r in store.latest(2)] == ["img0.png", "img1.png"]
+    store.close()
+
+    reopened = ResultStore(db)
+    assert reopened.has(h) and not reopened.has(image_hash(b"other"))
+    assert reopened.get(h) == _payload("img0.png", 75.0, ts="20260102_100000")
+    reopened.close()
+
+
+def test_render_report(db):
+    report = render_report(_payload("img0.png", 50.0))
+    assert "Image: img0.png" in report and "Security score: 50.0%" in report
+    assert "- firewall: ON (conf 90%)" in report
+    assert "backup:" not in report  # undetected settings are left out
+    assert "RISKS:\n- Backup not detected" in report
+    assert report.endswith("- Enable File History\n\n")
+
+    store = ResultStore(db)
+    store.append(_payload("img0.png", 50.0), "h0")
+    assert store.report("h0") == report
+    store.close()
+
+
+def test_appends_commit_in_batches(db):
+    store = ResultStore(db, commit_every=3)
+    for i in range(2):
+        store.append(_payload(f"img{i}.png", 50.0), f"h{i}")
+    assert _committed_rows(db) == 0
+    store.append(_payload("img2.png", 50.0), "h2")
+    assert _committed_rows(db) == 3
+    store.append(_payload("img3.png", 50.0), "h3")
+    assert _committed_rows(db) == 3
+    store.flush()
+    assert _committed_rows(db) == 4
+    store.append(_payload("img4.png", 50.0), "h4")
+    store.close()
+    assert _committed_rows(db) == 5
+
+
+def test_crash_loses_only_uncommitted_rows(db):
+    code = textwrap.dedent(
+        f"""
+        import os
+        from result_store import ResultStore
+
+        store = ResultStore({db!r}, commit_every=4)
+        for i in range(10):
+            store.append({{"image": f"img{{i}}.png", "timestamp": "t"}}, f"h{{i}}")
+        os._exit(1)  # no flush/close: the last partial batch is never committed
+        """
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True)
+    assert proc.returncode == 1
+
+    store = ResultStore(db)
+    assert _committed_rows(db) == 8
+    assert store.has("h7") and not store.has("h8")
+    store.close()